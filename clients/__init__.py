@@ -2,12 +2,12 @@
 API客户端模块
 """
 
-# 暂时注释掉 llm_client 导入，避免 langchain_openai 依赖问题
-# from .llm_client import llm_client
+# llm_client 的模型客户端延迟到首次调用时创建，导入本包不会加载 langchain_openai
+from .llm_client import llm_client
 from .xhs_client import XHSClient, xhs_client
 
 __all__ = [
-    # "llm_client",
+    "llm_client",
     "XHSClient",
     "xhs_client"
-] 
\ No newline at end of file
+]
@@ -0,0 +1,300 @@
+"""
+浏览器上下文/页面池
+维护若干个预热的浏览器上下文，每个上下文下维护可复用的页面，
+采集调用方从池中借出页面、用完归还，避免每次采集都新建页面和冷启动导航
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import List, Dict, Iterable, Optional, Any, Callable, Awaitable, TYPE_CHECKING
+from loguru import logger
+from clients.resource_blocking import ResourceBlocker
+
+# playwright 只在首次真正启动浏览器时导入，Mock模式下不会加载
+if TYPE_CHECKING:
+    from playwright.async_api import Page, BrowserContext, Browser, Playwright
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class PooledPage:
+    """池中的一个页面，记录其所属上下文和导航次数"""
+
+    def __init__(self, page: "Page", slot: "_ContextSlot"):
+        self.page = page
+        self.slot = slot
+        self.navigations = 0
+        self.checkouts = 0
+        self.created_at = time.monotonic()
+        page.on("framenavigated", self._on_navigated)
+
+    def _on_navigated(self, frame) -> None:
+        # 归还时跳转 about:blank 不算一次使用
+        if frame == self.page.main_frame and getattr(frame, "url", "") != "about:blank":
+            self.navigations += 1
+
+
+class _ContextSlot:
+    """一个浏览器上下文及其页面"""
+
+    def __init__(self, context: "BrowserContext"):
+        self.context = context
+        self.idle: List[PooledPage] = []
+        self.page_count = 0  # 空闲 + 借出的页面数（含正在创建的）
+
+
+class BrowserPool:
+    """
+    有界的浏览器上下文/页面池。
+    - 最多 max_contexts 个上下文，每个上下文最多 pages_per_context 个页面
+    - 借出前做健康检查，不健康的页面直接丢弃重建
+    - 页面导航次数达到 max_navigations_per_page 后在归还时回收
+    """
+
+    def __init__(
+        self,
+        headless: bool = True,
+        max_contexts: int = 2,
+        pages_per_context: int = 4,
+        max_navigations_per_page: int = 50,
+        health_check_timeout: float = 2.0,
+        user_agent: str = DEFAULT_USER_AGENT,
+        context_setup: Optional[Callable[["BrowserContext"], Awaitable[None]]] = None,
+        resource_blocker: Optional[ResourceBlocker] = None,
+    ):
+        """
+        :param headless: 是否以无头模式运行浏览器
+        :param max_contexts: 最大浏览器上下文数
+        :param pages_per_context: 每个上下文的最大页面数
+        :param max_navigations_per_page: 页面导航多少次后回收
+        :param health_check_timeout: 健康检查超时（秒）
+        :param user_agent: 新建上下文使用的UA
+        :param context_setup: 新建上下文后的初始化回调（如设置Cookie）
+        :param resource_blocker: 资源拦截器，为None时不拦截任何请求
+        """
+        self.headless = headless
+        self.max_contexts = max_contexts
+        self.pages_per_context = pages_per_context
+        self.max_navigations_per_page = max_navigations_per_page
+        self.health_check_timeout = health_check_timeout
+        self.user_agent = user_agent
+        self.context_setup = context_setup
+        self.resource_blocker = resource_blocker
+
+        self._playwright: Optional["Playwright"] = None
+        self._browser: Optional["Browser"] = None
+        self._slots: List[_ContextSlot] = []
+        self._lock = asyncio.Lock()
+        self._capacity: Optional[asyncio.Semaphore] = None
+        self._closed = False
+        self._stats = {"checkouts": 0, "pages_created": 0, "pages_recycled": 0, "unhealthy_pages": 0}
+
+    @property
+    def size(self) -> int:
+        """池的总页面容量"""
+        return self.max_contexts * self.pages_per_context
+
+    async def _ensure_started(self) -> None:
+        """按需启动Playwright和浏览器"""
+        if self._browser and self._browser.is_connected():
+            return
+        async with self._lock:
+            if self._browser and self._browser.is_connected():
+                return
+            try:
+                from playwright.async_api import async_playwright
+            except ImportError:
+                raise RuntimeError("未安装playwright，无法启动浏览器")
+            logger.info("正在启动并初始化浏览器...")
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            self._slots = []
+            if self._capacity is None:
+                self._capacity = asyncio.Semaphore(self.size)
+            self._closed = False
+
+    async def _new_context(self) -> _ContextSlot:
+        context = await self._browser.new_context(user_agent=self.user_agent)
+        if self.context_setup:
+            await self.context_setup(context)
+        if self.resource_blocker:
+            await self.resource_blocker.install(context)
+        slot = _ContextSlot(context)
+        self._slots.append(slot)
+        logger.info(f"浏览器上下文已创建 ({len(self._slots)}/{self.max_contexts})")
+        return slot
+
+    def _pop_idle(self) -> Optional[PooledPage]:
+        """优先从页面最多的上下文中取空闲页面，让其余上下文保持空闲"""
+        for slot in sorted(self._slots, key=lambda s: len(s.idle), reverse=True):
+            if slot.idle:
+                return slot.idle.pop()
+        return None
+
+    async def _new_page(self) -> PooledPage:
+        async with self._lock:
+            slot = min(
+                (s for s in self._slots if s.page_count < self.pages_per_context),
+                key=lambda s: s.page_count,
+                default=None,
+            )
+            if slot is None:
+                if len(self._slots) >= self.max_contexts:
+                    raise RuntimeError(f"浏览器上下文数已达上限 {self.max_contexts}，且没有空余页面位置")
+                slot = await self._new_context()
+            slot.page_count += 1
+        try:
+            page = await slot.context.new_page()
+        except Exception:
+            slot.page_count -= 1
+            await self._drop_slot_if_dead(slot)
+            raise
+        self._stats["pages_created"] += 1
+        return PooledPage(page, slot)
+
+    async def _is_healthy(self, pooled: PooledPage) -> bool:
+        """页面健康检查：未关闭且能在超时内执行脚本"""
+        if pooled.page.is_closed():
+            return False
+        try:
+            await asyncio.wait_for(pooled.page.evaluate("1"), timeout=self.health_check_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _discard(self, pooled: PooledPage) -> None:
+        """关闭并移除一个页面"""
+        pooled.slot.page_count -= 1
+        try:
+            if not pooled.page.is_closed():
+                await pooled.page.close()
+        except Exception as e:
+            logger.debug(f"关闭页面时出现异常: {e}")
+        await self._drop_slot_if_dead(pooled.slot)
+
+    async def _drop_slot_if_dead(self, slot: _ContextSlot) -> None:
+        """上下文已不可用（浏览器崩溃等）时将其移出池"""
+        try:
+            alive = slot.context.browser is None or slot.context.browser.is_connected()
+        except Exception:
+            alive = False
+        if not alive and slot in self._slots:
+            self._slots.remove(slot)
+            logger.warning("浏览器上下文已失效，已移出页面池")
+            try:
+                await slot.context.close()
+            except Exception as e:
+                logger.debug(f"关闭失效的浏览器上下文时出现异常: {e}")
+
+    async def acquire(self) -> PooledPage:
+        """借出一个健康的页面，池满时等待"""
+        await self._ensure_started()
+        await self._capacity.acquire()
+        try:
+            while True:
+                pooled = self._pop_idle()
+                if pooled is None:
+                    pooled = await self._new_page()
+                elif not await self._is_healthy(pooled):
+                    self._stats["unhealthy_pages"] += 1
+                    await self._discard(pooled)
+                    continue
+                pooled.checkouts += 1
+                self._stats["checkouts"] += 1
+                return pooled
+        except BaseException:
+            self._capacity.release()
+            raise
+
+    async def release(self, pooled: PooledPage, healthy: bool = True) -> None:
+        """归还页面；不健康或导航次数超限的页面会被回收，池已关闭时直接关闭页面"""
+        if self._closed:
+            try:
+                if not pooled.page.is_closed():
+                    await pooled.page.close()
+            except Exception as e:
+                logger.debug(f"关闭页面时出现异常: {e}")
+            return
+        try:
+            if not healthy or pooled.page.is_closed():
+                self._stats["unhealthy_pages"] += 1
+                await self._discard(pooled)
+            elif pooled.navigations >= self.max_navigations_per_page:
+                self._stats["pages_recycled"] += 1
+                await self._discard(pooled)
+            else:
+                try:
+                    # 停止页面上的脚本和请求，上下文的HTTP缓存仍保留
+                    await pooled.page.goto("about:blank")
+                except Exception:
+                    await self._discard(pooled)
+                    return
+                if pooled.slot in self._slots:
+                    pooled.slot.idle.append(pooled)
+                else:
+                    await self._discard(pooled)
+        finally:
+            self._capacity.release()
+
+    @asynccontextmanager
+    async def page(self, allow_resources: Optional[Iterable[str]] = None):
+        """
+        借出页面的上下文管理器:
+            async with pool.page() as page:
+                await page.goto(...)
+        调用方注册的事件监听需要在退出前自行移除。
+        :param allow_resources: 本次借出期间放行的资源类型，如 ("image",)
+        """
+        pooled = await self.acquire()
+        healthy = True
+        if self.resource_blocker and allow_resources:
+            self.resource_blocker.allow(pooled.page, allow_resources)
+        try:
+            yield pooled.page
+        except BaseException:
+            healthy = not pooled.page.is_closed()
+            raise
+        finally:
+            if self.resource_blocker and allow_resources:
+                self.resource_blocker.allow(pooled.page, None)
+            await self.release(pooled, healthy=healthy)
+
+    def stats(self) -> Dict[str, Any]:
+        """页面池统计信息"""
+        return {
+            **self._stats,
+            "contexts": len(self._slots),
+            "pages": sum(s.page_count for s in self._slots),
+            "idle_pages": sum(len(s.idle) for s in self._slots),
+            "capacity": self.size,
+            "resource_blocking": self.resource_blocker.stats() if self.resource_blocker else None,
+        }
+
+    async def close(self) -> None:
+        """关闭所有上下文、浏览器和Playwright实例；之后归还的页面直接关闭"""
+        self._closed = True
+        for slot in self._slots:
+            try:
+                await slot.context.close()
+            except Exception as e:
+                logger.warning(f"关闭浏览器上下文时出现异常: {e}")
+        self._slots = []
+        try:
+            if self._browser:
+                await self._browser.close()
+                logger.info("浏览器已关闭。")
+        except Exception as e:
+            logger.warning(f"关闭浏览器时出现异常: {e}")
+        finally:
+            self._browser = None
+        try:
+            if self._playwright:
+                await self._playwright.stop()
+                logger.info("Playwright实例已停止。")
+        except Exception as e:
+            logger.warning(f"停止Playwright时出现异常: {e}")
+        finally:
+            self._playwright = None
+        self._capacity = None
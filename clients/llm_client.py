@@ -4,45 +4,214 @@ LLM客户端模块
 """
 
 import asyncio
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Callable, Optional, List, AsyncIterator, Union, TYPE_CHECKING
 from loguru import logger
-from openai import OpenAI
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
 from config import config, XHS_USE_MOCK
 from models import Keyword, Post, Hitpoint, GeneratedContent
+from clients.rate_limiter import LLMRateLimiter
+from utils.cache import TieredCache, make_cache_key
+from utils.parsers import extract_indexed_tags, find_xml_tags, has_complete_indexed_tags
+
+# langchain_openai / openai 导入较慢，只在首次真正调用模型时加载
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+    from openai import OpenAI
+
+# 各类LLM调用的响应缓存有效期（秒）
+CACHE_TTLS = {
+    "keywords": 24 * 3600,
+    "filter": 7 * 24 * 3600,
+    "refinement": 24 * 3600,
+    "hitpoints": 24 * 3600,
+    "generation": 3600,
+}
 
 class LLMClient:
     """LLM客户端"""
     
     def __init__(self):
+        # 模型客户端在首次访问时创建，导入本模块和构造LLMClient都不会加载 langchain_openai/openai
+        self._default_model: Optional["ChatOpenAI"] = None
+        self._thinking_model: Optional["ChatOpenAI"] = None
+        self._openai_client: Optional["OpenAI"] = None
+        
+        # 所有模型调用共享的限流器（按模型限制并发和每分钟token）
+        self.rate_limiter = LLMRateLimiter()
+        
+        # 以模型、温度和消息内容哈希为键的响应缓存（内存LRU + 磁盘SQLite）
+        self.cache = TieredCache("llm_responses", max_entries=2048)
+    
+    @staticmethod
+    def _build_chat_model(model_name: str, temperature: float, max_tokens: int) -> "ChatOpenAI":
+        from langchain_openai import ChatOpenAI
+        
         # 使用OpenAI客户端连接到自定义API端点
         llm_config = config.get_llm_config()
-        
-        self.default_model = ChatOpenAI(
-            model=config.DEFAULT_MODEL,
+        return ChatOpenAI(
+            model=model_name,
             openai_api_base=llm_config["base_url"],
             openai_api_key=llm_config["api_key"],
-            temperature=0.7,
-            max_tokens=4000,
+            temperature=temperature,
+            max_tokens=max_tokens,
             timeout=llm_config["timeout"]
         )
+    
+    @property
+    def default_model(self) -> "ChatOpenAI":
+        if self._default_model is None:
+            self._default_model = self._build_chat_model(config.DEFAULT_MODEL, temperature=0.7, max_tokens=4000)
+        return self._default_model
+    
+    @property
+    def thinking_model(self) -> "ChatOpenAI":
+        if self._thinking_model is None:
+            self._thinking_model = self._build_chat_model(config.THINKING_MODEL, temperature=0.3, max_tokens=4400)
+        return self._thinking_model
+    
+    @property
+    def openai_client(self) -> "OpenAI":
+        """原生OpenAI客户端，用于直接调用"""
+        if self._openai_client is None:
+            from openai import OpenAI
+            
+            llm_config = config.get_llm_config()
+            self._openai_client = OpenAI(
+                base_url=llm_config["base_url"],
+                api_key=llm_config["api_key"]
+            )
+        return self._openai_client
+    
+    async def invoke(self, model: "ChatOpenAI", messages: List[Any]):
+        """在限流器下调用模型，所有LLM请求都应经过这里"""
+        model_name = getattr(model, "model_name", None) or "default"
+        estimated_tokens = self._estimate_tokens(messages) + (getattr(model, "max_tokens", None) or 0)
+        async with self.rate_limiter.limit(model_name, estimated_tokens) as permit:
+            response = await model.ainvoke(messages)
+            permit.record_usage(self._total_tokens(response))
+            return response
+    
+    async def astream(self, model: "ChatOpenAI", messages: List[Any]) -> AsyncIterator[str]:
+        """
+        在限流器下流式调用模型，逐块产出文本；整个流占用一个并发名额。
+        流结束时按用量元数据结算token，接口不返回用量时按提示词和已产出文本估算，多预占的部分退回。
+        """
+        model_name = getattr(model, "model_name", None) or "default"
+        prompt_tokens = self._estimate_tokens(messages)
+        estimated_tokens = prompt_tokens + (getattr(model, "max_tokens", None) or 0)
+        async with self.rate_limiter.limit(model_name, estimated_tokens) as permit:
+            used_tokens = None
+            output_chars = 0
+            try:
+                async for chunk in model.astream(messages):
+                    used_tokens = self._total_tokens(chunk) or used_tokens
+                    if chunk.content:
+                        output_chars += len(chunk.content)
+                        yield chunk.content
+            finally:
+                permit.record_usage(used_tokens or prompt_tokens + output_chars)
+    
+    async def invoke_cached(
+        self,
+        model: "ChatOpenAI",
+        messages: List[Any],
+        use_cache: bool = True,
+        ttl: Optional[float] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """
+        带响应缓存的模型调用，返回响应文本。
+        :param use_cache: 为False时跳过缓存读写，直接请求模型
+        :param ttl: 缓存有效期（秒），None表示不过期
+        :param validate: 响应能被调用方解析时返回True；只缓存通过校验的响应，校验不通过的缓存项视为未命中
+        """
+        if not use_cache:
+            response = await self.invoke(model, messages)
+            return response.content
         
-        self.thinking_model = ChatOpenAI(
-            model=config.THINKING_MODEL,
-            openai_api_base=llm_config["base_url"],
-            openai_api_key=llm_config["api_key"],
-            temperature=0.3,
-            max_tokens=4400,
-            timeout=llm_config["timeout"]
-        )
+        key = self._cache_key(model, messages)
+        cached = await self.cache.aget(key)
+        if cached is not None and (validate is None or validate(cached)):
+            logger.debug("LLM响应缓存命中")
+            return cached
         
-        # 创建原生OpenAI客户端用于直接调用
-        self.openai_client = OpenAI(
-            base_url=llm_config["base_url"],
-            api_key=llm_config["api_key"]
+        response = await self.invoke(model, messages)
+        content = response.content
+        if content and (validate is None or validate(content)):
+            await self.cache.aset(key, content, ttl=ttl)
+        elif content:
+            logger.warning("LLM响应无法解析，不写入缓存")
+        return content
+    
+    async def astream_cached(
+        self,
+        model: "ChatOpenAI",
+        messages: List[Any],
+        ttl: Optional[float] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        带响应缓存的流式调用：命中缓存时一次性产出缓存文本，
+        否则流式产出并在完整结束后写入缓存（与 invoke_cached 共用缓存键）
+        :param validate: 与 invoke_cached 相同，只缓存通过校验的完整响应，校验不通过的缓存项视为未命中
+        """
+        key = self._cache_key(model, messages)
+        cached = await self.cache.aget(key)
+        if cached is not None and (validate is None or validate(cached)):
+            logger.debug("LLM响应缓存命中")
+            yield cached
+            return
+        
+        parts = []
+        async for chunk in self.astream(model, messages):
+            parts.append(chunk)
+            yield chunk
+        content = "".join(parts)
+        if content and (validate is None or validate(content)):
+            await self.cache.aset(key, content, ttl=ttl)
+        elif content:
+            logger.warning("LLM流式响应无法解析，不写入缓存")
+    
+    @staticmethod
+    def _cache_key(model: "ChatOpenAI", messages: List[Any]) -> str:
+        """缓存键：模型名 + 温度 + 消息内容"""
+        serialized = [
+            (message.get("role"), message.get("content")) if isinstance(message, dict)
+            else (getattr(message, "type", ""), getattr(message, "content", ""))
+            for message in messages
+        ]
+        return make_cache_key(
+            getattr(model, "model_name", None),
+            getattr(model, "temperature", None),
+            serialized,
         )
     
+    def cache_stats(self) -> Dict[str, Any]:
+        """LLM响应缓存的命中统计"""
+        return self.cache.stats()
+    
+    def rate_limit_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """各模型的限流指标：排队深度、并发上限、等待时间等"""
+        return self.rate_limiter.metrics()
+    
+    @staticmethod
+    def _estimate_tokens(messages: List[Any]) -> int:
+        """粗略估算提示词token数（中文约每字一个token，按字符数计偏保守）"""
+        total = 0
+        for message in messages:
+            content = message.get("content", "") if isinstance(message, dict) else getattr(message, "content", "")
+            total += len(content) if isinstance(content, str) else len(str(content))
+        return total
+    
+    @staticmethod
+    def _total_tokens(response: Any) -> Optional[int]:
+        """从响应元数据中读取实际消耗的token数"""
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage.get("total_tokens"):
+            return usage["total_tokens"]
+        metadata = getattr(response, "response_metadata", None) or {}
+        return (metadata.get("token_usage") or {}).get("total_tokens")
+    
     async def get_raw_keyword_response(self, user_input: str) -> str:
         """获取关键词生成的原始LLM响应"""
         if XHS_USE_MOCK:
@@ -52,8 +221,51 @@ class LLMClient:
             else:
                 return """<topic1>健身</topic1><topic2>美食</topic2>"""
         else:
-            # 真实LLM调用逻辑
-            pass
+            return await self.invoke_cached(self.default_model, self._keyword_messages(user_input), ttl=CACHE_TTLS["keywords"])
+
+    def _keyword_messages(self, user_input: str) -> List[Any]:
+        from prompts import KEYWORD_GENERATION_PROMPT
+        from langchain_core.messages import HumanMessage, SystemMessage
+        return [
+            SystemMessage(content=config.SYSTEM_PROMPT),
+            HumanMessage(content=KEYWORD_GENERATION_PROMPT.format(user_input=user_input))
+        ]
+
+    async def stream_tags(
+        self,
+        chunks: AsyncIterator[str],
+        tags: Optional[List[str]] = None,
+        prefix: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        边接收流式输出边解析XML标签。
+        每个标签闭合时产出 {"type": "tag", "tag", "content"}，
+        结束时产出 {"type": "done", "raw", "tags"}，tags 为全部已解析标签。
+        """
+        from utils.parsers import StreamingTagParser
+
+        parser = StreamingTagParser(tags=tags, prefix=prefix)
+        async for chunk in chunks:
+            for tag, content in parser.feed(chunk):
+                yield {"type": "tag", "tag": tag, "content": content}
+        for tag, content in parser.close():
+            yield {"type": "tag", "tag": tag, "content": content}
+        yield {"type": "done", "raw": parser.raw_text, "tags": dict(parser.found)}
+
+    async def stream_keywords(self, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式生成关键词，每个 <topicN> 闭合时立即产出 {"type": "tag", "tag", "content"}，
+        结束时产出 {"type": "done", "raw", "tags"}。
+        """
+        if XHS_USE_MOCK:
+            chunks = _mock_stream(await self.get_raw_keyword_response(user_input))
+        else:
+            chunks = self.astream_cached(
+                self.default_model, self._keyword_messages(user_input), ttl=CACHE_TTLS["keywords"],
+                validate=has_complete_indexed_tags,
+            )
+        async for event in self.stream_tags(chunks, prefix="topic"):
+            yield event
 
     def parse_keywords(self, content: str) -> List[Keyword]:
         """从原始响应中解析关键词"""
@@ -63,39 +275,53 @@ class LLMClient:
             for kw in keywords_text
         ]
     
-    async def get_raw_refinement_response(self, user_input: str, search_results: str) -> str:
+    async def get_raw_refinement_response(self, user_input: str, search_results: str, use_cache: bool = True) -> str:
         """调用LLM获取精炼话题的原始响应"""
         logger.info(f"向LLM请求精炼话题")
         
         try:
-            from prompts import TOPIC_REFINEMENT_PROMPT
-            
-            prompt = TOPIC_REFINEMENT_PROMPT.format(
-                user_input=user_input, # The prompt needs user_input
-                search_results=search_results
-            )
-            
-            messages = [
-                SystemMessage(content=config.SYSTEM_PROMPT),
-                HumanMessage(content=prompt)
-            ]
-            
-            response = await self.thinking_model.ainvoke(messages)
-            return response.content
+            messages = self._refinement_messages(user_input, search_results)
+            return await self.invoke_cached(self.thinking_model, messages, use_cache=use_cache, ttl=CACHE_TTLS["refinement"])
             
         except Exception as e:
             logger.error(f"LLM请求精炼话题失败: {e}")
             return ""
 
+    def _refinement_messages(self, user_input: str, search_results: str) -> List[Any]:
+        from prompts import TOPIC_REFINEMENT_PROMPT
+        from langchain_core.messages import HumanMessage, SystemMessage
+        prompt = TOPIC_REFINEMENT_PROMPT.format(
+            user_input=user_input, # The prompt needs user_input
+            search_results=search_results
+        )
+        return [
+            SystemMessage(content=config.SYSTEM_PROMPT),
+            HumanMessage(content=prompt)
+        ]
+
+    async def stream_refinement(self, user_input: str, search_results: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式精炼话题，每个 <topicN> 闭合时立即产出 {"type": "tag", "tag", "content"}，
+        结束时产出 {"type": "done", "raw", "tags"}。
+        """
+        messages = self._refinement_messages(user_input, search_results)
+        chunks = self.astream_cached(
+            self.thinking_model, messages, ttl=CACHE_TTLS["refinement"],
+            validate=has_complete_indexed_tags,
+        )
+        async for event in self.stream_tags(chunks, prefix="topic"):
+            yield event
+
     def parse_refined_keywords(self, content: str) -> List[str]:
         """从XML中解析精炼后的关键词"""
         return self._extract_keywords_from_xml(content) # Reusing the same XML extractor for <topic1>, <topic2>
     
-    async def get_raw_filter_decision(self, post: Dict[str, Any]) -> str:
+    async def get_raw_filter_decision(self, post: Dict[str, Any], use_cache: bool = True) -> str:
         """为单个帖子获取过滤决策的原始LLM响应"""
         logger.info(f"为帖子 '{post.get('title')}' 请求过滤决策")
         try:
             from prompts import CONTENT_FILTER_PROMPT
+            from langchain_core.messages import HumanMessage, SystemMessage
             
             # 确保即使某些键不存在也不会出错
             prompt = CONTENT_FILTER_PROMPT.format(
@@ -110,21 +336,58 @@ class LLMClient:
             ]
             
             # Using a fast model for this simple classification task
-            response = await self.thinking_model.ainvoke(messages)
+            content = await self.invoke_cached(
+                self.thinking_model, messages, use_cache=use_cache, ttl=CACHE_TTLS["filter"],
+                validate=lambda text: self._extract_xml_tag_content(text, "result") in ("0", "1"),
+            )
             
             # Directly extract the '0' or '1'
-            decision = self._extract_xml_tag_content(response.content, "result")
+            decision = self._extract_xml_tag_content(content, "result")
             return decision if decision else "0" # Default to filtering out if parsing fails
 
         except Exception as e:
             logger.error(f"LLM请求过滤决策失败: {e}")
             return "0" # Default to filtering out on error
 
+    async def get_raw_filter_decisions_batch(self, posts: List[Dict[str, Any]], use_cache: bool = True) -> List[Optional[str]]:
+        """
+        用一次LLM调用为多篇帖子获取过滤决策。
+        返回与posts等长的列表，每项为 "0"/"1"；响应中缺失或无法识别的项为None，
+        由调用方对这些帖子单独回退到 get_raw_filter_decision。
+        """
+        if not posts:
+            return []
+        logger.info(f"批量请求 {len(posts)} 篇帖子的过滤决策")
+        try:
+            from prompts import CONTENT_FILTER_BATCH_PROMPT
+            from langchain_core.messages import HumanMessage, SystemMessage
+            from utils.parsers import extract_numbered_results
+
+            posts_block = "\n\n".join(
+                f"#### 帖子 {i}\n帖子标题：{post.get('title', 'N/A')}\n帖子内容：{post.get('content', 'N/A')}"
+                for i, post in enumerate(posts, 1)
+            )
+            prompt = CONTENT_FILTER_BATCH_PROMPT.format(count=len(posts), posts_block=posts_block)
+
+            messages = [
+                SystemMessage(content="你是一个内容审核员。你需要逐篇判断社媒帖子是否属于低质量内容（如商业推广、引流、内容空洞），并按编号用<result_i>标签回复0或1。"),
+                HumanMessage(content=prompt)
+            ]
+
+            content = await self.invoke_cached(
+                self.thinking_model, messages, use_cache=use_cache, ttl=CACHE_TTLS["filter"],
+                validate=lambda text: all(r in ("0", "1") for r in extract_numbered_results(text, len(posts))),
+            )
+            results = extract_numbered_results(content, len(posts))
+            return [r if r in ("0", "1") else None for r in results]
+
+        except Exception as e:
+            logger.error(f"LLM批量请求过滤决策失败: {e}")
+            return [None] * len(posts)
+
     def _extract_xml_tag_content(self, content: str, tag: str) -> Optional[str]:
         """通用函数：从XML中提取单个标签的内容"""
-        import re
-        match = re.search(rf'<{tag}>(.*?)</{tag}>', content, re.DOTALL)
-        return match.group(1).strip() if match else None
+        return find_xml_tags(content, [tag]).get(tag)
 
     async def get_raw_hitpoints_response(*args, **kwargs):
         """模拟LLM打点分析返回"""
@@ -135,10 +398,11 @@ class LLMClient:
         logger.info("从LLM响应中解析打点")
         # The prompt asks for <hitpoint1>, <hitpoint2>, etc.
         hitpoints = []
-        for i in range(1, 6): # Assuming max 5 hitpoints
-            tag = f"hitpoint{i}"
-            hitpoint_content = self._extract_xml_tag_content(content, tag)
-            if hitpoint_content and hitpoint_content != "Error: Cannot find hitpoint tags":
+        tags = [f"hitpoint{i}" for i in range(1, 6)] # Assuming max 5 hitpoints
+        found = find_xml_tags(content, tags)
+        for i, tag in enumerate(tags, 1):
+            hitpoint_content = found.get(tag)
+            if hitpoint_content:
                 hitpoints.append({"id": f"hitpoint_{i}", "description": hitpoint_content})
         
         logger.info(f"解析到 {len(hitpoints)} 个打点")
@@ -150,6 +414,7 @@ class LLMClient:
         
         try:
             from prompts import CONTENT_FILTER_PROMPT
+            from langchain_core.messages import HumanMessage, SystemMessage
             
             filtered_posts = []
             
@@ -167,7 +432,7 @@ class LLMClient:
                     HumanMessage(content=prompt)
                 ]
                 
-                response = await self.default_model.ainvoke(messages)
+                response = await self.invoke(self.default_model, messages)
                 content = response.content
                 
                 # 解析质量评分
@@ -187,12 +452,13 @@ class LLMClient:
             logger.error(f"过滤内容失败: {e}")
             return posts
     
-    async def analyze_hitpoints(self, filtered_posts: List[Post]) -> List[Hitpoint]:
+    async def analyze_hitpoints(self, filtered_posts: List[Post], use_cache: bool = True) -> List[Hitpoint]:
         """分析打点"""
         logger.info(f"分析打点: {len(filtered_posts)} 个帖子")
         
         try:
             from prompts import HITPOINT_ANALYSIS_PROMPT
+            from langchain_core.messages import HumanMessage, SystemMessage
             
             # 格式化帖子信息
             posts_summary = self._format_posts_summary(filtered_posts)
@@ -206,8 +472,7 @@ class LLMClient:
                 HumanMessage(content=prompt)
             ]
             
-            response = await self.thinking_model.ainvoke(messages)
-            content = response.content
+            content = await self.invoke_cached(self.thinking_model, messages, use_cache=use_cache, ttl=CACHE_TTLS["hitpoints"])
             
             # 解析打点信息
             hitpoints = self._extract_hitpoints(content)
@@ -218,12 +483,13 @@ class LLMClient:
             logger.error(f"分析打点失败: {e}")
             return []
     
-    async def generate_content(self, user_input: str, selected_hitpoint: Hitpoint) -> GeneratedContent:
+    async def generate_content(self, user_input: str, selected_hitpoint: Hitpoint, use_cache: bool = True) -> GeneratedContent:
         """生成内容"""
         logger.info(f"生成内容: {user_input}")
         
         try:
             from prompts import CONTENT_GENERATION_PROMPT
+            from langchain_core.messages import HumanMessage, SystemMessage
             
             prompt = CONTENT_GENERATION_PROMPT.format(
                 user_input=user_input,
@@ -235,8 +501,7 @@ class LLMClient:
                 HumanMessage(content=prompt)
             ]
             
-            response = await self.default_model.ainvoke(messages)
-            content = response.content
+            content = await self.invoke_cached(self.default_model, messages, use_cache=use_cache, ttl=CACHE_TTLS["generation"])
             
             # 解析生成的内容
             generated_content = self._extract_generated_content(content)
@@ -253,12 +518,68 @@ class LLMClient:
                 quality_score=0.0
             )
     
+    async def stream_content(self, user_input: str, selected_hitpoint: Union[Hitpoint, Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式生成内容。
+        逐块产出 {"type": "delta", "section": "title"|"content"|"tags", "text": ...}，
+        结束时产出 {"type": "done", "title", "content", "tags", "ttft", "elapsed"}，
+        其中 ttft 为首个token的到达时间（秒）。
+        """
+        from utils.parsers import IncrementalContentParser
+        
+        description = (
+            selected_hitpoint.get("description", "") if isinstance(selected_hitpoint, dict)
+            else selected_hitpoint.description
+        )
+        logger.info(f"流式生成内容: {user_input}")
+        
+        if XHS_USE_MOCK:
+            raw_content = await get_raw_content_generation_response(user_input, selected_hitpoint)
+            chunks = _mock_stream(raw_content)
+        else:
+            from prompts import CONTENT_GENERATION_STREAM_PROMPT
+            from langchain_core.messages import HumanMessage, SystemMessage
+            
+            prompt = CONTENT_GENERATION_STREAM_PROMPT.format(
+                user_input=user_input,
+                selected_hitpoint=description
+            )
+            messages = [
+                SystemMessage(content=config.SYSTEM_PROMPT),
+                HumanMessage(content=prompt)
+            ]
+            chunks = self.astream(self.default_model, messages)
+        
+        parser = IncrementalContentParser()
+        start = time.monotonic()
+        ttft = None
+        async for chunk in chunks:
+            if ttft is None:
+                ttft = time.monotonic() - start
+                logger.info(f"首个token到达: {ttft:.2f}s")
+            for section, delta in parser.feed(chunk):
+                yield {"type": "delta", "section": section, "text": delta}
+        for section, delta in parser.close():
+            yield {"type": "delta", "section": section, "text": delta}
+        
+        result = parser.result()
+        elapsed = time.monotonic() - start
+        logger.info(f"流式生成完成，耗时 {elapsed:.2f}s")
+        yield {
+            "type": "done",
+            "title": result["title"] or "生成的内容",
+            "content": result["content"] or parser.raw_text,
+            "tags": result["tags"],
+            "ttft": ttft,
+            "elapsed": elapsed,
+        }
+    
     async def test_connection(self) -> bool:
         """测试API连接"""
         try:
             # 使用LangChain的异步方法进行测试
             from langchain_core.messages import HumanMessage
-            response = await self.default_model.ainvoke([
+            response = await self.invoke(self.default_model, [
                 HumanMessage(content="Hello, this is a test message.")
             ])
             logger.info("LLM API连接测试成功")
@@ -268,21 +589,8 @@ class LLMClient:
             return False
     
     def _extract_keywords_from_xml(self, content: str) -> List[str]:
-        """从XML中提取关键词"""
-        import re
-        
-        keywords = []
-        
-        # 提取topic1和topic2标签
-        topic1_match = re.search(r'<topic1>(.*?)</topic1>', content, re.DOTALL)
-        topic2_match = re.search(r'<topic2>(.*?)</topic2>', content, re.DOTALL)
-        
-        if topic1_match:
-            keywords.append(topic1_match.group(1).strip())
-        if topic2_match:
-            keywords.append(topic2_match.group(1).strip())
-        
-        return keywords
+        """从XML中按编号提取 <topic1>..<topicN> 关键词"""
+        return extract_indexed_tags(content, "topic")
     
     def _extract_refined_keywords(self, content: str) -> List[str]:
         """提取精炼关键词"""
@@ -381,6 +689,12 @@ class LLMClient:
             quality_score=8.0  # 默认评分
         )
 
+async def _mock_stream(text: str, chunk_size: int = 8) -> AsyncIterator[str]:
+    """把模拟响应切成小块，模拟流式输出"""
+    for i in range(0, len(text), chunk_size):
+        await asyncio.sleep(0)
+        yield text[i:i + chunk_size]
+
 async def get_raw_keyword_response(user_input: str) -> str:
     """获取关键词生成的原始LLM响应"""
     if XHS_USE_MOCK:
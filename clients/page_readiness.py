@@ -0,0 +1,181 @@
+"""
+页面就绪等待
+用具体的信号代替固定的 wait_for_timeout：
+- 第一个匹配的XHR响应
+- 网络空闲（有上限）
+- 选择器匹配的元素数量达到目标
+- 无限滚动不再增长
+- 列表元素出现后滚动加载到目标数量（总时长有上限）
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List, Optional, TYPE_CHECKING
+from loguru import logger
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Response
+
+# 网络空闲等待上限（毫秒）
+NETWORK_IDLE_TIMEOUT = 5000
+
+# 每次滚动后等待新数据的上限（秒）
+SCROLL_SETTLE_TIMEOUT = 3.0
+
+# 最多滚动次数
+MAX_SCROLL_ROUNDS = 20
+
+
+class ResponseCollector:
+    """
+    收集页面上URL包含指定路径的XHR/fetch响应的JSON。
+    作为异步上下文管理器使用，退出时移除监听，页面可安全归还到池中。
+    """
+
+    def __init__(self, page: "Page", api_paths: Iterable[str]):
+        self.page = page
+        self.api_paths = tuple(api_paths)
+        self.payloads: List[Dict[str, Any]] = []
+        self.received = 0  # 已读取完的匹配响应数（含读取失败的）
+        self._pending: set = set()
+        self._arrived = asyncio.Event()
+
+    def _matches(self, response: "Response") -> bool:
+        return (
+            response.request.resource_type in ("xhr", "fetch")
+            and any(path in response.url for path in self.api_paths)
+        )
+
+    def _on_response(self, response: "Response") -> None:
+        if self._matches(response):
+            task = asyncio.ensure_future(self._read(response))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _read(self, response: "Response") -> None:
+        try:
+            if response.ok:
+                payload = await response.json()
+                if isinstance(payload, dict):
+                    payload.setdefault("_url", response.url)
+                    self.payloads.append(payload)
+        except Exception as e:
+            logger.debug(f"读取响应 {response.url} 失败: {e}")
+        finally:
+            self.received += 1
+            self._arrived.set()
+
+    async def __aenter__(self) -> "ResponseCollector":
+        self.page.on("response", self._on_response)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.page.remove_listener("response", self._on_response)
+        for task in list(self._pending):
+            task.cancel()
+
+    async def wait_beyond(self, count: int, timeout: float) -> bool:
+        """等待已读取的响应数超过 count，超时返回False"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.received <= count:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), remaining)
+            except asyncio.TimeoutError:
+                return self.received > count
+        return True
+
+    async def wait_first(self, timeout: float) -> bool:
+        """等待第一个匹配的响应，已经收到过时立即返回"""
+        return await self.wait_beyond(0, timeout)
+
+
+async def wait_for_network_idle(page: "Page", timeout: int = NETWORK_IDLE_TIMEOUT) -> bool:
+    """等待网络空闲，最多 timeout 毫秒；页面持续有长连接时不会一直卡住"""
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+
+async def wait_for_selector_count(page: "Page", selector: str, count: int = 1, timeout: int = 10000) -> bool:
+    """等待 selector 匹配的元素数达到 count，超时返回False"""
+    try:
+        await page.wait_for_function(
+            "([selector, count]) => document.querySelectorAll(selector).length >= count",
+            arg=[selector, count],
+            timeout=timeout,
+        )
+        return True
+    except Exception:
+        return False
+
+
+async def scroll_until_stable(
+    page: "Page",
+    done: Callable[[], bool],
+    collector: Optional[ResponseCollector] = None,
+    settle_timeout: float = SCROLL_SETTLE_TIMEOUT,
+    max_rounds: int = MAX_SCROLL_ROUNDS,
+) -> int:
+    """
+    滚动到底部直到 done() 为真或页面不再增长，返回滚动次数。
+    每次滚动后，有 collector 时等待新的XHR响应，否则等待页面高度变化。
+    """
+    rounds = 0
+    height = await page.evaluate("document.body.scrollHeight")
+    while rounds < max_rounds and not done():
+        rounds += 1
+        received = collector.received if collector is not None else 0
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        if collector is not None:
+            grew = await collector.wait_beyond(received, settle_timeout)
+        else:
+            try:
+                await page.wait_for_function(
+                    "height => document.body.scrollHeight > height",
+                    arg=height,
+                    timeout=int(settle_timeout * 1000),
+                )
+                grew = True
+            except Exception:
+                grew = False
+        if not grew:
+            logger.debug(f"第 {rounds} 次滚动后没有新数据，停止滚动")
+            break
+        height = await page.evaluate("document.body.scrollHeight")
+    return rounds
+
+
+async def wait_for_items(
+    page: "Page",
+    selector: str,
+    count: int,
+    timeout: int,
+    settle_timeout: float = SCROLL_SETTLE_TIMEOUT,
+    max_rounds: int = MAX_SCROLL_ROUNDS,
+) -> int:
+    """
+    等第一个匹配元素出现，再滚动加载直到元素数达到 count 或不再增长，返回当前元素数。
+    整个过程不超过 timeout 毫秒，结果少于 count 的页面也能尽快返回。
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout / 1000
+    if not await wait_for_selector_count(page, selector, 1, timeout=timeout):
+        return 0
+    rounds = 0
+    while True:
+        found = await page.evaluate("selector => document.querySelectorAll(selector).length", selector)
+        remaining = deadline - loop.time()
+        if found >= count or rounds >= max_rounds or remaining <= 0:
+            return found
+        rounds += 1
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        wait_ms = int(min(settle_timeout, remaining) * 1000)
+        if not await wait_for_selector_count(page, selector, found + 1, timeout=wait_ms):
+            logger.debug(f"第 {rounds} 次滚动后没有新的 {selector}，停止等待")
+            return found
@@ -0,0 +1,344 @@
+"""
+多用户主页爬取
+给定一批用户ID，按笔记接口的游标逐页抓取每个用户发布的帖子：
+- 多个用户在页面池/HTTP连接池上并发调度，每个域名有并发数和请求间隔限制
+- 每抓到一页就通过异步迭代器产出，调用方可边爬边处理
+- 每个用户的游标和进度写入SQLite，中断后重新执行会从上次的位置继续
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+from loguru import logger
+from config import XHS_USE_MOCK
+from clients.page_readiness import ResponseCollector
+from utils.cache import DEFAULT_CACHE_DIR
+
+if TYPE_CHECKING:
+    from clients.xhs_client import XHSClient
+
+# 用户笔记列表接口，返回 {"data": {"notes": [...], "cursor": "...", "has_more": bool}}
+USER_POSTED_API = "/api/sns/web/v1/user_posted"
+API_DOMAIN = "www.xiaohongshu.com"
+PROFILE_URL = "https://www.xiaohongshu.com/user/profile/{user_id}"
+
+# 每页条数
+PAGE_SIZE = 30
+
+# 每个域名的默认礼貌限制：同时进行的请求数、相邻请求的最小间隔（秒）
+DEFAULT_DOMAIN_CONCURRENCY = 2
+DEFAULT_MIN_INTERVAL = 1.0
+
+# 浏览器模式下每次滚动后等待下一页的上限（秒）
+SCROLL_PAGE_TIMEOUT = 5.0
+
+
+class DomainThrottle:
+    """按域名限制并发数和请求间隔"""
+
+    def __init__(self, concurrency: int = DEFAULT_DOMAIN_CONCURRENCY, min_interval: float = DEFAULT_MIN_INTERVAL):
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, domain: str):
+        """占用域名的一个请求名额，必要时等待到下一个允许的发起时间"""
+        semaphore = self._semaphores.setdefault(domain, asyncio.Semaphore(self.concurrency))
+        async with semaphore:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(domain, 0.0))
+            self._next_start[domain] = start + self.min_interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
+class CrawlProgress:
+    """
+    每个用户的爬取进度：游标、已抓取条数、是否已到主页末尾、是否因 max_posts 停止。
+    游标指向下一次要请求的页；offset 为该页中已产出的条数（按 max_posts 截断在页中间时非0）。
+    数据库在首次读写时打开，close() 之后再次读写会重新打开。
+    """
+
+    # 后来新增的列，旧的进度库打开时补上
+    ADDED_COLUMNS = {
+        "capped": "INTEGER NOT NULL DEFAULT 0",
+        "page_offset": "INTEGER NOT NULL DEFAULT 0",
+    }
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "crawl_progress.sqlite3")
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """返回数据库连接，首次调用时建库建表；调用方需持有 self._lock"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS crawl_progress ("
+                " user_id TEXT PRIMARY KEY,"
+                " cursor TEXT NOT NULL DEFAULT '',"
+                " fetched INTEGER NOT NULL DEFAULT 0,"
+                " done INTEGER NOT NULL DEFAULT 0,"
+                " capped INTEGER NOT NULL DEFAULT 0,"
+                " page_offset INTEGER NOT NULL DEFAULT 0,"
+                " error TEXT,"
+                " updated_at REAL NOT NULL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(crawl_progress)")}
+            for name, ddl in self.ADDED_COLUMNS.items():
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE crawl_progress ADD COLUMN {name} {ddl}")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        """done 表示主页已抓到末尾；capped 表示上次因 max_posts 停止，调大上限后可继续"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT cursor, fetched, done, capped, page_offset, error FROM crawl_progress WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if row is None:
+            return {"cursor": "", "fetched": 0, "done": False, "capped": False, "offset": 0, "error": None}
+        return {"cursor": row[0], "fetched": row[1], "done": bool(row[2]), "capped": bool(row[3]), "offset": row[4], "error": row[5]}
+
+    def update(
+        self,
+        user_id: str,
+        cursor: str,
+        fetched: int,
+        done: bool = False,
+        error: Optional[str] = None,
+        capped: bool = False,
+        offset: int = 0,
+    ) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO crawl_progress (user_id, cursor, fetched, done, capped, page_offset, error, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (user_id, cursor, fetched, int(done), int(capped), offset, error, time.time()),
+            )
+            conn.commit()
+
+    def reset(self, user_id: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM crawl_progress WHERE user_id = ?", (user_id,))
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class ProfileCrawler:
+    """多用户主页爬取器，优先走签名API翻页，失败时用池中的页面滚动翻页"""
+
+    def __init__(
+        self,
+        client: "XHSClient",
+        concurrency: Optional[int] = None,
+        domain_concurrency: int = DEFAULT_DOMAIN_CONCURRENCY,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        progress_path: Optional[str] = None,
+        use_browser_fallback: bool = True,
+    ):
+        """
+        :param client: 复用其HTTP连接池、签名和页面池的 XHSClient
+        :param concurrency: 同时爬取的用户数，默认为页面池容量
+        :param domain_concurrency: 每个域名同时进行的请求数
+        :param min_interval: 同一域名相邻请求的最小间隔（秒）
+        :param progress_path: 进度数据库路径
+        :param use_browser_fallback: API失败时是否改用浏览器页面翻页
+        """
+        self.client = client
+        self.concurrency = concurrency or client._pool.size
+        self.throttle = DomainThrottle(domain_concurrency, min_interval)
+        self.progress = CrawlProgress(progress_path)
+        self.use_browser_fallback = use_browser_fallback
+
+    async def crawl(
+        self,
+        user_ids: Iterable[str],
+        max_posts: Optional[int] = None,
+        restart: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        爬取一批用户，每抓到一页产出一条:
+            {"user_id", "posts", "cursor", "offset", "has_more", "capped", "fetched"}
+        has_more 表示本次爬取该用户还有后续页；capped 表示因 max_posts 停止而非主页已到末尾。
+        某个用户失败时产出 {"user_id", "error", "cursor", "offset", "fetched"}，不影响其他用户。
+        :param max_posts: 每个用户最多抓取的帖子数，None表示抓完；因上限停止的用户在调大上限后会从游标继续
+        :param restart: 忽略已有进度，从头爬取
+        """
+        pending = deque(dict.fromkeys(str(user_id) for user_id in user_ids))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        finished = object()
+
+        async def worker():
+            while pending:
+                user_id = pending.popleft()
+                if restart:
+                    self.progress.reset(user_id)
+                state = self.progress.get(user_id)
+                try:
+                    await self._crawl_user(user_id, state, max_posts, queue)
+                except Exception as e:
+                    logger.error(f"爬取用户 {user_id} 失败: {e}")
+                    await queue.put({"user_id": user_id, "error": str(e), "cursor": state["cursor"], "offset": state["offset"], "fetched": state["fetched"]})
+
+        async def run_workers():
+            try:
+                await asyncio.gather(*[worker() for _ in range(min(self.concurrency, len(pending)) or 1)])
+            finally:
+                await queue.put(finished)
+
+        runner = asyncio.create_task(run_workers())
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                yield item
+                # 调用方处理完这一页后才记录进度，中断时最多重复产出一页，不会丢页
+                if "error" in item:
+                    self.progress.update(item["user_id"], item["cursor"], item["fetched"], error=item["error"], offset=item["offset"])
+                else:
+                    self.progress.update(
+                        item["user_id"], item["cursor"], item["fetched"],
+                        done=not item["has_more"] and not item["capped"], capped=item["capped"], offset=item["offset"],
+                    )
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+            self.progress.close()
+
+    def _emit_page(
+        self,
+        user_id: str,
+        notes: List[Dict],
+        cursor: str,
+        has_more: bool,
+        state: Dict[str, Any],
+        max_posts: Optional[int],
+        skip: int = 0,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        转换一页笔记，返回 (产出项, 是否已完成)；进度在调用方处理完该项后记录。
+        :param skip: 该页前面已产出过的条数
+        按 max_posts 截断在页中间时游标停在该页，记下页内已产出的条数，续爬时重新请求该页并跳过这些条目。
+        """
+        posts = [self.client._user_note_to_post(note) for note in notes[skip:]]
+        truncated = max_posts is not None and len(posts) > max_posts - state["fetched"]
+        if truncated:
+            posts = posts[:max(0, max_posts - state["fetched"])]
+            state["offset"] = skip + len(posts)
+        else:
+            state["cursor"] = cursor
+            state["offset"] = 0
+        state["fetched"] += len(posts)
+        capped = max_posts is not None and state["fetched"] >= max_posts and (truncated or has_more)
+        done = capped or not has_more
+        item = {
+            "user_id": user_id, "posts": posts, "cursor": state["cursor"], "offset": state["offset"],
+            "has_more": not done, "capped": capped, "fetched": state["fetched"],
+        }
+        return item, done
+
+    async def _crawl_user(self, user_id: str, state: Dict[str, Any], max_posts: Optional[int], queue: asyncio.Queue) -> None:
+        if state["done"]:
+            logger.info(f"用户 {user_id} 已爬取完成（{state['fetched']} 篇），跳过")
+            return
+        if max_posts is not None and state["fetched"] >= max_posts:
+            logger.info(f"用户 {user_id} 已抓取 {state['fetched']} 篇，达到上限 {max_posts}，跳过")
+            return
+
+        if XHS_USE_MOCK:
+            result = await self.client._mock_get_user_posts(user_id, max_posts or PAGE_SIZE)
+            posts = result["data"]["posts"]
+            await queue.put({"user_id": user_id, "posts": posts, "cursor": "", "offset": 0, "has_more": False, "capped": False, "fetched": len(posts)})
+            return
+
+        if state["fetched"]:
+            logger.info(f"用户 {user_id} 从游标 {state['cursor']!r} 继续（已抓取 {state['fetched']} 篇）")
+
+        while True:
+            page = await self._fetch_page(user_id, state["cursor"])
+            if page is None:
+                break
+            item, done = self._emit_page(user_id, *page, state, max_posts, skip=state["offset"])
+            await queue.put(item)
+            if done:
+                return
+
+        if not self.use_browser_fallback:
+            raise RuntimeError(f"笔记接口请求失败（游标 {state['cursor']!r}）")
+        logger.info(f"用户 {user_id} 的笔记接口不可用，改用浏览器页面翻页")
+        await self._crawl_user_on_page(user_id, max_posts, state, queue)
+
+    async def _fetch_page(self, user_id: str, cursor: str) -> Optional[Tuple[List[Dict], str, bool]]:
+        """通过签名API取一页笔记，失败返回None"""
+        params = {"num": PAGE_SIZE, "cursor": cursor, "user_id": user_id, "image_formats": "jpg,webp,avif"}
+        async with self.throttle.slot(API_DOMAIN):
+            result = await self.client._make_signed_request(USER_POSTED_API, params)
+        payload = result.get("data") if result.get("success") else None
+        if not isinstance(payload, dict) or not payload.get("success"):
+            return None
+        data = payload.get("data") or {}
+        return data.get("notes", []), str(data.get("cursor", "")), bool(data.get("has_more"))
+
+    async def _crawl_user_on_page(self, user_id: str, max_posts: Optional[int], state: Dict[str, Any], queue: asyncio.Queue) -> None:
+        """
+        在池中的页面上打开用户主页，滚动触发页面自己的翻页请求。
+        页面无法直接跳到游标，续爬时跳过已抓取过的条数。
+        """
+        skip = state["fetched"]
+        seen = 0
+        async with self.client._pool.page() as page:
+            async with ResponseCollector(page, (USER_POSTED_API,)) as collector:
+                async with self.throttle.slot(API_DOMAIN):
+                    await page.goto(PROFILE_URL.format(user_id=user_id), wait_until="domcontentloaded")
+                if not await collector.wait_first(SCROLL_PAGE_TIMEOUT):
+                    raise RuntimeError("主页未返回笔记列表")
+
+                while True:
+                    while collector.payloads:
+                        payload = collector.payloads.pop(0)
+                        data = payload.get("data") or {}
+                        notes = data.get("notes", [])
+                        page_skip = min(len(notes), max(0, skip - seen))
+                        seen += len(notes)
+                        if page_skip == len(notes) and data.get("has_more"):
+                            continue
+                        item, done = self._emit_page(
+                            user_id, notes, str(data.get("cursor", "")), bool(data.get("has_more")), state, max_posts, skip=page_skip,
+                        )
+                        await queue.put(item)
+                        if done:
+                            return
+
+                    received = collector.received
+                    async with self.throttle.slot(API_DOMAIN):
+                        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    if not await collector.wait_beyond(received, SCROLL_PAGE_TIMEOUT):
+                        # 列表不再增长，视为已到底
+                        item, _ = self._emit_page(user_id, [], state["cursor"], False, state, max_posts)
+                        await queue.put(item)
+                        return
@@ -0,0 +1,259 @@
+"""
+LLM调用限流器
+按模型限制并发数和每分钟token预算，遇到限流响应(429)时按AIMD自适应收缩并发，
+并暴露排队深度、等待时间等指标，便于调整配额
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+from loguru import logger
+
+# 每个模型的默认配额，可通过 LLMRateLimiter.configure 单独覆盖
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TOKENS_PER_MINUTE = 200_000
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """判断异常是否为接口限流（HTTP 429）"""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    if type(error).__name__ == "RateLimitError":
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message
+
+
+class _Permit:
+    """一次调用持有的许可，记录预占和实际消耗的token"""
+
+    def __init__(self, reserved_tokens: int):
+        self.reserved_tokens = reserved_tokens
+        self.used_tokens: Optional[int] = None
+        self.rate_limited = False
+
+    def record_usage(self, tokens: Optional[int]) -> None:
+        """记录实际消耗的token，多预占的部分会在释放时退回"""
+        if tokens:
+            self.used_tokens = tokens
+
+
+class ModelLimiter:
+    """
+    单个模型的限流器。
+    - 并发上限按AIMD调整：每次成功加性增长，遇到429乘性减半
+    - token预算为令牌桶，容量为每分钟token数，按秒匀速补充
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        tokens_per_minute: Optional[int] = DEFAULT_TOKENS_PER_MINUTE,
+        min_concurrency: int = 1,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 1.0,
+        max_backoff: float = 30.0,
+    ):
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.max_backoff = max_backoff
+
+        self._limit = float(max_concurrency)
+        self._tokens = float(tokens_per_minute or 0)
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._backoff = 0.0
+        self._backoff_until = 0.0
+        # 条件变量绑定创建它的事件循环，按循环分别创建（如多次 asyncio.run 共用同一个限流器）
+        self._cond: Optional[asyncio.Condition] = None
+        self._cond_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.in_flight = 0
+        self.queue_depth = 0
+        self._requests = 0
+        self._rate_limited = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recent_waits = deque(maxlen=512)
+
+    @property
+    def concurrency_limit(self) -> int:
+        """当前生效的并发上限"""
+        return max(self.min_concurrency, int(self._limit))
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._cond_loop is not loop:
+            self._cond = asyncio.Condition()
+            self._cond_loop = loop
+        return self._cond
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.tokens_per_minute:
+            elapsed = now - self._last_refill
+            self._tokens = min(float(self.tokens_per_minute), self._tokens + elapsed * self.tokens_per_minute / 60.0)
+        self._last_refill = now
+
+    def _delay_for(self, tokens: int) -> float:
+        """距离可以发出本次请求还需等待的秒数"""
+        now = time.monotonic()
+        if now < self._backoff_until:
+            return self._backoff_until - now
+        if not self.tokens_per_minute:
+            return 0.0
+        self._refill()
+        if self._tokens >= tokens:
+            return 0.0
+        return (tokens - self._tokens) * 60.0 / self.tokens_per_minute
+
+    async def acquire(self, tokens: int) -> _Permit:
+        """等待并发名额和token预算，返回许可"""
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+        else:
+            tokens = 0
+        cond = self._condition()
+        start = time.monotonic()
+        self.queue_depth += 1
+        try:
+            while True:
+                async with cond:
+                    await cond.wait_for(lambda: self.in_flight < self.concurrency_limit)
+                    delay = self._delay_for(tokens)
+                    if delay <= 0:
+                        self._tokens -= tokens
+                        self.in_flight += 1
+                        break
+                await asyncio.sleep(delay)
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - start
+        self._requests += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._recent_waits.append(waited)
+        return _Permit(tokens)
+
+    async def release(self, permit: _Permit) -> None:
+        """归还许可，并根据调用结果调整并发上限"""
+        cond = self._condition()
+        async with cond:
+            self.in_flight -= 1
+            if self.tokens_per_minute and permit.used_tokens is not None and permit.used_tokens < permit.reserved_tokens:
+                self._refill()
+                refund = permit.reserved_tokens - permit.used_tokens
+                self._tokens = min(float(self.tokens_per_minute), self._tokens + refund)
+            if permit.rate_limited:
+                self._on_rate_limited()
+            else:
+                self._on_success()
+            cond.notify_all()
+
+    def _on_success(self) -> None:
+        # 加性增长：每累计约 limit 次成功，并发上限 +increase_step
+        self._limit = min(float(self.max_concurrency), self._limit + self.increase_step / max(self._limit, 1.0))
+        self._backoff = 0.0
+
+    def _on_rate_limited(self) -> None:
+        self._rate_limited += 1
+        now = time.monotonic()
+        # 同一波429只收缩一次，避免并发上限被连续减到最低
+        if now - self._last_decrease >= self.decrease_cooldown:
+            self._limit = max(float(self.min_concurrency), self._limit * self.decrease_factor)
+            self._last_decrease = now
+        self._backoff = min(self.max_backoff, self._backoff * 2 if self._backoff else 1.0)
+        self._backoff_until = now + self._backoff
+        logger.warning(
+            f"模型 {self.model_name} 触发限流，并发上限降为 {self.concurrency_limit}，暂停 {self._backoff:.1f}s"
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        """限流指标"""
+        waits = sorted(self._recent_waits)
+        p95 = waits[int(len(waits) * 0.95) - 1] if waits else 0.0
+        if self.tokens_per_minute:
+            self._refill()
+        return {
+            "model": self.model_name,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "concurrency_limit": self.concurrency_limit,
+            "max_concurrency": self.max_concurrency,
+            "tokens_per_minute": self.tokens_per_minute,
+            "tokens_available": int(self._tokens) if self.tokens_per_minute else None,
+            "requests": self._requests,
+            "rate_limited": self._rate_limited,
+            "wait_avg": self._wait_total / self._requests if self._requests else 0.0,
+            "wait_p95": p95,
+            "wait_max": self._wait_max,
+        }
+
+
+class LLMRateLimiter:
+    """按模型名管理 ModelLimiter 的共享限流器"""
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        tokens_per_minute: Optional[int] = DEFAULT_TOKENS_PER_MINUTE,
+    ):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self._overrides: Dict[str, Dict[str, Any]] = {}
+        self._limiters: Dict[str, ModelLimiter] = {}
+
+    def configure(self, model_name: str, **limits) -> None:
+        """
+        覆盖某个模型的配额，例如:
+            limiter.configure("gpt-4o", max_concurrency=4, tokens_per_minute=60000)
+        """
+        self._overrides[model_name] = limits
+        self._limiters.pop(model_name, None)
+
+    def for_model(self, model_name: str) -> ModelLimiter:
+        """获取（必要时创建）模型对应的限流器"""
+        limiter = self._limiters.get(model_name)
+        if limiter is None:
+            limits = {
+                "max_concurrency": self.max_concurrency,
+                "tokens_per_minute": self.tokens_per_minute,
+                **self._overrides.get(model_name, {}),
+            }
+            limiter = ModelLimiter(model_name, **limits)
+            self._limiters[model_name] = limiter
+        return limiter
+
+    @asynccontextmanager
+    async def limit(self, model_name: str, estimated_tokens: int):
+        """
+        在限流下执行一次调用:
+            async with limiter.limit(model_name, estimated_tokens) as permit:
+                response = await model.ainvoke(messages)
+                permit.record_usage(total_tokens)
+        调用体抛出的429异常会被识别并触发退避。
+        """
+        limiter = self.for_model(model_name)
+        permit = await limiter.acquire(estimated_tokens)
+        try:
+            yield permit
+        except BaseException as e:
+            if isinstance(e, Exception) and is_rate_limit_error(e):
+                permit.rate_limited = True
+            raise
+        finally:
+            await limiter.release(permit)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """所有模型的限流指标"""
+        return {name: limiter.metrics() for name, limiter in self._limiters.items()}
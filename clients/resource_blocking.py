@@ -0,0 +1,110 @@
+"""
+浏览器资源拦截
+在浏览器上下文上注册路由，丢弃采集用不到的图片、视频、字体和统计/埋点请求，
+减少带宽和页面加载时间。单个页面可临时放行某些资源类型（如需要图片的详情页）。
+"""
+
+import os
+import urllib.parse
+import weakref
+from typing import Any, Dict, Iterable, Optional, TYPE_CHECKING
+from loguru import logger
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Route, BrowserContext
+
+# 默认拦截的资源类型，可用环境变量 XHS_BLOCK_RESOURCES 覆盖（逗号分隔，none 表示不拦截）
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+
+_env_types = os.getenv("XHS_BLOCK_RESOURCES")
+if _env_types is None:
+    BLOCKED_RESOURCE_TYPES = DEFAULT_BLOCKED_RESOURCE_TYPES
+elif _env_types.strip().lower() in ("", "none"):
+    BLOCKED_RESOURCE_TYPES = ()
+else:
+    BLOCKED_RESOURCE_TYPES = tuple(t.strip() for t in _env_types.split(",") if t.strip())
+
+# 统计/埋点域名，按后缀匹配
+DEFAULT_BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "hm.baidu.com",
+    "cnzz.com",
+    "umeng.com",
+    "sentry.io",
+    "apm-fe.xiaohongshu.com",
+    "t2.xiaohongshu.com",
+)
+
+
+class ResourceBlocker:
+    """按资源类型和域名拦截请求，支持按页面放行"""
+
+    def __init__(
+        self,
+        resource_types: Iterable[str] = BLOCKED_RESOURCE_TYPES,
+        domains: Iterable[str] = DEFAULT_BLOCKED_DOMAINS,
+    ):
+        """
+        :param resource_types: 拦截的Playwright资源类型（image/media/font/stylesheet等）
+        :param domains: 拦截的域名后缀
+        """
+        self.resource_types = frozenset(resource_types)
+        self.domains = tuple(domains)
+        # 页面 -> 该页面临时放行的资源类型；页面被回收后自动移除
+        self._allowed: "weakref.WeakKeyDictionary[Page, frozenset]" = weakref.WeakKeyDictionary()
+        self._stats = {"blocked": 0, "allowed": 0}
+        self._blocked_by_type: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.domains)
+
+    def allow(self, page: "Page", resource_types: Optional[Iterable[str]]) -> None:
+        """页面借出期间放行指定资源类型，传入None清除"""
+        if resource_types:
+            self._allowed[page] = frozenset(resource_types)
+        else:
+            self._allowed.pop(page, None)
+
+    def _blocked_domain(self, url: str) -> bool:
+        host = urllib.parse.urlsplit(url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in self.domains)
+
+    def should_block(self, resource_type: str, url: str, page: Optional["Page"] = None) -> bool:
+        if self._blocked_domain(url):
+            return True
+        if resource_type not in self.resource_types:
+            return False
+        allowed = self._allowed.get(page, ()) if page is not None else ()
+        return resource_type not in allowed
+
+    async def handle(self, route: "Route") -> None:
+        """上下文路由回调"""
+        request = route.request
+        try:
+            page = request.frame.page
+        except Exception:
+            # Service Worker 等没有所属页面的请求
+            page = None
+        if self.should_block(request.resource_type, request.url, page):
+            self._stats["blocked"] += 1
+            self._blocked_by_type[request.resource_type] = self._blocked_by_type.get(request.resource_type, 0) + 1
+            await route.abort()
+        else:
+            self._stats["allowed"] += 1
+            await route.continue_()
+
+    async def install(self, context: "BrowserContext") -> None:
+        """
+        在上下文上注册拦截路由。
+        注意：启用路由后Chromium不再使用HTTP缓存，因此未配置任何拦截时不注册。
+        """
+        if not self.enabled:
+            return
+        await context.route("**/*", self.handle)
+        logger.info(f"已启用资源拦截: 类型 {sorted(self.resource_types)}，{len(self.domains)} 个统计域名")
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "blocked_by_type": dict(self._blocked_by_type)}
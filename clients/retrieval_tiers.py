@@ -0,0 +1,156 @@
+"""
+分层采集策略
+同一份数据依次尝试多种获取方式（签名API -> 页面XHR拦截 -> DOM提取），
+每层有独立的超时，并按各层的历史成功率和耗时自适应调整尝试顺序；
+降级的层会定期按调用方的默认顺序重新探测，恢复后回到前面。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from loguru import logger
+
+# 各层默认超时（秒）
+DEFAULT_TIER_TIMEOUTS = {
+    "api": 8.0,
+    "xhr": 20.0,
+    "dom": 20.0,
+}
+
+# 成功率/耗时的指数滑动平均系数，越大越看重最近的结果
+EWMA_ALPHA = 0.3
+
+# 尚未尝试过的层的先验成功率
+PRIOR_SUCCESS_RATE = 0.5
+
+# 成功率不低于该值的层视为同样可用，按耗时和默认顺序排列；低于该值的才降级
+HEALTHY_SUCCESS_RATE = 0.5
+
+# 每个操作每运行这么多次，按调用方的默认顺序尝试一次，让降级的层有机会恢复
+REPROBE_INTERVAL = 20
+
+
+@dataclass
+class Tier:
+    """一种获取方式：fetch返回None或抛出异常视为失败"""
+    name: str
+    fetch: Callable[[], Awaitable[Optional[Any]]]
+    timeout: Optional[float] = None
+
+
+class TierStats:
+    """单个 (操作, 层) 的统计"""
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.success_rate = PRIOR_SUCCESS_RATE
+        self.latency: Optional[float] = None
+
+    def record(self, success: bool, elapsed: float, timed_out: bool = False) -> None:
+        self.attempts += 1
+        if success:
+            self.successes += 1
+        elif timed_out:
+            self.timeouts += 1
+        else:
+            self.failures += 1
+        self.success_rate += EWMA_ALPHA * ((1.0 if success else 0.0) - self.success_rate)
+        self.latency = elapsed if self.latency is None else self.latency + EWMA_ALPHA * (elapsed - self.latency)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "success_rate": round(self.success_rate, 3),
+            "avg_latency": round(self.latency, 3) if self.latency is not None else None,
+        }
+
+
+class TieredRetriever:
+    """按自适应顺序依次尝试各层，返回第一个成功的结果"""
+
+    def __init__(self, timeouts: Optional[Dict[str, float]] = None, reprobe_interval: int = REPROBE_INTERVAL):
+        """
+        :param timeouts: 各层超时（秒），覆盖 DEFAULT_TIER_TIMEOUTS 中的同名配置
+        :param reprobe_interval: 每个操作每运行多少次按默认顺序重新探测一次，0表示不探测
+        """
+        self.timeouts = {**DEFAULT_TIER_TIMEOUTS, **(timeouts or {})}
+        self.reprobe_interval = reprobe_interval
+        self._stats: Dict[str, Dict[str, TierStats]] = {}
+        self._runs: Dict[str, int] = {}
+
+    def _tier_stats(self, operation: str, tier: str) -> TierStats:
+        return self._stats.setdefault(operation, {}).setdefault(tier, TierStats())
+
+    @staticmethod
+    def _rank(stats: TierStats, index: int):
+        """
+        可用的层（成功率不低于 HEALTHY_SUCCESS_RATE）之间按耗时排序，未尝试过的排在已知耗时的之后；
+        降级的层按成功率排在可用的层之后。
+        """
+        rate = min(round(stats.success_rate, 2), HEALTHY_SUCCESS_RATE)
+        latency = stats.latency if stats.latency is not None else float("inf")
+        return (-rate, latency, index)
+
+    def order(self, operation: str, tiers: List[Tier]) -> List[Tier]:
+        """返回本次的尝试顺序，其余情况保持调用方给出的默认顺序"""
+        def rank(item):
+            index, tier = item
+            return self._rank(self._tier_stats(operation, tier.name), index)
+
+        return [tier for _, tier in sorted(enumerate(tiers), key=rank)]
+
+    async def run(self, operation: str, tiers: List[Tier]) -> Optional[Any]:
+        """依次尝试各层，全部失败返回None；每 reprobe_interval 次按默认顺序尝试一次"""
+        runs = self._runs[operation] = self._runs.get(operation, 0) + 1
+        ordered = self.order(operation, tiers)
+        if self.reprobe_interval and runs % self.reprobe_interval == 0 and ordered != list(tiers):
+            logger.info(f"{operation} 按默认顺序重新探测降级的层")
+            ordered = list(tiers)
+        for tier in ordered:
+            stats = self._tier_stats(operation, tier.name)
+            timeout = tier.timeout if tier.timeout is not None else self.timeouts.get(tier.name)
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(tier.fetch(), timeout)
+            except asyncio.TimeoutError:
+                stats.record(False, time.monotonic() - started, timed_out=True)
+                logger.warning(f"{operation} 的 {tier.name} 层超时（{timeout}s），尝试下一层")
+                continue
+            except Exception as e:
+                stats.record(False, time.monotonic() - started)
+                logger.warning(f"{operation} 的 {tier.name} 层失败: {e}，尝试下一层")
+                continue
+
+            elapsed = time.monotonic() - started
+            if result is None:
+                stats.record(False, elapsed)
+                logger.info(f"{operation} 的 {tier.name} 层未取到数据，尝试下一层")
+                continue
+
+            stats.record(True, elapsed)
+            logger.info(f"{operation} 通过 {tier.name} 层获取成功，用时 {elapsed:.2f}s")
+            return result
+
+        logger.warning(f"{operation} 所有获取方式均失败")
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """各操作下每一层的统计，以及当前的尝试顺序"""
+        result = {}
+        for operation, tiers in self._stats.items():
+            ranked = sorted(
+                enumerate(tiers.items()),
+                key=lambda item: self._rank(item[1][1], item[0]),
+            )
+            result[operation] = {
+                "order": [name for _, (name, _) in ranked],
+                "tiers": {name: stats.to_dict() for name, stats in tiers.items()},
+            }
+        return result
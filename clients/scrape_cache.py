@@ -0,0 +1,130 @@
+"""
+采集结果缓存
+为 XHSClient 的搜索/检索/热搜接口提供按接口TTL的持久化缓存：
+- 过期后的一段时间内先返回旧数据，同时在后台刷新（stale-while-revalidate）
+- 同一键的并发请求只触发一次采集（single-flight）
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from loguru import logger
+from utils.cache import TieredCache, make_cache_key
+
+# 各接口的缓存有效期（秒）
+SCRAPE_CACHE_TTLS = {
+    "search_topics": 10 * 60,
+    "retrieve_posts": 15 * 60,
+    "get_trending_topics": 5 * 60,
+}
+
+# 默认有效期，用于未在 SCRAPE_CACHE_TTLS 中配置的接口
+DEFAULT_SCRAPE_TTL = 10 * 60
+
+# 过期后仍可返回旧数据并后台刷新的时间窗口（秒）
+DEFAULT_STALE_TTL = 60 * 60
+
+
+class ScrapeCache:
+    """采集结果的 TTL + SWR + single-flight 缓存"""
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        stale_ttl: float = DEFAULT_STALE_TTL,
+        max_entries: int = 512,
+        path: Optional[str] = None,
+    ):
+        """
+        :param ttls: 各接口的有效期，覆盖 SCRAPE_CACHE_TTLS 中的同名配置
+        :param stale_ttl: 过期后仍返回旧数据并后台刷新的时间窗口
+        :param max_entries: 内存层最大条目数
+        :param path: SQLite文件路径
+        """
+        self.ttls = {**SCRAPE_CACHE_TTLS, **(ttls or {})}
+        self.stale_ttl = stale_ttl
+        self._cache = TieredCache("scrape_results", max_entries=max_entries, path=path)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, endpoint: str, name: str) -> None:
+        counters = self._stats.setdefault(
+            endpoint,
+            {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "errors": 0},
+        )
+        counters[name] += 1
+
+    async def get_or_fetch(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        按 (endpoint, params) 读取缓存，未命中时调用fetch采集。
+        fetch返回None表示采集失败，结果不会被缓存。
+        """
+        key = make_cache_key(endpoint, params)
+        entry = await self._cache.aget_entry(key)
+        if entry is not None:
+            value, expires_at = entry
+            now = time.time()
+            if expires_at is None or expires_at > now:
+                self._count(endpoint, "hits")
+                return value
+            if now - expires_at < self.stale_ttl:
+                self._count(endpoint, "stale_hits")
+                self._refresh_in_background(endpoint, key, fetch)
+                return value
+
+        self._count(endpoint, "misses")
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count(endpoint, "coalesced")
+        else:
+            task = self._start_fetch(endpoint, key, fetch)
+        # shield: 单个调用方被取消时不影响其他等待同一次采集的调用方
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._fetch_and_store(endpoint, key, fetch))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _fetch_and_store(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+        except Exception:
+            self._count(endpoint, "errors")
+            raise
+        if value is None:
+            self._count(endpoint, "errors")
+        else:
+            await self._cache.aset(key, value, ttl=self.ttls.get(endpoint, DEFAULT_SCRAPE_TTL))
+        return value
+
+    def _refresh_in_background(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._inflight:
+            return
+        self._count(endpoint, "refreshes")
+        task = self._start_fetch(endpoint, key, fetch)
+
+        def _log_failure(t: asyncio.Task) -> None:
+            if not t.cancelled() and t.exception() is not None:
+                logger.warning(f"后台刷新 {endpoint} 缓存失败: {t.exception()}")
+
+        task.add_done_callback(_log_failure)
+
+    def invalidate(self, endpoint: str, params: Dict[str, Any]) -> None:
+        """删除某个缓存条目"""
+        self._cache.delete(make_cache_key(endpoint, params))
+
+    def stats(self) -> Dict[str, Any]:
+        """各接口的命中/未命中统计，以及底层缓存统计"""
+        endpoints = {}
+        for endpoint, counters in self._stats.items():
+            served = counters["hits"] + counters["stale_hits"]
+            total = served + counters["misses"]
+            endpoints[endpoint] = {**counters, "hit_rate": served / total if total else 0.0}
+        return {"endpoints": endpoints, "storage": self._cache.stats(), "inflight": len(self._inflight)}
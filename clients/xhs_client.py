@@ -6,53 +6,116 @@
 import asyncio
 import json
 import re
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Iterable, Optional, Any, AsyncIterator, TYPE_CHECKING
 from loguru import logger
-try:
-    from playwright.async_api import async_playwright, Page, BrowserContext, Playwright
-except ImportError:
-    # Mock模式下不需要playwright
-    async_playwright = None
-    Page = None
-    BrowserContext = None
-    Playwright = None
+if TYPE_CHECKING:
+    # playwright 由 BrowserPool 在首次采集时导入，Mock模式下不需要
+    from playwright.async_api import Page, BrowserContext
 from config import config
+from clients.browser_pool import BrowserPool, DEFAULT_USER_AGENT
+from clients.resource_blocking import ResourceBlocker, BLOCKED_RESOURCE_TYPES, DEFAULT_BLOCKED_DOMAINS
+from clients.scrape_cache import ScrapeCache
+from clients.retrieval_tiers import Tier, TieredRetriever
+from utils.counts import parse_count, normalize_counts
+from clients.page_readiness import (
+    NETWORK_IDLE_TIMEOUT,
+    ResponseCollector,
+    scroll_until_stable,
+    wait_for_items,
+    wait_for_network_idle,
+    wait_for_selector_count,
+)
 import time
 import hashlib
 import urllib.parse
 from config import XHS_USE_MOCK
 
+# 搜索话题/帖子的签名API路径，页面XHR拦截时也按这些路径匹配
+TOPIC_SEARCH_API = "/api/sns/web/v1/search/topic"
+POST_SEARCH_API = "/api/sns/web/v1/search/notes"
+
+# 热搜榜可能出现的API路径
+TRENDING_API_PATHS = (
+    "/api/v2/search/hot_list",
+    "/api/sns/web/v1/search/hot_list",
+    "/api/sns/web/v1/hot_list",
+)
+
+# 用户主页笔记列表的接口路径
+USER_NOTES_API_PATHS = ("/api/sns/web/v1/user_posted", "/user/notes", "/user/posted")
+
+# DOM中的帖子卡片和热搜条目
+POST_CARD_SELECTOR = "[data-id], .note-item, .post-item"
+TRENDING_ITEM_SELECTOR = ".hot-item, .trending-item, .hot-list-item, .hot-board-item, .hot-topic-item"
+
+# 等待笔记卡片最多占DOM层超时的比例，其余留给导航和提取
+DOM_WAIT_SHARE = 0.5
+
+SEARCH_PAGE_URL = "https://www.xiaohongshu.com/search_result?keyword={keyword}"
+HOT_BOARD_URL = "https://www.xiaohongshu.com/hot-board"
+
 class XHSClient:
     """
     使用 Playwright 控制真实浏览器来采集小红书数据的客户端。
     这能有效绕过反爬虫机制，如 x-s, x-t 签名。
     """
-    _playwright: Optional[Playwright] = None
-    _browser: Optional[BrowserContext] = None
     
-    def __init__(self, headless: bool = True):
+    def __init__(
+        self,
+        headless: bool = True,
+        max_contexts: int = 2,
+        pages_per_context: int = 4,
+        max_navigations_per_page: int = 50,
+        timeout: float = 15.0,
+        max_connections: int = 32,
+        max_keepalive_connections: int = 16,
+        max_connections_per_host: int = 8,
+        tier_timeouts: Optional[Dict[str, float]] = None,
+        blocked_resource_types: Iterable[str] = BLOCKED_RESOURCE_TYPES,
+        blocked_domains: Iterable[str] = DEFAULT_BLOCKED_DOMAINS,
+    ):
         """
         初始化客户端
         :param headless: 是否以无头模式运行浏览器，调试时建议设为 False
+        :param max_contexts: 页面池中最大浏览器上下文数
+        :param pages_per_context: 每个上下文中最多可复用的页面数
+        :param max_navigations_per_page: 页面导航多少次后回收重建
+        :param timeout: 签名API请求超时（秒）
+        :param max_connections: HTTP连接池总连接数上限
+        :param max_keepalive_connections: 保持长连接的空闲连接数上限
+        :param max_connections_per_host: 每个域名同时进行的请求数上限
+        :param tier_timeouts: 分层采集各层超时（秒），如 {"api": 5, "xhr": 15, "dom": 15}
+        :param blocked_resource_types: 页面中拦截的资源类型，传空元组不拦截
+        :param blocked_domains: 拦截的统计/埋点域名
         """
         self.headless = headless
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.max_connections_per_host = max_connections_per_host
+        # 签名API请求复用的HTTP客户端，首次请求时创建，shutdown时关闭
+        # HTTP客户端的连接和各域名的信号量都绑定创建时的事件循环，循环变化时（如多次 asyncio.run）重新创建
+        self._http = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pool = BrowserPool(
+            headless=headless,
+            max_contexts=max_contexts,
+            pages_per_context=pages_per_context,
+            max_navigations_per_page=max_navigations_per_page,
+            context_setup=self._setup_context,
+            resource_blocker=ResourceBlocker(blocked_resource_types, blocked_domains),
+        )
+        # 搜索/检索/热搜结果缓存，进程重启后仍可命中
+        self.scrape_cache = ScrapeCache()
+        # 签名API -> XHR拦截 -> DOM提取，按成功率自适应排序
+        self._tiers = TieredRetriever(tier_timeouts)
 
-    async def _get_browser_context(self) -> BrowserContext:
+    async def _setup_context(self, context: "BrowserContext") -> None:
         """
-        初始化并返回一个带有Cookie的浏览器上下文。
-        使用单例模式确保全局只有一个浏览器实例。
+        为新建的浏览器上下文设置Cookie。
+        由页面池在创建每个上下文时调用。
         """
-        if self._browser and self._browser.pages:
-            return self._browser
-
-        logger.info("正在启动并初始化浏览器...")
-        self._playwright = await async_playwright().start()
-        browser = await self._playwright.chromium.launch(headless=self.headless)
-
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-
         if config.XHS_COOKIE:
             logger.info("正在为浏览器设置Cookie...")
             try:
@@ -64,8 +127,17 @@ class XHSClient:
         else:
             logger.warning("未在.env中找到XHS_COOKIE，将以未登录状态访问，可能影响采集效果。")
 
-        self._browser = context
-        return self._browser
+    def pool_stats(self) -> Dict[str, Any]:
+        """页面池统计信息"""
+        return self._pool.stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """采集结果缓存的命中统计"""
+        return self.scrape_cache.stats()
+
+    def retrieval_stats(self) -> Dict[str, Any]:
+        """分层采集各层的成功率、耗时和当前尝试顺序"""
+        return self._tiers.stats()
 
     def _parse_cookie_string(self, cookie_string: str) -> List[Dict[str, any]]:
         cookies = []
@@ -83,27 +155,94 @@ class XHSClient:
                 })
         return cookies
 
-    async def _intercept_api_response(self, page: Page, api_path: str, timeout: int = 30000) -> Optional[Dict]:
+    async def _intercept_api_response(self, page: "Page", api_path, timeout: int = 30000, url: Optional[str] = None) -> Optional[Dict]:
+        """
+        等待第一个URL包含 api_path 的响应并返回其JSON，api_path 可以是多个路径组成的元组。
+        传入 url 时先开始监听再导航，避免错过页面加载时发出的请求。
+        """
+        api_paths = (api_path,) if isinstance(api_path, str) else tuple(api_path)
         try:
             async with page.expect_response(
-                lambda response: api_path in response.url,
+                lambda response: any(path in response.url for path in api_paths),
                 timeout=timeout
             ) as response_info:
-                response = await response_info.value
-                if response.ok:
-                    return await response.json()
-                else:
-                    logger.error(f"API请求失败: {response.status} {response.status_text}")
-                    return None
+                if url:
+                    await page.goto(url, wait_until="domcontentloaded")
+            response = await response_info.value
+            if response.ok:
+                return await response.json()
+            else:
+                logger.error(f"API请求失败: {response.status} {response.status_text}")
+                return None
         except Exception as e:
-            logger.error(f"等待API '{api_path}' 响应超时或发生错误: {e}")
+            logger.warning(f"等待API {api_paths} 响应超时或发生错误: {e}")
             try:
                 content = await page.content()
-                logger.error(f"页面当前内容:\n{content[:2000]}") # 打印前2000个字符以防过长
+                logger.debug(f"页面当前内容:\n{content[:2000]}") # 打印前2000个字符以防过长
             except Exception as page_err:
-                logger.error(f"获取页面内容时也发生错误: {page_err}")
+                logger.debug(f"获取页面内容时也发生错误: {page_err}")
             return None
 
+    @staticmethod
+    def _api_items(payload: Optional[Dict], keys) -> List[Dict]:
+        """从 {"success": ..., "data": {...}} 形式的API响应中取出第一个非空列表字段"""
+        if not isinstance(payload, dict) or payload.get("success") is False:
+            return []
+        data = payload.get("data") or {}
+        for key in keys:
+            items = data.get(key)
+            if isinstance(items, list) and items:
+                return items
+        return []
+
+    @staticmethod
+    def _normalize_topics(items: List[Dict], limit: int) -> List[Dict]:
+        """把API/DOM中的话题条目统一为 {name, view_num, hot, trend}"""
+        topics = []
+        for item in items:
+            name = item.get("title") or item.get("name") or ""
+            if not name:
+                continue
+            view_num = item.get("explore_num_text", item.get("view_num", item.get("view_count", "0")))
+            topics.append({
+                "name": name,
+                "view_num": str(view_num),
+                "hot": bool(item.get("hot", True)),
+                "trend": item.get("trend", ""),
+            })
+        return topics[:limit]
+
+    @staticmethod
+    def _normalize_note(note: Dict) -> Dict:
+        """把搜索API的笔记或DOM提取的帖子统一为 parse_xhs_posts 能解析的条目"""
+        card = note.get("note_card") or note
+        interact = card.get("interact_info") or {}
+        user = card.get("user") or {}
+        tags = [tag.get("name") for tag in card.get("tag_list", []) if tag.get("name")]
+        return {
+            "id": note.get("id") or card.get("note_id", ""),
+            "title": card.get("display_title") or card.get("title", ""),
+            "content": card.get("desc") or card.get("content", ""),
+            "author": user.get("nickname") or card.get("author", ""),
+            "likes": parse_count(interact.get("liked_count", card.get("likes", 0))),
+            "comments": parse_count(interact.get("comment_count", card.get("comments", 0))),
+            "shares": parse_count(interact.get("share_count", card.get("shares", 0))),
+            "views": parse_count(card.get("views", 0)),
+            "tags": tags or card.get("tags", []),
+            "images": card.get("images", []),
+        }
+
+    def _xhr_timeout_ms(self) -> int:
+        return int(self._tiers.timeouts["xhr"] * 1000)
+
+    def _dom_wait_ms(self) -> int:
+        """DOM层等待卡片的上限，留出导航和提取的时间，不会被层超时取消"""
+        return int(self._tiers.timeouts["dom"] * 1000 * DOM_WAIT_SHARE)
+
+    async def _wait_for_post_cards(self, page: "Page", limit: int) -> int:
+        """等首张笔记卡片出现后滚动加载到limit张或不再增长，返回卡片数"""
+        return await wait_for_items(page, POST_CARD_SELECTOR, limit, timeout=self._dom_wait_ms())
+
     async def search_topics(self, keyword: str, limit: int = 10) -> Optional[str]:
         """搜索话题"""
         logger.info(f"开始使用Playwright搜索话题: {keyword}")
@@ -112,8 +251,63 @@ class XHSClient:
             logger.info("全局Mock开关已开启，强制使用模拟数据")
             return self._get_mock_topics_data(keyword)
         
-        # 真实搜索逻辑...
-        return None
+        return await self.scrape_cache.get_or_fetch(
+            "search_topics",
+            {"keyword": keyword, "limit": limit},
+            lambda: self._scrape_topics(keyword, limit),
+        )
+
+    async def _scrape_topics(self, keyword: str, limit: int) -> Optional[str]:
+        """分层采集话题，返回 {"topics": [...]} 形式的JSON字符串，失败返回None"""
+        topics = await self._tiers.run("search_topics", [
+            Tier("api", lambda: self._topics_via_api(keyword, limit)),
+            Tier("xhr", lambda: self._topics_via_xhr(keyword, limit)),
+            Tier("dom", lambda: self._topics_via_dom(keyword, limit)),
+        ])
+        if topics is None:
+            return None
+        return json.dumps({"topics": topics}, ensure_ascii=False)
+
+    async def _topics_via_api(self, keyword: str, limit: int) -> Optional[List[Dict]]:
+        result = await self._make_signed_request(TOPIC_SEARCH_API, {"keyword": keyword, "page": 1, "page_size": limit})
+        if not result.get("success"):
+            return None
+        items = self._api_items(result["data"], ("topic_info_dtos", "topics", "items"))
+        return self._normalize_topics(items, limit) or None
+
+    async def _topics_via_xhr(self, keyword: str, limit: int) -> Optional[List[Dict]]:
+        url = SEARCH_PAGE_URL.format(keyword=urllib.parse.quote(keyword))
+        async with self._pool.page() as page:
+            payload = await self._intercept_api_response(page, TOPIC_SEARCH_API, timeout=self._xhr_timeout_ms(), url=url)
+        items = self._api_items(payload, ("topic_info_dtos", "topics", "items"))
+        return self._normalize_topics(items, limit) or None
+
+    async def _topics_via_dom(self, keyword: str, limit: int) -> Optional[List[Dict]]:
+        """从搜索结果页的笔记标签中统计话题，按出现次数排序"""
+        url = SEARCH_PAGE_URL.format(keyword=urllib.parse.quote(keyword))
+        async with self._pool.page() as page:
+            await page.goto(url, wait_until="domcontentloaded")
+            await self._wait_for_post_cards(page, limit)
+            names = await page.evaluate("""
+                () => {
+                    const names = [];
+                    document.querySelectorAll('a[href*="/page/topics/"], .tag, [class*="topic"]').forEach(el => {
+                        const text = el.textContent?.trim();
+                        if (text) names.push(text);
+                    });
+                    (document.body.textContent.match(/#[^#\\s]{2,20}/g) || []).forEach(tag => names.push(tag));
+                    return names;
+                }
+            """)
+        counts: Dict[str, int] = {}
+        for name in names:
+            name = name.lstrip("#").strip()
+            if 1 < len(name) < 50:
+                counts[name] = counts.get(name, 0) + 1
+        ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+        # DOM里拿不到浏览量，与API层一样走 _normalize_topics，view_num 为 "0"
+        items = [{"name": name, "view_num": "0", "hot": False} for name, _ in ranked]
+        return self._normalize_topics(items, limit) or None
 
     async def retrieve_posts(self, keyword: str, limit: int = 10) -> Optional[str]:
         """检索帖子"""
@@ -123,8 +317,45 @@ class XHSClient:
             logger.info("全局Mock开关已开启，强制使用模拟数据")
             return self._get_mock_posts_data(keyword)
         
-        # 真实检索逻辑...
-        return None
+        return await self.scrape_cache.get_or_fetch(
+            "retrieve_posts",
+            {"keyword": keyword, "limit": limit},
+            lambda: self._scrape_posts(keyword, limit),
+        )
+
+    async def _scrape_posts(self, keyword: str, limit: int) -> Optional[str]:
+        """分层检索帖子，返回 {"data": {"items": [...]}} 形式的JSON字符串，失败返回None"""
+        posts = await self._tiers.run("retrieve_posts", [
+            Tier("api", lambda: self._posts_via_api(keyword, limit)),
+            Tier("xhr", lambda: self._posts_via_xhr(keyword, limit)),
+            Tier("dom", lambda: self._posts_via_dom(keyword, limit)),
+        ])
+        if posts is None:
+            return None
+        return json.dumps({"data": {"items": posts}}, ensure_ascii=False)
+
+    async def _posts_via_api(self, keyword: str, limit: int) -> Optional[List[Dict]]:
+        result = await self._make_signed_request(POST_SEARCH_API, {"keyword": keyword, "page": 1, "page_size": limit, "sort": "general"})
+        if not result.get("success"):
+            return None
+        items = self._api_items(result["data"], ("items", "notes"))
+        return [self._normalize_note(item) for item in items[:limit]] or None
+
+    async def _posts_via_xhr(self, keyword: str, limit: int) -> Optional[List[Dict]]:
+        url = SEARCH_PAGE_URL.format(keyword=urllib.parse.quote(keyword))
+        async with self._pool.page() as page:
+            payload = await self._intercept_api_response(page, POST_SEARCH_API, timeout=self._xhr_timeout_ms(), url=url)
+        items = self._api_items(payload, ("items", "notes"))
+        return [self._normalize_note(item) for item in items[:limit]] or None
+
+    async def _posts_via_dom(self, keyword: str, limit: int) -> Optional[List[Dict]]:
+        url = SEARCH_PAGE_URL.format(keyword=urllib.parse.quote(keyword))
+        async with self._pool.page() as page:
+            await page.goto(url, wait_until="domcontentloaded")
+            if not await self._wait_for_post_cards(page, limit):
+                return None
+            posts = await self._extract_posts_from_dom(page, limit)
+        return [self._normalize_note(post) for post in posts] or None
 
     async def get_user_posts(self, user_id: str, limit: int = 20) -> dict:
         logger.info(f"开始使用Playwright获取用户帖子: {user_id}")
@@ -134,106 +365,88 @@ class XHSClient:
         if not config.XHS_COOKIE:
             logger.warning("未配置XHS_COOKIE，使用模拟数据")
             return await self._mock_get_user_posts(user_id, limit)
-        context = await self._get_browser_context()
-        page = await context.new_page()
-        try:
-            # 监听所有XHR请求，寻找包含用户帖子的API响应
-            api_responses = []
-            
-            def handle_response(response):
-                if response.request.resource_type == "xhr":
-                    url = response.url
-                    if any(path in url for path in ["user", "notes", "profile", "posted"]):
-                        api_responses.append({
-                            "url": url,
-                            "response": response
-                        })
-            
-            page.on("response", handle_response)
-            
-            # 访问用户主页
+        async with self._pool.page() as page:
+            return await self._get_user_posts_on_page(page, user_id, limit)
+
+    @staticmethod
+    def _user_note_to_post(note: Dict) -> Dict:
+        """把用户主页笔记API的条目转换为帖子字典"""
+        interact = note.get("interact_info", {})
+        return {
+            "id": note.get("note_id", note.get("id", "")),
+            "title": note.get("display_title", note.get("title", "")),
+            "content": note.get("desc", note.get("content", "")),
+            "author": note.get("user", {}).get("nickname", ""),
+            "likes": parse_count(interact.get("liked_count", 0)),
+            "comments": parse_count(interact.get("comment_count", 0)),
+            "shares": parse_count(interact.get("share_count", 0)),
+            "images": [img.get("url", "") for img in note.get("cover", {}).get("image_list", [])]
+        }
+
+    @staticmethod
+    def _notes_from_payload(payload: Dict) -> List[Dict]:
+        if not payload.get("success"):
+            return []
+        data = payload.get("data") or {}
+        return data.get("notes", []) or data.get("items", []) or data.get("user_notes", [])
+
+    def crawl_users(self, user_ids: Iterable[str], max_posts: Optional[int] = None, restart: bool = False, **options) -> AsyncIterator[Dict[str, Any]]:
+        """
+        批量爬取多个用户的主页帖子，按页流式产出，中断后重新调用会从上次进度继续:
+            async for page in xhs_client.crawl_users(["uid1", "uid2"], max_posts=100):
+                ...
+        options 透传给 ProfileCrawler（如 concurrency、min_interval、progress_path）。
+        """
+        from clients.profile_crawler import ProfileCrawler
+        return ProfileCrawler(self, **options).crawl(user_ids, max_posts=max_posts, restart=restart)
+
+    async def _get_user_posts_on_page(self, page: "Page", user_id: str, limit: int) -> dict:
+        """在借出的页面上采集用户帖子：首个笔记响应到达即开始解析，凑够limit立即返回"""
+        posts: List[Dict] = []
+        seen = set()
+
+        def collect(collector: ResponseCollector) -> bool:
+            """把已到达的响应解析为帖子，凑够limit返回True"""
+            while collector.payloads and len(posts) < limit:
+                for note in self._notes_from_payload(collector.payloads.pop(0)):
+                    post = self._user_note_to_post(note)
+                    key = post["id"] or post["title"]
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    posts.append(post)
+                    if len(posts) >= limit:
+                        break
+            return len(posts) >= limit
+
+        async with ResponseCollector(page, USER_NOTES_API_PATHS) as collector:
             await page.goto(f"https://www.xiaohongshu.com/user/profile/{user_id}", wait_until="domcontentloaded")
-            
-            # 等待页面加载完成
-            await page.wait_for_timeout(3000)
-            
-            # 模拟用户滚动行为，触发更多API请求
-            for i in range(3):
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000)
-                
-                # 尝试点击"全部笔记"或类似按钮
-                try:
-                    buttons = await page.query_selector_all("button, a")
-                    for button in buttons:
-                        text = await button.text_content()
-                        if text and any(keyword in text for keyword in ["全部", "笔记", "动态", "发布"]):
-                            await button.click()
-                            await page.wait_for_timeout(2000)
-                            break
-                except Exception:
-                    pass
-            
-            # 等待一段时间让API响应完成
-            await page.wait_for_timeout(5000)
-            
-            # 分析收集到的API响应
-            for api_data in api_responses:
-                try:
-                    response = api_data["response"]
-                    if response.ok:
-                        json_data = await response.json()
-                        if json_data and json_data.get("success"):
-                            # 尝试不同的数据结构
-                            notes = (json_data.get("data", {})
-                                    .get("notes", []) or 
-                                    json_data.get("data", {})
-                                    .get("items", []) or
-                                    json_data.get("data", {})
-                                    .get("user_notes", []))
-                            
-                            if notes:
-                                posts = []
-                                for note in notes[:limit]:
-                                    post = {
-                                        "id": note.get("note_id", note.get("id", "")),
-                                        "title": note.get("display_title", note.get("title", "")),
-                                        "content": note.get("desc", note.get("content", "")),
-                                        "author": note.get("user", {}).get("nickname", ""),
-                                        "likes": str(note.get("interact_info", {}).get("liked_count", 0)),
-                                        "comments": str(note.get("interact_info", {}).get("comment_count", 0)),
-                                        "shares": str(note.get("interact_info", {}).get("share_count", 0)),
-                                        "images": [img.get("url", "") for img in note.get("cover", {}).get("image_list", [])]
-                                    }
-                                    posts.append(post)
-                                
-                                if posts:
-                                    logger.info(f"成功从API {api_data['url']} 获取到 {len(posts)} 篇用户帖子")
-                                    return {"success": True, "data": {"posts": posts, "user_id": user_id, "total": len(posts)}}
-                except Exception as e:
-                    logger.debug(f"解析API响应失败: {e}")
-                    continue
-            
-            # 如果API方法失败，尝试直接从页面DOM提取
-            logger.info("尝试从页面DOM直接提取用户帖子...")
-            posts = await self._extract_posts_from_dom(page, limit)
-            if posts:
-                return {"success": True, "data": {"posts": posts, "user_id": user_id, "total": len(posts)}}
-            
-            logger.warning(f"未能通过Playwright采集到用户 '{user_id}' 的帖子，将使用模拟数据。")
-            return await self._mock_get_user_posts(user_id, limit)
-        finally:
-            await page.close()
+
+            # 等首个笔记接口响应，随后滚动加载下一页，直到凑够limit或列表不再增长
+            if await collector.wait_first(self._tiers.timeouts["xhr"]):
+                await scroll_until_stable(page, done=lambda: collect(collector), collector=collector)
+                collect(collector)
+
+        if posts:
+            logger.info(f"成功从API获取到 {len(posts)} 篇用户帖子")
+            return {"success": True, "data": {"posts": posts, "user_id": user_id, "total": len(posts)}}
+
+        # 如果API方法失败，尝试直接从页面DOM提取
+        logger.info("尝试从页面DOM直接提取用户帖子...")
+        posts = await self._extract_posts_from_dom(page, limit) if await self._wait_for_post_cards(page, limit) else []
+        if posts:
+            return {"success": True, "data": {"posts": posts, "user_id": user_id, "total": len(posts)}}
+
+        logger.warning(f"未能通过Playwright采集到用户 '{user_id}' 的帖子，将使用模拟数据。")
+        return await self._mock_get_user_posts(user_id, limit)
     
     async def _extract_posts_from_dom(self, page, limit: int = 20) -> List[Dict]:
         """从页面DOM中直接提取帖子信息"""
         try:
-            # 等待帖子容器加载
-            await page.wait_for_selector("[data-id], .note-item, .post-item", timeout=10000)
-            
+            # 调用方已通过 _wait_for_post_cards 等到卡片加载
             # 执行JavaScript提取帖子信息
             posts_data = await page.evaluate("""
-                () => {
+                (limit) => {
                     const posts = [];
                     // 尝试多种选择器
                     const selectors = [
@@ -248,7 +461,7 @@ class XHSClient:
                         const elements = document.querySelectorAll(selector);
                         if (elements.length > 0) {
                             elements.forEach((el, index) => {
-                                if (index >= 20) return; // 限制数量
+                                if (index >= limit) return; // 限制数量
                                 
                                 const post = {
                                     id: el.getAttribute('data-id') || el.getAttribute('href')?.split('/').pop() || '',
@@ -275,9 +488,10 @@ class XHSClient:
                     }
                     return posts;
                 }
-            """)
+            """, limit)
             
-            return posts_data[:limit]
+            # textContent 是 "1.2万" 这样的文本
+            return [normalize_counts(post) for post in posts_data[:limit]]
         except Exception as e:
             logger.debug(f"从DOM提取帖子失败: {e}")
             return []
@@ -290,62 +504,52 @@ class XHSClient:
         if not config.XHS_COOKIE:
             logger.warning("未配置XHS_COOKIE，使用模拟数据")
             return await self._mock_get_trending_topics()
-        context = await self._get_browser_context()
-        page = await context.new_page()
-        try:
-            # 首先尝试API拦截方法
-            api_paths = [
-                "/api/v2/search/hot_list",
-                "/api/sns/web/v1/search/hot_list",
-                "/api/sns/web/v1/hot_list"
-            ]
-            
-            urls = [
-                "https://www.xiaohongshu.com/hot-board",
-                "https://www.xiaohongshu.com/explore",
-                "https://www.xiaohongshu.com"
-            ]
-            
-            api_success = False
-            for url in urls:
-                for api_path in api_paths:
-                    try:
-                        logger.info(f"尝试API路径: {api_path} 在页面: {url}")
-                        task = asyncio.create_task(self._intercept_api_response(page, api_path, timeout=20000))
-                        await page.goto(url, wait_until="domcontentloaded")
-                        # 等待页面完全加载
-                        await page.wait_for_timeout(3000)
-                        api_data = await task
-                        if api_data and api_data.get("success"):
-                            items = api_data.get("data", {}).get("items", [])
-                            if not items:
-                                items = api_data.get("data", {}).get("topics", [])  # 尝试其他字段名
-                            if items:
-                                topics = [{"name": item.get("title", item.get("name", "")), "view_num": item.get("explore_num_text", item.get("view_num", "0")), "hot": True, "trend": item.get("trend", "")} for item in items]
-                                logger.info(f"成功通过API获取到 {len(topics)} 个热搜")
-                                return {"success": True, "data": {"topics": topics, "total": len(topics)}}
-                    except Exception as e:
-                        logger.debug(f"热搜榜API路径 {api_path} 在页面 {url} 失败: {e}")
-                        continue
-            
-            # 如果API方法全部失败，尝试直接从页面DOM提取热搜榜
-            logger.info("所有API方法失败，尝试从页面DOM直接提取热搜榜...")
-            topics = await self._extract_trending_from_dom(page)
-            if topics:
-                logger.info(f"成功从DOM提取到 {len(topics)} 个热搜")
-                return {"success": True, "data": {"topics": topics, "total": len(topics)}}
-            
-            logger.warning("未能通过Playwright采集到热搜榜数据，将使用模拟数据。")
-            return await self._mock_get_trending_topics()
-        finally:
-            await page.close()
+        result = await self.scrape_cache.get_or_fetch("get_trending_topics", {}, self._scrape_trending_topics)
+        if result:
+            return result
+        
+        logger.warning("未能通过Playwright采集到热搜榜数据，将使用模拟数据。")
+        return await self._mock_get_trending_topics()
+
+    async def _scrape_trending_topics(self) -> Optional[Dict[str, Any]]:
+        """分层采集热搜榜，失败返回None"""
+        topics = await self._tiers.run("get_trending_topics", [
+            Tier("api", self._trending_via_api),
+            Tier("xhr", self._trending_via_xhr),
+            Tier("dom", self._trending_via_dom),
+        ])
+        if topics is None:
+            return None
+        return {"success": True, "data": {"topics": topics, "total": len(topics)}}
+
+    async def _trending_via_api(self) -> Optional[List[Dict]]:
+        """同时请求所有候选路径，按路径顺序取第一个有数据的"""
+        results = await asyncio.gather(*[self._make_signed_request(path, {}) for path in TRENDING_API_PATHS])
+        for result in results:
+            if result.get("success"):
+                topics = self._normalize_topics(self._api_items(result["data"], ("items", "topics")), 50)
+                if topics:
+                    return topics
+        return None
+
+    async def _trending_via_xhr(self) -> Optional[List[Dict]]:
+        """打开一次热搜页，等待任一候选路径的响应"""
+        async with self._pool.page() as page:
+            payload = await self._intercept_api_response(page, TRENDING_API_PATHS, timeout=self._xhr_timeout_ms(), url=HOT_BOARD_URL)
+        return self._normalize_topics(self._api_items(payload, ("items", "topics")), 50) or None
+
+    async def _trending_via_dom(self) -> Optional[List[Dict]]:
+        async with self._pool.page() as page:
+            return await self._extract_trending_from_dom(page) or None
     
     async def _extract_trending_from_dom(self, page) -> List[Dict]:
         """从页面DOM中直接提取热搜榜信息"""
         try:
             # 尝试访问热搜榜页面
-            await page.goto("https://www.xiaohongshu.com/hot-board", wait_until="domcontentloaded")
-            await page.wait_for_timeout(3000)
+            await page.goto(HOT_BOARD_URL, wait_until="domcontentloaded")
+            # 出现任一热搜条目即可提取；都没有时等网络空闲后走页面文本兜底
+            if not await wait_for_selector_count(page, TRENDING_ITEM_SELECTOR, 1, timeout=NETWORK_IDLE_TIMEOUT):
+                await wait_for_network_idle(page)
             
             # 执行JavaScript提取热搜信息
             topics_data = await page.evaluate("""
@@ -447,11 +651,11 @@ class XHSClient:
 
     async def get_note_download_url(self, note_id: str) -> dict:
         logger.info(f"尝试从帖子详情页获取下载链接: {note_id}")
-        context = await self._get_browser_context()
-        page = await context.new_page()
         try:
-            await page.goto(f"https://www.xiaohongshu.com/explore/{note_id}", wait_until="domcontentloaded")
-            content = await page.content()
+            # 详情页需要图片资源，借出期间放行图片
+            async with self._pool.page(allow_resources=("image",)) as page:
+                await page.goto(f"https://www.xiaohongshu.com/explore/{note_id}", wait_until="domcontentloaded")
+                content = await page.content()
             m = re.search(r'"imageList":(\[.*?\])', content)
             if m:
                 # 简单的字符串替换来修复不规范的JSON
@@ -461,26 +665,21 @@ class XHSClient:
             return {"success": False, "error": "未在页面中找到图片列表"}
         except Exception as e:
             return {"success": False, "error": str(e)}
-        finally:
-            await page.close()
 
     async def shutdown(self):
-        """优雅关闭浏览器和Playwright实例"""
+        """优雅关闭页面池、浏览器、Playwright实例和HTTP客户端"""
         try:
-            if self._browser:
-                await self._browser.close()
-                self._browser = None
-                logger.info("浏览器上下文已关闭。")
+            await self._pool.close()
         except Exception as e:
-            logger.warning(f"关闭浏览器时出现异常: {e}")
+            logger.warning(f"关闭页面池时出现异常: {e}")
         
-        try:
-            if self._playwright:
-                await self._playwright.stop()
-                self._playwright = None
-                logger.info("Playwright实例已停止。")
-        except Exception as e:
-            logger.warning(f"停止Playwright时出现异常: {e}")
+        if self._http is not None:
+            try:
+                await self._http.aclose()
+            except Exception as e:
+                logger.warning(f"关闭HTTP客户端时出现异常: {e}")
+            self._http = None
+            self._http_loop = None
         
         # 强制清理asyncio资源
         try:
@@ -743,6 +942,54 @@ class XHSClient:
         
         return xs, xt
 
+    def _get_http_client(self):
+        """
+        返回长期复用的 httpx.AsyncClient：连接保持keep-alive，安装了h2时启用HTTP/2。
+        所有签名API请求共用，连接的TCP/TLS握手只在首次请求时发生。
+        """
+        self._bind_http_loop()
+        if self._http is None:
+            import importlib.util
+            import httpx
+
+            http2 = importlib.util.find_spec("h2") is not None
+            headers = {"User-Agent": DEFAULT_USER_AGENT, "Referer": "https://www.xiaohongshu.com/"}
+            if config.XHS_COOKIE:
+                headers["Cookie"] = config.XHS_COOKIE
+            self._http = httpx.AsyncClient(
+                http2=http2,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=60.0,
+                ),
+                headers=headers,
+            )
+            logger.info(f"签名API HTTP客户端已创建 (HTTP/2: {http2})")
+        return self._http
+
+    def _bind_http_loop(self) -> None:
+        """运行中的事件循环与创建HTTP客户端时不同时，丢弃旧循环上的客户端和信号量"""
+        loop = asyncio.get_running_loop()
+        if self._http_loop is loop:
+            return
+        if self._http is not None:
+            # 旧循环已结束，连接无法在当前循环上关闭，直接丢弃
+            logger.info("事件循环已变化，重新创建签名API HTTP客户端")
+            self._http = None
+        self._host_semaphores = {}
+        self._http_loop = loop
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        """每个域名一个信号量，限制对同一域名的并发请求数"""
+        self._bind_http_loop()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
     async def _make_signed_request(self, api_path: str, params: dict):
         """
         发送带有 x-s 和 x-t 签名的请求
@@ -757,7 +1004,8 @@ class XHSClient:
         url = f"https://www.xiaohongshu.com{api_path}"
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            client = self._get_http_client()
+            async with self._host_semaphore(urllib.parse.urlsplit(url).netloc):
                 resp = await client.get(url, headers=headers, params=params)
                 if resp.status_code == 200:
                     try:
@@ -772,7 +1020,7 @@ class XHSClient:
             return {"success": False, "error": str(e)}
     
     async def analyze_content(self, posts: List[Dict]) -> Dict[str, Any]:
-        """分析帖子内容"""
+        """分析帖子内容：互动数据按列向量化统计，主题用词表单次扫描归类"""
         logger.info(f"分析内容: {len(posts)} 个帖子")
         
         if not posts:
@@ -781,36 +1029,9 @@ class XHSClient:
                 "error": "没有帖子数据可供分析"
             }
         
-        # 分析热门标签
-        all_tags = []
-        for post in posts:
-            if "tags" in post:
-                all_tags.extend(post["tags"])
-        
-        tag_counts = {}
-        for tag in all_tags:
-            tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        # 分析互动数据
-        total_likes = sum(int(post.get("likes", 0)) for post in posts)
-        total_comments = sum(int(post.get("comments", 0)) for post in posts)
-        total_shares = sum(int(post.get("shares", 0)) for post in posts)
-        
-        # 找出最热门的帖子
-        hot_posts = sorted(posts, key=lambda x: int(x.get("likes", 0)), reverse=True)[:3]
-        
-        analysis_result = {
-            "total_posts": len(posts),
-            "total_likes": total_likes,
-            "total_comments": total_comments,
-            "total_shares": total_shares,
-            "avg_likes": total_likes // len(posts) if posts else 0,
-            "avg_comments": total_comments // len(posts) if posts else 0,
-            "avg_shares": total_shares // len(posts) if posts else 0,
-            "hot_tags": sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:10],
-            "hot_posts": hot_posts,
-            "content_themes": self._extract_content_themes(posts)
-        }
+        # numpy 只在分析时才需要
+        from utils.analytics import PostFrame
+        analysis_result = PostFrame.from_posts(posts).summary(top_k=3)
         
         return {
             "success": True,
@@ -819,29 +1040,9 @@ class XHSClient:
         }
     
     def _extract_content_themes(self, posts: List[Dict]) -> List[str]:
-        """提取内容主题"""
-        themes = []
-        for post in posts:
-            content = post.get("content", "").lower()
-            if "健身" in content or "运动" in content:
-                themes.append("健身运动")
-            elif "美食" in content or "探店" in content:
-                themes.append("美食探店")
-            elif "护肤" in content or "美妆" in content:
-                themes.append("护肤美妆")
-            elif "旅行" in content or "旅游" in content:
-                themes.append("旅行分享")
-            elif "穿搭" in content or "时尚" in content:
-                themes.append("时尚穿搭")
-            else:
-                themes.append("生活分享")
-        
-        # 统计主题频率
-        theme_counts = {}
-        for theme in themes:
-            theme_counts[theme] = theme_counts.get(theme, 0) + 1
-        
-        return sorted(theme_counts.items(), key=lambda x: x[1], reverse=True)
+        """提取内容主题，返回按帖子数降序的 (主题, 帖子数)"""
+        from utils.analytics import default_theme_matcher
+        return default_theme_matcher.count(post.get("content", "").lower() for post in posts)
 
     def _get_mock_topics_data(self, keyword: str) -> str:
         """获取模拟话题数据"""
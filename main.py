@@ -6,10 +6,13 @@
 import asyncio
 import argparse
 import json
+import os
 import sys
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Iterator, Optional, Set, Tuple
 from loguru import logger
 from workflow import agent
+from models import WorkflowStatus
 from config import config
 from clients import llm_client
 
@@ -45,46 +48,56 @@ async def test_llm_connection():
         logger.error("❌ LLM API连接测试失败")
         return False
 
+def _field(obj: Any, key: str) -> Any:
+    """读取状态中字典或pydantic模型的字段"""
+    if isinstance(obj, dict):
+        return obj.get(key)
+    return getattr(obj, key, None)
+
 async def run_workflow(user_input: str, config_id: str = None) -> Dict[str, Any]:
     """运行工作流"""
     try:
         logger.info(f"开始处理用户请求: {user_input}")
         
-        # 运行工作流
-        result = await agent.run(user_input, config_id)
+        # 运行工作流；指定config_id时写入检查点，中断后可用同一config_id恢复
+        if config_id:
+            result = await agent.run_with_checkpoint(user_input, config_id)
+        else:
+            result = await agent.run(user_input, config_id)
+        
+        # agent.run/run_with_checkpoint 返回状态字典
+        result = result or {}
+        current_state = result.get("current_state") or WorkflowStatus.ERROR.value
+        current_state = getattr(current_state, "value", current_state)
         
         # 构建响应
         response = {
-            "success": result.current_state != "error",
+            "success": current_state != WorkflowStatus.ERROR.value,
             "user_input": user_input,
-            "current_state": result.current_state.value if hasattr(result.current_state, 'value') else str(result.current_state),
-            "error_message": result.error_message,
+            "current_state": current_state,
+            "error_message": result.get("error_message") or None,
             "generated_content": None,
             "hitpoints": [],
             "statistics": {
-                "total_posts_processed": result.total_posts_processed,
-                "total_hitpoints_generated": result.total_hitpoints_generated
+                "total_posts_processed": result.get("total_posts_processed", 0),
+                "total_hitpoints_generated": result.get("total_hitpoints_generated", 0)
             }
         }
         
-        # 添加生成的内容
-        if result.generated_content:
+        # 添加生成的内容；节点可能写入模型或字典
+        generated_content = result.get("generated_content")
+        if generated_content:
             response["generated_content"] = {
-                "title": result.generated_content.title,
-                "content": result.generated_content.content,
-                "tags": result.generated_content.tags,
-                "quality_score": result.generated_content.quality_score
+                key: _field(generated_content, key)
+                for key in ("title", "content", "tags", "quality_score")
             }
         
         # 添加打点信息
-        if result.hitpoints:
+        hitpoints = result.get("hitpoints") or []
+        if hitpoints:
             response["hitpoints"] = [
-                {
-                    "id": hp.id,
-                    "title": hp.title,
-                    "description": hp.description
-                }
-                for hp in result.hitpoints
+                {key: _field(hp, key) for key in ("id", "title", "description")}
+                for hp in hitpoints
             ]
         
         logger.info("工作流执行完成")
@@ -99,6 +112,94 @@ async def run_workflow(user_input: str, config_id: str = None) -> Dict[str, Any]
             "current_state": "error"
         }
 
+# 批量模式默认同时运行的工作流数
+BATCH_CONCURRENCY = 8
+
+def iter_batch_items(input_path: str) -> Iterator[Tuple[str, str]]:
+    """
+    逐行读取批量输入JSONL，产出 (item_id, user_input)
+    每行可用 input/user_input/body 字段作为需求描述，id/request_id 作为ID，缺省时用行号
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"跳过第 {line_no} 行，JSON解析失败: {e}")
+                continue
+            if isinstance(item, str):
+                item = {"input": item}
+            user_input = item.get("input") or item.get("user_input") or item.get("body")
+            if not user_input:
+                logger.warning(f"跳过第 {line_no} 行，缺少 input 字段")
+                continue
+            yield str(item.get("id") or item.get("request_id") or line_no), str(user_input)
+
+def load_completed_ids(output_path: str) -> Set[str]:
+    """读取已有输出文件中成功完成的ID，用于断点续跑"""
+    completed: Set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 上次中断时可能留下半行
+                continue
+            if record.get("success"):
+                completed.add(str(record.get("id")))
+    return completed
+
+async def run_batch(input_path: str, output_path: Optional[str] = None, concurrency: int = BATCH_CONCURRENCY) -> Dict[str, int]:
+    """
+    批量运行工作流
+    流式读取输入，最多同时运行concurrency个工作流，每完成一个立即追加写入输出JSONL；
+    输出中已成功的ID会被跳过，每条以 batch:<id> 作为检查点ID，中断后重跑可从断点继续。
+    LLM和采集缓存由全局客户端在各运行之间共享。
+    """
+    output_path = output_path or f"{os.path.splitext(input_path)[0]}.results.jsonl"
+    completed = load_completed_ids(output_path)
+    if completed:
+        logger.info(f"断点续跑：跳过 {len(completed)} 条已完成的输入")
+
+    stats = {"succeeded": 0, "failed": 0, "skipped": 0}
+    started = time.monotonic()
+
+    async def run_item(item_id: str, user_input: str) -> Dict[str, Any]:
+        result = await run_workflow(user_input, config_id=f"batch:{item_id}")
+        return {"id": item_id, **result}
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        def write_done(done: Set[asyncio.Task]):
+            for task in done:
+                record = task.result()
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                stats["succeeded" if record.get("success") else "failed"] += 1
+            out.flush()
+            finished = stats["succeeded"] + stats["failed"]
+            logger.info(f"批量进度: 完成 {finished} 条（失败 {stats['failed']}），用时 {time.monotonic() - started:.1f}s")
+
+        pending: Set[asyncio.Task] = set()
+        for item_id, user_input in iter_batch_items(input_path):
+            if item_id in completed:
+                stats["skipped"] += 1
+                continue
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                write_done(done)
+            pending.add(asyncio.create_task(run_item(item_id, user_input)))
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            write_done(done)
+
+    logger.info(f"批量运行结束: {stats}，结果写入 {output_path}")
+    return stats
+
 def print_result(result: Dict[str, Any]):
     """打印结果"""
     print("\n" + "="*50)
@@ -148,6 +249,9 @@ async def main():
     parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
     parser.add_argument("--interactive", action="store_true", help="交互模式")
     parser.add_argument("--test", action="store_true", help="测试LLM连接")
+    parser.add_argument("--batch", metavar="FILE.jsonl", help="批量模式：逐行读取JSONL输入并发运行")
+    parser.add_argument("--output", help="批量模式的结果JSONL路径，默认 <输入文件名>.results.jsonl")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="批量模式同时运行的工作流数")
     
     args = parser.parse_args()
     
@@ -179,7 +283,12 @@ async def main():
             print("❌ LLM连接失败，请检查配置")
             sys.exit(1)
         
-        if args.interactive:
+        if args.batch:
+            # 批量模式
+            stats = await run_batch(args.batch, args.output, args.concurrency)
+            print(f"✅ 批量运行结束: 成功 {stats['succeeded']}，失败 {stats['failed']}，跳过 {stats['skipped']}")
+        
+        elif args.interactive:
             # 交互模式
             print("🎉 欢迎使用小红书起号智能助手！")
             print("请输入您的起号需求，输入 'quit' 退出")
@@ -228,6 +337,7 @@ async def main():
             print("  python main.py --interactive")
             print("  python main.py '美食分享' --json")
             print("  python main.py --test")
+            print("  python main.py --batch inputs.jsonl --concurrency 16")
     
     except Exception as e:
         logger.error(f"程序执行失败: {e}")
@@ -3,10 +3,12 @@
 定义工作流状态、数据结构等
 """
 
-from typing import List, Dict, Any, Optional, Union
+from dataclasses import dataclass, fields
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
 from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
+from utils.counts import parse_count
 
 class WorkflowStatus(str, Enum):
     """工作流状态枚举"""
@@ -65,6 +67,96 @@ class Post(BaseModel):
             return 0.0
         return (self.likes + self.comments + self.shares) / self.views
 
+@dataclass(init=False)
+class PostRecord:
+    """
+    流水线内部使用的轻量帖子记录：从解析到过滤都用它，只在API边界转换为 Post。
+    使用 __slots__，不做校验，也不为每个实例生成时间戳；
+    支持 get/[]/in/keys 等字典式访问，原先按字典处理帖子的代码无需修改。
+    """
+    __slots__ = ("id", "title", "content", "author", "likes", "comments", "shares", "views", "quality_score", "tags")
+
+    id: str
+    title: str
+    content: str
+    author: str
+    likes: int
+    comments: int
+    shares: int
+    views: int
+    quality_score: float
+    tags: List[str]
+
+    def __init__(self, id: str = "", title: str = "", content: str = "", author: str = "",
+                 likes: int = 0, comments: int = 0, shares: int = 0, views: int = 0,
+                 quality_score: float = 0.0, tags: Optional[List[str]] = None):
+        self.id = id
+        self.title = title
+        self.content = content
+        self.author = author
+        self.likes = likes
+        self.comments = comments
+        self.shares = shares
+        self.views = views
+        self.quality_score = quality_score
+        self.tags = tags if tags is not None else []
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PostRecord":
+        """从帖子字典构建，互动数转为整数，未知字段忽略"""
+        return cls(
+            id=str(data.get("id") or ""),
+            title=data.get("title") or "",
+            content=data.get("content") or "",
+            author=data.get("author") or "",
+            likes=parse_count(data.get("likes", 0)),
+            comments=parse_count(data.get("comments", 0)),
+            shares=parse_count(data.get("shares", 0)),
+            views=parse_count(data.get("views", 0)),
+            quality_score=float(data.get("quality_score") or 0.0),
+            tags=list(data.get("tags") or []),
+        )
+
+    # 字典式访问
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.__slots__
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((key, getattr(self, key)) for key in self.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+    def to_post(self, **overrides: Any) -> "Post":
+        """转换为 pydantic Post，供API响应和对外接口使用"""
+        data = self.to_dict()
+        data["tags"] = list(self.tags)
+        data.update(overrides)
+        return Post(**data)
+
+    @property
+    def engagement_rate(self) -> float:
+        """计算互动率"""
+        if self.views == 0:
+            return 0.0
+        return (self.likes + self.comments + self.shares) / self.views
+
 class Hitpoint(BaseModel):
     """打点分析模型"""
     id: str = Field(..., description="打点ID")
@@ -126,24 +218,21 @@ class WorkflowState(BaseModel):
     keywords: List[Keyword] = Field(default_factory=list, description="生成的关键词")
     primary_keyword: Optional[str] = Field(default=None, description="主要关键词")
     secondary_keyword: Optional[str] = Field(default=None, description="次要关键词")
+    search_keywords: List[str] = Field(default_factory=list, description="主题搜索关键词")
     refined_keywords: List[str] = Field(default_factory=list, description="精炼关键词")
     
     # 话题搜索
     topics: List[Topic] = Field(default_factory=list, description="搜索的话题")
     search_results: Dict[str, Any] = Field(default_factory=dict, description="搜索结果")
-    topic_search_result_1: Optional[str] = Field(default=None, description="话题搜索结果1")
-    topic_search_result_2: Optional[str] = Field(default=None, description="话题搜索结果2")
-    formatted_topics_1: Optional[str] = Field(default=None, description="格式化话题结果1")
-    formatted_topics_2: Optional[str] = Field(default=None, description="格式化话题结果2")
+    topic_search_results: Dict[str, str] = Field(default_factory=dict, description="各关键词的话题搜索结果")
+    formatted_topics: Dict[str, str] = Field(default_factory=dict, description="各关键词的格式化话题结果")
     combined_topic_results: Optional[str] = Field(default=None, description="合并话题结果")
     
     # 帖子检索
     retrieved_posts: List[Post] = Field(default_factory=list, description="检索的帖子")
     filtered_posts: List[Post] = Field(default_factory=list, description="过滤后的帖子")
-    post_retrieval_result_1: Optional[str] = Field(default=None, description="帖子检索结果1")
-    post_retrieval_result_2: Optional[str] = Field(default=None, description="帖子检索结果2")
-    parsed_posts_1: List[Dict[str, Any]] = Field(default_factory=list, description="解析的帖子1")
-    parsed_posts_2: List[Dict[str, Any]] = Field(default_factory=list, description="解析的帖子2")
+    post_retrieval_results: Dict[str, str] = Field(default_factory=dict, description="各关键词的帖子检索结果")
+    parsed_posts: Dict[str, List[Dict[str, Any]]] = Field(default_factory=dict, description="各关键词解析的帖子")
     
     # 打点分析
     hitpoints: List[Hitpoint] = Field(default_factory=list, description="打点分析")
@@ -6,39 +6,24 @@
 from .content_generation import content_generation_node
 from .hitpoint_analysis import hitpoint_analysis_node
 from .keyword_generation import keyword_generation_node
-from .post_retrieval import (
-    post_retrieval_node_1, 
-    post_retrieval_node_2, 
-    parse_posts_node_1, 
-    parse_posts_node_2, 
-    combine_post_results_node
-)
+from .post_retrieval import post_retrieval_node, combine_post_results_node
 from .topic_refinement import topic_refinement_node
-from .topic_search import (
-    topic_search_node_1, 
-    topic_search_node_2, 
-    format_topics_node_1, 
-    format_topics_node_2, 
-    combine_topic_results_node
-)
+from .topic_search import topic_search_node, combine_topic_results_node
 from .user_selection import user_selection_node
 from .content_filtering import content_filtering_and_selection_node
+from .speculative import speculative_keyword_generation_node, speculative_topic_refinement_node
 
 __all__ = [
     "content_generation_node",
     "hitpoint_analysis_node",
     "keyword_generation_node",
-    "post_retrieval_node_1",
-    "post_retrieval_node_2",
-    "parse_posts_node_1",
-    "parse_posts_node_2",
+    "post_retrieval_node",
     "combine_post_results_node",
     "topic_refinement_node",
-    "topic_search_node_1",
-    "topic_search_node_2",
-    "format_topics_node_1",
-    "format_topics_node_2",
+    "topic_search_node",
     "combine_topic_results_node",
     "user_selection_node",
     "content_filtering_and_selection_node",
+    "speculative_keyword_generation_node",
+    "speculative_topic_refinement_node",
 ] 
\ No newline at end of file
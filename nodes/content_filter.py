@@ -5,7 +5,7 @@
 
 from typing import Dict, Any, List
 from loguru import logger
-from models import WorkflowStatus, Post, PostQuality
+from models import WorkflowStatus, Post, PostQuality, PostRecord
 from workflow_types import WorkflowState
 from clients import llm_client
 
@@ -35,7 +35,9 @@ async def content_filter_node(state: WorkflowState) -> WorkflowState:
         filtered_posts = []
         for post_dict in state.retrieved_posts:
             # 将字典转换为Post对象
-            if isinstance(post_dict, dict):
+            if isinstance(post_dict, PostRecord):
+                post = post_dict.to_post()
+            elif isinstance(post_dict, dict):
                 post = Post(
                     id=post_dict.get("id", "unknown"),
                     title=post_dict.get("title", "未知标题"),
@@ -59,7 +61,9 @@ async def content_filter_node(state: WorkflowState) -> WorkflowState:
         # 如果过滤后为空，强制保留第一个帖子
         if not filtered_posts and state.retrieved_posts:
             first_post_dict = state.retrieved_posts[0]
-            if isinstance(first_post_dict, dict):
+            if isinstance(first_post_dict, PostRecord):
+                first_post = first_post_dict.to_post()
+            elif isinstance(first_post_dict, dict):
                 first_post = Post(
                     id=first_post_dict.get("id", "unknown"),
                     title=first_post_dict.get("title", "未知标题"),
@@ -6,11 +6,52 @@ from typing import Dict, Any, List
 from loguru import logger
 from clients import llm_client
 from utils.parsers import filter_and_select_articles
+from utils.prefilter import default_prefilter
+
+# 批量过滤时每次LLM调用打包的帖子数，设为1则退回逐篇过滤
+FILTER_BATCH_SIZE = 10
+
+async def _get_filter_decisions(posts: List[Dict[str, Any]], batch_size: int = FILTER_BATCH_SIZE) -> List[str]:
+    """
+    获取所有帖子的过滤决策。
+    先按batch_size分批，每批一次LLM调用；批量响应中缺失结果的帖子再逐篇回退调用。
+    """
+    if batch_size <= 1:
+        return list(await asyncio.gather(*[llm_client.get_raw_filter_decision(post) for post in posts]))
+
+    batches = [posts[i:i + batch_size] for i in range(0, len(posts), batch_size)]
+    batch_results = await asyncio.gather(*[llm_client.get_raw_filter_decisions_batch(batch) for batch in batches])
+    decisions = [decision for batch in batch_results for decision in batch]
+
+    missing = [i for i, decision in enumerate(decisions) if decision is None]
+    if missing:
+        logger.warning(f"批量过滤缺失 {len(missing)} 个结果，逐篇回退")
+        fallback = await asyncio.gather(*[llm_client.get_raw_filter_decision(posts[i]) for i in missing])
+        for i, decision in zip(missing, fallback):
+            decisions[i] = decision
+
+    return decisions
+
+async def _prefilter_then_llm(posts: List[Dict[str, Any]]) -> List[str]:
+    """
+    先用规则预过滤：明显的引流/推广和空帖子直接判为 "0"，
+    其余拿不准的帖子再交给LLM，结果按原顺序合并。
+    """
+    results = default_prefilter.check_all(posts)
+    ambiguous = [i for i, result in enumerate(results) if result.decision is None]
+    logger.info(f"规则预过滤: {len(posts) - len(ambiguous)} 篇已判定，{len(ambiguous)} 篇交给LLM")
+
+    decisions = [result.decision for result in results]
+    if ambiguous:
+        llm_decisions = await _get_filter_decisions([posts[i] for i in ambiguous])
+        for i, decision in zip(ambiguous, llm_decisions):
+            decisions[i] = decision
+    return decisions
 
 async def content_filtering_and_selection_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     一个合并了循环过滤和筛选的节点。
-    1. 并行过滤所有检索到的帖子。
+    1. 规则预过滤，只把拿不准的帖子分批并行交给LLM过滤。
     2. 根据过滤结果选择最终的文章。
     """
     logger.info("开始并行内容过滤和选择")
@@ -22,9 +63,8 @@ async def content_filtering_and_selection_node(state: Dict[str, Any]) -> Dict[st
         state["selected_posts_summary"] = "没有找到合适的帖子。"
         return state
 
-    # 1. 并行执行所有帖子的过滤决策
-    tasks = [llm_client.get_raw_filter_decision(post) for post in original_posts]
-    filter_decisions = await asyncio.gather(*tasks)
+    # 1. 规则预过滤 + 分批并行执行剩余帖子的过滤决策
+    filter_decisions = await _prefilter_then_llm(original_posts)
     state["filter_decisions"] = filter_decisions
     
     logger.info(f"获取了 {len(filter_decisions)} 个帖子的过滤决策")
@@ -7,6 +7,7 @@ from typing import Dict, Any
 from loguru import logger
 from models import WorkflowStatus, GeneratedContent
 from clients import llm_client
+from utils.parsers import parse_generated_content
 
 async def content_generation_node(state: 'WorkflowState') -> 'WorkflowState':
     """内容生成节点"""
@@ -40,20 +41,11 @@ async def content_generation_node(state: 'WorkflowState') -> 'WorkflowState':
         raw_content = await get_raw_content_generation_response(user_input, selected_hitpoint)
         
         if raw_content:
-            # 解析生成的内容
-            lines = raw_content.strip().split('\n')
-            title = ""
-            content = ""
-            tags = []
-            
-            for line in lines:
-                if line.startswith("标题："):
-                    title = line.replace("标题：", "").strip()
-                elif line.startswith("正文："):
-                    content = line.replace("正文：", "").strip()
-                elif line.startswith("Hashtag:"):
-                    tag_line = line.replace("Hashtag:", "").strip()
-                    tags = [tag.strip() for tag in tag_line.split("#") if tag.strip()]
+            # 解析生成的内容（与流式生成共用同一个分节解析器）
+            parsed = parse_generated_content(raw_content)
+            title = parsed["title"]
+            content = parsed["content"]
+            tags = parsed["tags"]
             
             generated_content = GeneratedContent(
                 title=title or "生成的内容",
@@ -3,12 +3,30 @@
 基于精炼后的话题关键词检索相关帖子
 """
 import asyncio
+import json
+import os
 from typing import Dict, Any, Optional, List
 from loguru import logger
-from models import WorkflowStatus
+from config import XHS_USE_MOCK
+from models import WorkflowStatus, PostRecord
 from clients import xhs_client, llm_client
 from utils.parsers import parse_articles_from_response, parse_xhs_posts, parse_markdown_posts
+from utils.corpus_store import get_corpus_store
+from utils.dedup import deduplicate_posts
 from workflow_types import WorkflowState
+from nodes.topic_search import get_search_keywords
+
+# 同时进行的关键词检索数
+MAX_PARALLEL_RETRIEVALS = 4
+
+# 每个关键词检索的帖子数
+POST_RETRIEVAL_LIMIT = 10
+
+# 语料库中该关键词的帖子在多少秒内入库过就直接使用，设为0则总是重新采集
+CORPUS_MAX_AGE = float(os.getenv("CORPUS_MAX_AGE", str(6 * 60 * 60)))
+
+# 直接使用语料库所需的最少帖子数
+CORPUS_MIN_POSTS = 5
 
 async def llm_generate_hot_posts(keyword: str) -> str:
     """LLM兜底生成热点帖子markdown表格"""
@@ -47,95 +65,103 @@ async def _retrieve_single_topic_posts(keyword: str) -> Optional[str]:
     if not keyword:
         return None
     logger.info(f"正在通过XHS API检索帖子: {keyword}")
-    response = await xhs_client.retrieve_posts(keyword, limit=10)
+    response = await xhs_client.retrieve_posts(keyword, limit=POST_RETRIEVAL_LIMIT)
     # 直接返回响应字符串，因为模拟数据已经是字符串格式
     return response
 
-async def post_retrieval_node_1(state: WorkflowState) -> WorkflowState:
-    """帖子检索节点1 (并行)"""
-    logger.info("开始帖子检索 1")
-    keyword = state.primary_keyword if hasattr(state, 'primary_keyword') else None
-    raw_result = await _retrieve_single_topic_posts(keyword)
+def parse_post_result(raw_result: Optional[str]) -> List[PostRecord]:
+    """解析单个关键词的帖子检索结果"""
     if not raw_result:
-        raw_result = await llm_generate_hot_posts(keyword)
-        logger.info("XHS API失败，已用LLM兜底生成帖子1")
-    new_state = state.model_copy()
-    new_state.post_retrieval_result_1 = raw_result
-    return new_state
+        return []
+    # 判断是否是LLM兜底生成的内容（包含markdown表格格式）
+    if "|" in raw_result and "---" in raw_result:
+        # LLM兜底生成的markdown表格，直接解析
+        try:
+            return parse_markdown_posts(raw_result) or []
+        except Exception as e:
+            logger.error(f"解析LLM生成的帖子失败: {e}")
+            return []
+    # XHS API返回的JSON格式，需要解析
+    try:
+        return parse_xhs_posts(raw_result) or []
+    except Exception as e:
+        logger.error(f"解析XHS API帖子失败: {e}")
+        return []
 
-async def post_retrieval_node_2(state: WorkflowState) -> WorkflowState:
-    """帖子检索节点2 (并行)"""
-    logger.info("开始帖子检索 2")
-    keyword = state.secondary_keyword if hasattr(state, 'secondary_keyword') else None
-    raw_result = await _retrieve_single_topic_posts(keyword)
-    if not raw_result:
-        raw_result = await llm_generate_hot_posts(keyword)
-        logger.info("XHS API失败，已用LLM兜底生成帖子2")
-    new_state = state.model_copy()
-    new_state.post_retrieval_result_2 = raw_result
-    return new_state
+async def _posts_from_corpus(keyword: str) -> Optional[List[PostRecord]]:
+    """语料库中有足够的近期帖子时直接返回；SQLite查询在线程中执行，不阻塞并发检索的其他关键词"""
+    if XHS_USE_MOCK or CORPUS_MAX_AGE <= 0:
+        return None
+    try:
+        posts = await asyncio.to_thread(
+            lambda: get_corpus_store().recent_posts_for_keyword(keyword, CORPUS_MAX_AGE, limit=POST_RETRIEVAL_LIMIT)
+        )
+    except Exception as e:
+        logger.warning(f"读取语料库失败: {e}")
+        return None
+    if len(posts) < CORPUS_MIN_POSTS:
+        return None
+    return [PostRecord.from_dict(post) for post in posts]
 
-def parse_posts_node_1(state: WorkflowState) -> WorkflowState:
-    """解析帖子节点1"""
-    logger.info("开始解析帖子 1")
-    raw_result = state.post_retrieval_result_1 if hasattr(state, 'post_retrieval_result_1') else None
-    new_state = state.model_copy()
-    if raw_result:
-        # 判断是否是LLM兜底生成的内容（包含markdown表格格式）
-        if "|" in raw_result and "---" in raw_result:
-            # LLM兜底生成的markdown表格，直接解析
-            try:
-                parsed = parse_markdown_posts(raw_result)
-                new_state.parsed_posts_1 = parsed if parsed else []
-            except Exception as e:
-                new_state.parsed_posts_1 = []
-                logger.error(f"解析LLM生成的帖子1失败: {e}")
-        else:
-            # XHS API返回的JSON格式，需要解析
-            try:
-                parsed = parse_xhs_posts(raw_result)
-                new_state.parsed_posts_1 = parsed if parsed else []
-            except Exception as e:
-                new_state.parsed_posts_1 = []
-                logger.error(f"解析XHS API帖子1失败: {e}")
-    else:
-        new_state.parsed_posts_1 = []
-    return new_state
+async def _save_to_corpus(keyword: str, posts: List[PostRecord]) -> None:
+    """真实采集到的帖子写入语料库（同一关键词的帖子在一个事务中写入，在线程中执行）；Mock数据和LLM兜底生成的帖子不入库"""
+    if XHS_USE_MOCK or not posts:
+        return
+    try:
+        await asyncio.to_thread(lambda: get_corpus_store().upsert_posts(posts, keyword=keyword))
+    except Exception as e:
+        logger.warning(f"写入语料库失败: {e}")
 
-def parse_posts_node_2(state: WorkflowState) -> WorkflowState:
-    """解析帖子节点2"""
-    logger.info("开始解析帖子 2")
-    raw_result = state.post_retrieval_result_2 if hasattr(state, 'post_retrieval_result_2') else None
+async def _retrieve_and_parse(keyword: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """检索并解析单个关键词的帖子：优先用语料库的近期数据，XHS API失败时用LLM兜底"""
+    cached = await _posts_from_corpus(keyword)
+    if cached is not None:
+        logger.info(f"语料库命中 {len(cached)} 篇近期帖子，跳过采集: {keyword}")
+        raw = json.dumps({"data": {"items": [post.to_dict() for post in cached]}}, ensure_ascii=False)
+        return {"raw": raw, "parsed": cached}
+
+    async with semaphore:
+        raw_result = await _retrieve_single_topic_posts(keyword)
+        if not raw_result:
+            raw_result = await llm_generate_hot_posts(keyword)
+            logger.info(f"XHS API失败，已用LLM兜底生成帖子: {keyword}")
+            return {"raw": raw_result, "parsed": parse_post_result(raw_result)}
+    parsed = parse_post_result(raw_result)
+    await _save_to_corpus(keyword, parsed)
+    return {"raw": raw_result, "parsed": parsed}
+
+def get_retrieval_keywords(state: WorkflowState) -> List[str]:
+    """帖子检索使用的关键词：精炼关键词，没有时退回主题搜索关键词"""
+    keywords = list(getattr(state, 'refined_keywords', None) or [])
+    if not keywords:
+        keywords = get_search_keywords(state)
+    return keywords
+
+async def post_retrieval_node(state: WorkflowState) -> WorkflowState:
+    """帖子检索节点：对任意数量的关键词并发检索并解析，并发数受 MAX_PARALLEL_RETRIEVALS 限制"""
+    keywords = get_retrieval_keywords(state)
+    logger.info(f"开始帖子检索，共 {len(keywords)} 个关键词")
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_RETRIEVALS)
+    results = await asyncio.gather(*(_retrieve_and_parse(kw, semaphore) for kw in keywords))
     new_state = state.model_copy()
-    if raw_result:
-        # 判断是否是LLM兜底生成的内容（包含markdown表格格式）
-        if "|" in raw_result and "---" in raw_result:
-            # LLM兜底生成的markdown表格，直接解析
-            try:
-                parsed = parse_markdown_posts(raw_result)
-                new_state.parsed_posts_2 = parsed if parsed else []
-            except Exception as e:
-                new_state.parsed_posts_2 = []
-                logger.error(f"解析LLM生成的帖子2失败: {e}")
-        else:
-            # XHS API返回的JSON格式，需要解析
-            try:
-                parsed = parse_xhs_posts(raw_result)
-                new_state.parsed_posts_2 = parsed if parsed else []
-            except Exception as e:
-                new_state.parsed_posts_2 = []
-                logger.error(f"解析XHS API帖子2失败: {e}")
-    else:
-        new_state.parsed_posts_2 = []
+    new_state.post_retrieval_results = {kw: r["raw"] for kw, r in zip(keywords, results)}
+    new_state.parsed_posts = {kw: r["parsed"] for kw, r in zip(keywords, results)}
     return new_state
 
 def combine_post_results_node(state: WorkflowState) -> WorkflowState:
-    """合并帖子结果节点"""
+    """
+    合并帖子结果节点：按关键词顺序拼接各关键词解析出的帖子，
+    并去掉多个关键词重复检索到的、以及转载搬运的近似重复帖子（保留互动量最高的一篇）
+    """
     logger.info("合并解析的帖子结果")
-    parsed_1 = state.parsed_posts_1 if hasattr(state, 'parsed_posts_1') else []
-    parsed_2 = state.parsed_posts_2 if hasattr(state, 'parsed_posts_2') else []
-    combined_posts = parsed_1 + parsed_2
+    parsed_posts = getattr(state, 'parsed_posts', None) or {}
+    combined_posts = []
+    for keyword in get_retrieval_keywords(state):
+        combined_posts.extend(parsed_posts.get(keyword, []))
+    combined_posts, removed = deduplicate_posts(combined_posts)
+    if removed:
+        logger.info(f"去除 {removed} 篇重复帖子，剩余 {len(combined_posts)} 篇")
     new_state = state.model_copy()
     new_state.retrieved_posts = combined_posts
     new_state.total_posts_processed = len(combined_posts)
-    return new_state 
\ No newline at end of file
+    return new_state
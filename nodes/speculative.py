@@ -0,0 +1,139 @@
+"""
+投机预取节点
+流式生成关键词/精炼关键词，每解析出一个关键词就在后台发起采集，预热采集缓存。
+后续的主题搜索、帖子检索节点用相同参数调用 XHSClient，会命中缓存或合并到进行中的同一次采集。
+后台预取的并发数与主题搜索节点相同；语料库已有近期帖子的关键词不预取帖子（检索节点会直接用语料库）。
+"""
+import asyncio
+from typing import Awaitable, Callable, Optional, Set
+from loguru import logger
+from models import WorkflowStatus
+from clients import xhs_client, llm_client
+from workflow_types import WorkflowState
+# 与 topic_search / post_retrieval 节点使用相同的参数，才能命中同一缓存键
+from nodes.topic_search import TOPIC_SEARCH_LIMIT, MAX_PARALLEL_SEARCHES
+from nodes.post_retrieval import POST_RETRIEVAL_LIMIT, _posts_from_corpus
+
+# 每个阶段最多预取的关键词数
+MAX_SPECULATIVE_KEYWORDS = 8
+
+# 持有后台任务的引用，避免被垃圾回收
+_background_tasks: Set[asyncio.Task] = set()
+
+# 限制同时进行的后台预取数；信号量绑定事件循环，循环变化时重新创建
+_prefetch_semaphore: Optional[asyncio.Semaphore] = None
+_prefetch_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _semaphore() -> asyncio.Semaphore:
+    global _prefetch_semaphore, _prefetch_loop
+    loop = asyncio.get_running_loop()
+    if _prefetch_semaphore is None or _prefetch_loop is not loop:
+        _prefetch_semaphore = asyncio.Semaphore(MAX_PARALLEL_SEARCHES)
+        _prefetch_loop = loop
+    return _prefetch_semaphore
+
+async def _bounded(fetch: Callable[[], Awaitable]) -> None:
+    """占到名额后才发起采集"""
+    async with _semaphore():
+        await fetch()
+
+def _spawn(coro, description: str) -> None:
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+
+    def _done(t: asyncio.Task) -> None:
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.warning(f"投机预取失败 {description}: {t.exception()}")
+
+    task.add_done_callback(_done)
+
+def prefetch_topics(keyword: str) -> None:
+    """后台预取关键词的主题搜索结果"""
+    logger.info(f"投机预取主题: {keyword}")
+    _spawn(_bounded(lambda: xhs_client.search_topics(keyword, limit=TOPIC_SEARCH_LIMIT)), f"search_topics({keyword})")
+
+async def _prefetch_posts(keyword: str) -> None:
+    if await _posts_from_corpus(keyword) is not None:
+        logger.info(f"语料库已有近期帖子，跳过投机预取: {keyword}")
+        return
+    await _bounded(lambda: xhs_client.retrieve_posts(keyword, limit=POST_RETRIEVAL_LIMIT))
+
+def prefetch_posts(keyword: str) -> None:
+    """后台预取关键词的帖子检索结果；语料库命中时检索节点不会采集，也就不预取"""
+    logger.info(f"投机预取帖子: {keyword}")
+    _spawn(_prefetch_posts(keyword), f"retrieve_posts({keyword})")
+
+async def speculative_keyword_generation_node(state: WorkflowState) -> WorkflowState:
+    """
+    关键词生成节点（投机模式）
+    流式生成关键词，每个 <topicN> 一闭合就预取它的主题和帖子；
+    帖子预取在精炼阶段运行期间完成，精炼关键词与初始关键词重合时直接复用。
+    """
+    logger.info("开始关键词生成(流式，投机预取)")
+
+    try:
+        state.update_state(WorkflowStatus.KEYWORD_GENERATION)
+
+        raw_content = ""
+        prefetched = 0
+        async for event in llm_client.stream_keywords(state.user_input):
+            if event["type"] == "tag":
+                if event["content"] and prefetched < MAX_SPECULATIVE_KEYWORDS:
+                    prefetch_topics(event["content"])
+                    prefetch_posts(event["content"])
+                    prefetched += 1
+            else:
+                raw_content = event["raw"]
+
+        if not raw_content:
+            raise ValueError("LLM未能生成关键词内容。")
+
+        state.llm_output = raw_content
+        logger.info(f"关键词生成(流式)完成，已预取 {prefetched} 个关键词")
+        return state
+
+    except Exception as e:
+        logger.error(f"关键词生成节点执行失败: {e}")
+        state.set_error(f"关键词生成失败: {str(e)}")
+        return state
+
+async def speculative_topic_refinement_node(state: WorkflowState) -> WorkflowState:
+    """
+    主题优化节点（投机模式）
+    流式精炼关键词，每个 <topicN> 一闭合就预取它的帖子
+    """
+    logger.info("开始主题优化(流式，投机预取)")
+
+    try:
+        state.update_state(WorkflowStatus.TOPIC_REFINEMENT)
+
+        search_results = getattr(state, 'combined_topic_results', "")
+        user_input = getattr(state, 'user_input', "")
+
+        if not search_results:
+            logger.warning("没有主题搜索结果可供优化")
+            state.refinement_llm_output = ""
+            return state
+
+        raw_content = ""
+        prefetched = 0
+        async for event in llm_client.stream_refinement(user_input, search_results):
+            if event["type"] == "tag":
+                if event["content"] and prefetched < MAX_SPECULATIVE_KEYWORDS:
+                    prefetch_posts(event["content"])
+                    prefetched += 1
+            else:
+                raw_content = event["raw"]
+
+        if not raw_content:
+            raise ValueError("LLM未能生成主题优化内容。")
+
+        state.refinement_llm_output = raw_content
+        logger.info(f"主题优化(流式)完成，已预取 {prefetched} 个关键词的帖子")
+        return state
+
+    except Exception as e:
+        logger.error(f"主题优化节点执行失败: {e}")
+        state.set_error(f"主题优化失败: {str(e)}")
+        return state
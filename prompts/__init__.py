@@ -7,8 +7,10 @@ from .templates import (
     KEYWORD_GENERATION_PROMPT,
     TOPIC_REFINEMENT_PROMPT,
     CONTENT_FILTER_PROMPT,
+    CONTENT_FILTER_BATCH_PROMPT,
     HITPOINT_ANALYSIS_PROMPT,
     CONTENT_GENERATION_PROMPT,
+    CONTENT_GENERATION_STREAM_PROMPT,
     SYSTEM_PROMPT
 )
 
@@ -16,7 +18,9 @@ __all__ = [
     "KEYWORD_GENERATION_PROMPT",
     "TOPIC_REFINEMENT_PROMPT", 
     "CONTENT_FILTER_PROMPT",
+    "CONTENT_FILTER_BATCH_PROMPT",
     "HITPOINT_ANALYSIS_PROMPT",
     "CONTENT_GENERATION_PROMPT",
+    "CONTENT_GENERATION_STREAM_PROMPT",
     "SYSTEM_PROMPT"
 ] 
\ No newline at end of file
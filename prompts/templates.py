@@ -22,7 +22,7 @@ KEYWORD_GENERATION_PROMPT = """用户的起号需求简述：{user_input}
 # 话题精炼提示词
 TOPIC_REFINEMENT_PROMPT = """基于以下搜索结果，精炼出更精准的搜索关键词：
 
-原始关键词：{original_keyword}
+用户需求：{user_input}
 搜索结果：{search_results}
 
 请分析搜索结果，提取出：
@@ -30,12 +30,10 @@ TOPIC_REFINEMENT_PROMPT = """基于以下搜索结果，精炼出更精准的搜
 2. 用户关注的热点话题
 3. 相关的网络流行语
 
-生成3-5个精炼后的关键词，用XML标签包裹：
-<refined_keywords>
-<keyword>精炼关键词1</keyword>
-<keyword>精炼关键词2</keyword>
-<keyword>精炼关键词3</keyword>
-</refined_keywords>"""
+生成5-8个精炼后的关键词，按重要性排序，用编号xml标签包裹，例如：
+<topic1>精炼关键词1</topic1>
+<topic2>精炼关键词2</topic2>
+<topic3>精炼关键词3</topic3>"""
 
 # 内容过滤提示词
 CONTENT_FILTER_PROMPT = """请分析以下帖子内容，判断其质量和相关性：
@@ -55,6 +53,16 @@ CONTENT_FILTER_PROMPT = """请分析以下帖子内容，判断其质量和相
 <quality_level>{level}</quality_level>
 <evaluation>{evaluation}</evaluation>"""
 
+# 批量内容过滤提示词
+CONTENT_FILTER_BATCH_PROMPT = """下面是{count}篇社媒帖子，请逐篇判断是否属于低质量内容（如商业推广、引流、内容空洞）。
+
+{posts_block}
+
+对第i篇帖子，用<result_i>标签给出结论：低质量回复0，否则回复1。必须覆盖全部{count}篇，例如：
+<result_1>1</result_1>
+<result_2>0</result_2>
+不要有任何其他多余的回复。"""
+
 # 打点分析提示词
 HITPOINT_ANALYSIS_PROMPT = """基于以下精选帖子，分析出5个核心打点：
 
@@ -109,6 +117,26 @@ CONTENT_GENERATION_PROMPT = """基于用户需求和打点分析，生成一篇
 <post_content>{content}</post_content>
 <post_tags>{tags}</post_tags>"""
 
+# 流式内容生成提示词（按行首分节输出，便于边生成边解析）
+CONTENT_GENERATION_STREAM_PROMPT = """基于用户需求和打点分析，生成一篇高质量的小红书帖子：
+
+用户需求：{user_input}
+选择打点：{selected_hitpoint}
+
+要求：
+1. 标题要有吸引力，包含关键词
+2. 内容要有价值，解决用户问题
+3. 语言要接地气，符合小红书调性
+4. 要有互动性，鼓励用户参与
+5. 适当使用emoji和排版
+
+严格按以下格式输出，每个分节单独起一行：
+标题：<标题>
+
+正文：<正文>
+
+Hashtag: #标签1 #标签2 #标签3"""
+
 # 用户选择提示词
 USER_SELECTION_PROMPT = """以下是分析出的5个核心打点，请选择最符合你需求的一个：
 
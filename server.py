@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+小红书起号智能助手HTTP服务
+基于aiohttp，在一个进程内并发运行多个工作流，并通过SSE推送节点级进度
+
+接口：
+  POST /runs                  启动一次运行，body: {"input": "...", "config_id": "..."}
+  GET  /runs/{run_id}         查询运行状态和最终结果
+  GET  /runs/{run_id}/events  SSE推送节点进度，支持 Last-Event-ID 断线续传
+  GET  /metrics               运行数、LLM限流、缓存等指标
+"""
+
+import asyncio
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Any, Optional, List
+from aiohttp import web
+from loguru import logger
+from models import PostRecord
+from workflow import agent
+from clients.llm_client import llm_client
+from clients.xhs_client import xhs_client
+
+# 同时执行的最大运行数，超出的运行排队等待
+MAX_CONCURRENT_RUNS = 16
+# 排队 + 执行中的运行总数上限，超出时拒绝新请求(429)
+MAX_PENDING_RUNS = 256
+# 已结束的运行保留多久（秒）供查询
+RUN_RETENTION = 3600
+# SSE心跳间隔（秒），防止代理断开空闲连接
+SSE_HEARTBEAT_INTERVAL = 15
+# 单次SSE写入的最长等待（秒）；客户端长时间不读取时断开连接
+SSE_WRITE_TIMEOUT = 30
+
+
+def _json_default(obj: Any) -> Any:
+    """序列化工作流状态中的pydantic模型、帖子记录、枚举和时间"""
+    if isinstance(obj, PostRecord):
+        obj = obj.to_post()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, default=_json_default)
+
+
+class RunRecord:
+    """一次工作流运行的状态、事件流和结果"""
+
+    def __init__(self, run_id: str, user_input: str, config_id: Optional[str] = None):
+        self.run_id = run_id
+        self.user_input = user_input
+        self.config_id = config_id
+        self.status = "queued"
+        self.events: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error_message: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._cond = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "error", "cancelled")
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        """追加一个事件并唤醒所有订阅者"""
+        async with self._cond:
+            event["id"] = len(self.events) + 1
+            self.events.append(event)
+            self._cond.notify_all()
+
+    async def wait_for_events(self, after: int, timeout: float) -> bool:
+        """等待出现第after个之后的事件或运行结束；超时返回False"""
+        async with self._cond:
+            try:
+                await asyncio.wait_for(
+                    self._cond.wait_for(lambda: len(self.events) > after or self.done),
+                    timeout=timeout,
+                )
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "user_input": self.user_input,
+            "config_id": self.config_id,
+            "events": len(self.events),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error_message": self.error_message,
+        }
+
+
+class WorkflowService:
+    """管理并发运行：排队、执行、事件分发和过期清理"""
+
+    def __init__(self, max_concurrent_runs: int = MAX_CONCURRENT_RUNS, max_pending_runs: int = MAX_PENDING_RUNS):
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_pending_runs = max_pending_runs
+        self.runs: Dict[str, RunRecord] = {}
+        self._slots = asyncio.Semaphore(max_concurrent_runs)
+
+    @property
+    def active_runs(self) -> int:
+        return sum(1 for run in self.runs.values() if not run.done)
+
+    def start_run(self, user_input: str, config_id: Optional[str] = None) -> Optional[RunRecord]:
+        """创建并调度一次运行；排队已满时返回None"""
+        if self.active_runs >= self.max_pending_runs:
+            return None
+        run = RunRecord(uuid.uuid4().hex, user_input, config_id)
+        self.runs[run.run_id] = run
+        run.task = asyncio.create_task(self._execute(run))
+        return run
+
+    async def _execute(self, run: RunRecord) -> None:
+        try:
+            async with self._slots:
+                run.status = "running"
+                run.started_at = time.time()
+                await run.publish({"type": "started"})
+                async for event in agent.stream_progress(run.user_input, run.config_id):
+                    if event["type"] == "result":
+                        run.result = event["state"]
+                        run.error_message = run.result.get("error_message") or None
+                        run.status = "completed"
+                        await run.publish({"type": "completed"})
+                    elif event["type"] == "error":
+                        run.error_message = event["error_message"]
+                        run.status = "error"
+                        await run.publish(event)
+                    else:
+                        await run.publish(event)
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+            await run.publish({"type": "cancelled"})
+            raise
+        except Exception as e:
+            logger.error(f"运行 {run.run_id} 执行失败: {e}")
+            run.error_message = str(e)
+            run.status = "error"
+            await run.publish({"type": "error", "error_message": str(e)})
+        finally:
+            run.finished_at = time.time()
+
+    def purge_expired(self) -> int:
+        """清理超过保留时间的已结束运行"""
+        now = time.time()
+        expired = [
+            run_id for run_id, run in self.runs.items()
+            if run.done and run.finished_at and now - run.finished_at > RUN_RETENTION
+        ]
+        for run_id in expired:
+            del self.runs[run_id]
+        return len(expired)
+
+    async def shutdown(self) -> None:
+        tasks = [run.task for run in self.runs.values() if run.task and not run.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# 应用内共享的运行服务（aiohttp>=3.9 对字符串键会发出 NotAppKeyWarning）
+SERVICE_KEY = web.AppKey("service", WorkflowService)
+
+
+# --- HTTP handlers ---
+
+async def create_run(request: web.Request) -> web.Response:
+    service = request.app[SERVICE_KEY]
+    try:
+        body = await request.json()
+    except Exception:
+        return web.json_response({"error": "请求体必须是JSON"}, status=400)
+    if not isinstance(body, dict):
+        return web.json_response({"error": "请求体必须是JSON对象"}, status=400)
+    user_input = body.get("input")
+    user_input = user_input.strip() if isinstance(user_input, str) else ""
+    if not user_input:
+        return web.json_response({"error": "缺少 input"}, status=400)
+
+    run = service.start_run(user_input, body.get("config_id"))
+    if run is None:
+        return web.json_response({"error": "运行数已达上限，请稍后重试"}, status=429, headers={"Retry-After": "5"})
+    return web.json_response(
+        {"run_id": run.run_id, "status": run.status, "events_url": f"/runs/{run.run_id}/events"},
+        status=202,
+    )
+
+
+async def get_run(request: web.Request) -> web.Response:
+    service = request.app[SERVICE_KEY]
+    run = service.runs.get(request.match_info["run_id"])
+    if run is None:
+        return web.json_response({"error": "运行不存在"}, status=404)
+    data = run.summary()
+    data["result"] = run.result
+    return web.Response(text=_dumps(data), content_type="application/json")
+
+
+async def stream_run_events(request: web.Request) -> web.StreamResponse:
+    service = request.app[SERVICE_KEY]
+    run = service.runs.get(request.match_info["run_id"])
+    if run is None:
+        return web.json_response({"error": "运行不存在"}, status=404)
+
+    try:
+        sent = int(request.headers.get("Last-Event-ID", "0"))
+    except ValueError:
+        sent = 0
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    await response.prepare(request)
+
+    async def write(payload: str) -> None:
+        # write 会在传输缓冲区满时等待客户端读取，实现连接级背压
+        await asyncio.wait_for(response.write(payload.encode("utf-8")), timeout=SSE_WRITE_TIMEOUT)
+
+    try:
+        while True:
+            has_update = await run.wait_for_events(sent, timeout=SSE_HEARTBEAT_INTERVAL)
+            if not has_update:
+                await write(": heartbeat\n\n")
+                continue
+            for event in run.events[sent:]:
+                await write(f"id: {event['id']}\nevent: {event['type']}\ndata: {_dumps(event)}\n\n")
+                sent = event["id"]
+            if run.done and sent >= len(run.events):
+                break
+    except (asyncio.TimeoutError, ConnectionResetError):
+        logger.warning(f"SSE客户端读取过慢或已断开，关闭连接: {run.run_id}")
+    return response
+
+
+async def get_metrics(request: web.Request) -> web.Response:
+    service = request.app[SERVICE_KEY]
+    statuses: Dict[str, int] = {}
+    for run in service.runs.values():
+        statuses[run.status] = statuses.get(run.status, 0) + 1
+    data = {
+        "runs": statuses,
+        "max_concurrent_runs": service.max_concurrent_runs,
+        "max_pending_runs": service.max_pending_runs,
+        "llm_rate_limits": llm_client.rate_limit_metrics(),
+        "llm_cache": llm_client.cache_stats(),
+        "scrape_cache": xhs_client.cache_stats(),
+        "browser_pool": xhs_client.pool_stats(),
+        "retrieval_tiers": xhs_client.retrieval_stats(),
+    }
+    return web.Response(text=_dumps(data), content_type="application/json")
+
+
+async def _purge_loop(app: web.Application):
+    async def loop():
+        while True:
+            await asyncio.sleep(60)
+            purged = app[SERVICE_KEY].purge_expired()
+            if purged:
+                logger.info(f"清理了 {purged} 个过期运行")
+
+    task = asyncio.create_task(loop())
+    yield
+    task.cancel()
+    await app[SERVICE_KEY].shutdown()
+    await agent.close()
+    await xhs_client.shutdown()
+
+
+def create_app(max_concurrent_runs: int = MAX_CONCURRENT_RUNS, max_pending_runs: int = MAX_PENDING_RUNS) -> web.Application:
+    """创建aiohttp应用"""
+    app = web.Application()
+    app[SERVICE_KEY] = WorkflowService(max_concurrent_runs, max_pending_runs)
+    app.router.add_post("/runs", create_run)
+    app.router.add_get("/runs/{run_id}", get_run)
+    app.router.add_get("/runs/{run_id}/events", stream_run_events)
+    app.router.add_get("/metrics", get_metrics)
+    app.cleanup_ctx.append(_purge_loop)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="小红书起号智能助手HTTP服务")
+    parser.add_argument("--host", default="0.0.0.0", help="监听地址")
+    parser.add_argument("--port", type=int, default=8080, help="监听端口")
+    parser.add_argument("--max-runs", type=int, default=MAX_CONCURRENT_RUNS, help="同时执行的最大运行数")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING_RUNS, help="排队+执行中的最大运行数")
+    args = parser.parse_args()
+
+    web.run_app(create_app(args.max_runs, args.max_pending), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
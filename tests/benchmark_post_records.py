@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+帖子记录基准脚本
+比较字典、PostRecord 和 pydantic Post 三种表示的构建耗时和内存占用（按10万篇帖子折算）
+
+用法: python tests/benchmark_post_records.py [帖子数]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gc
+import time
+import tracemalloc
+from models import Post, PostRecord
+
+DEFAULT_COUNT = 100_000
+
+def _raw_items(count):
+    return [
+        {
+            "id": f"note-{i}",
+            "title": f"居家健身第{i}天",
+            "content": "每天30分钟HIIT燃脂，坚持打卡。",
+            "author": f"user{i % 500}",
+            "likes": i % 5000,
+            "comments": i % 300,
+            "shares": i % 50,
+            "views": i % 20000,
+            "tags": ["健身", "打卡"],
+        }
+        for i in range(count)
+    ]
+
+BUILDERS = {
+    "dict": lambda item: dict(item, quality_score=0.0),
+    "PostRecord": lambda item: PostRecord(**item),
+    "pydantic Post": lambda item: Post(**item),
+}
+
+def measure(name, items):
+    """返回 (构建耗时秒, 占用字节)；tags列表与原始数据共享，只计算记录本身"""
+    build = BUILDERS[name]
+    gc.collect()
+    started = time.perf_counter()
+    records = [build(item) for item in items]
+    elapsed = time.perf_counter() - started
+    del records
+
+    gc.collect()
+    tracemalloc.start()
+    records = [build(item) for item in items]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return elapsed, size
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    items = _raw_items(count)
+    scale = DEFAULT_COUNT / count
+    print(f"\n📊 构建 {count} 篇帖子（内存按 {DEFAULT_COUNT} 篇折算）")
+    print(f"{'表示':<16}{'构建耗时(s)':>12}{'每篇(µs)':>10}{'内存(MB)':>10}")
+    for name in BUILDERS:
+        elapsed, size = measure(name, items)
+        print(f"{name:<16}{elapsed:>12.3f}{elapsed / count * 1e6:>10.2f}{size * scale / 1024 / 1024:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+帖子列式分析测试脚本
+测试向量化统计、top-k、互动率和主题归类与原先逐条计算的结果一致
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from utils.analytics import PostFrame, ThemeMatcher
+
+POSTS = [
+    {"id": "1", "content": "今天去健身房运动", "likes": "120", "comments": "10", "shares": "3", "views": "1000", "tags": ["健身"]},
+    {"id": "2", "content": "周末美食探店", "likes": "1,500", "comments": 40, "shares": 8, "views": 0, "tags": ["美食", "探店"]},
+    {"id": "3", "content": "护肤心得，也聊聊旅行", "likes": 80, "comments": "abc", "shares": 0, "tags": ["护肤"]},
+    {"id": "4", "content": "随便写写", "likes": 1500, "comments": 5, "shares": 1, "views": 300, "tags": ["美食"]},
+    {"id": "5", "content": "秋冬穿搭分享", "likes": 300, "comments": 12, "shares": 6, "views": 2000, "tags": []},
+]
+
+def test_summary_matches_python_loop():
+    """测试汇总结果与逐条计算一致"""
+    print("\n🔍 测试列式汇总...")
+    summary = PostFrame.from_posts(POSTS).summary()
+    assert summary["total_posts"] == 5
+    assert summary["total_likes"] == 120 + 1500 + 80 + 1500 + 300
+    assert summary["total_comments"] == 10 + 40 + 0 + 5 + 12
+    assert summary["avg_likes"] == summary["total_likes"] // 5
+    assert summary["hot_tags"][0] == ("美食", 2)
+    # 点赞相同的保持原顺序
+    assert [post["id"] for post in summary["hot_posts"]] == ["2", "4", "5"]
+    assert isinstance(summary["total_likes"], int)
+    print(f"✅ 列式汇总正常: {summary['likes_percentiles']}")
+
+def test_top_k_and_percentiles():
+    """测试argpartition的top-k与完整排序一致"""
+    rng = np.random.default_rng(0)
+    posts = [{"likes": int(v)} for v in rng.integers(0, 10000, size=5000)]
+    frame = PostFrame.from_posts(posts)
+    expected = sorted(range(len(posts)), key=lambda i: posts[i]["likes"], reverse=True)[:10]
+    assert list(frame.top_k_indices("likes", 10)) == expected
+    assert frame.percentiles("likes", (50,))["p50"] == float(np.median([p["likes"] for p in posts]))
+    assert len(PostFrame.from_posts([]).top_k("likes", 3)) == 0
+
+def test_engagement_rates():
+    """测试互动率，浏览为0的帖子记为0"""
+    rates = PostFrame.from_posts(POSTS).engagement_rates()
+    assert rates[0] == (120 + 10 + 3) / 1000
+    assert rates[1] == 0 and rates[2] == 0
+
+def test_theme_matcher():
+    """测试主题归类沿用原先的优先顺序，词表可配置"""
+    print("\n🔍 测试主题归类...")
+    themes = dict(PostFrame.from_posts(POSTS).themes())
+    assert themes == {"健身运动": 1, "美食探店": 1, "护肤美妆": 1, "生活分享": 1, "时尚穿搭": 1}
+
+    matcher = ThemeMatcher({"宠物": ["猫", "狗"], "数码": ["手机"]}, default="其他")
+    assert matcher.classify("我家的猫和新手机") == "宠物"
+    assert matcher.count(["手机测评", "狗狗日常", "读书"]) == [("数码", 1), ("宠物", 1), ("其他", 1)]
+    print("✅ 主题归类正常")
+
+if __name__ == "__main__":
+    test_summary_matches_python_loop()
+    test_top_k_and_percentiles()
+    test_engagement_rates()
+    test_theme_matcher()
+    print("\n🎉 帖子列式分析测试完成!")
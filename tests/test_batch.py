@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+批量模式测试脚本
+用模拟的工作流测试结果写入、成功判定和断点续跑
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import tempfile
+import main
+from models import WorkflowStatus
+
+class FakeAgent:
+    """按输入返回状态字典；fail 中的输入返回错误状态"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+
+    async def run_with_checkpoint(self, user_input, config_id=None):
+        self.calls.append(config_id)
+        if user_input in self.fail:
+            return {"user_input": user_input, "current_state": WorkflowStatus.ERROR.value, "error_message": "失败"}
+        return {
+            "user_input": user_input,
+            "current_state": WorkflowStatus.COMPLETED.value,
+            "error_message": "",
+            "total_posts_processed": 3,
+            "hitpoints": [{"id": "1", "title": "打点", "description": "描述"}],
+            "generated_content": {"title": "标题", "content": "正文", "tags": ["a"], "quality_score": 8.0},
+        }
+
+def _write_inputs(path, inputs):
+    with open(path, "w", encoding="utf-8") as f:
+        for item_id, text in inputs:
+            f.write(json.dumps({"id": item_id, "input": text}, ensure_ascii=False) + "\n")
+
+def test_run_workflow_reads_state_dict():
+    """测试run_workflow按状态字典构建响应"""
+    original = main.agent
+    main.agent = FakeAgent(fail={"坏"})
+    try:
+        ok = asyncio.run(main.run_workflow("好", config_id="x"))
+        bad = asyncio.run(main.run_workflow("坏", config_id="y"))
+    finally:
+        main.agent = original
+    assert ok["success"] and ok["current_state"] == "completed"
+    assert ok["statistics"]["total_posts_processed"] == 3
+    assert ok["hitpoints"][0]["title"] == "打点" and ok["generated_content"]["title"] == "标题"
+    assert not bad["success"] and bad["error_message"] == "失败"
+
+def test_resume_skips_completed():
+    """测试第二次运行跳过已成功的ID，只重跑失败的"""
+    print("\n🔍 测试批量断点续跑...")
+    original = main.agent
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "inputs.jsonl")
+        output_path = os.path.join(tmp, "out.jsonl")
+        _write_inputs(input_path, [("a", "好"), ("b", "坏"), ("c", "好")])
+        try:
+            main.agent = FakeAgent(fail={"坏"})
+            first = asyncio.run(main.run_batch(input_path, output_path, concurrency=2))
+            assert first == {"succeeded": 2, "failed": 1, "skipped": 0}
+
+            main.agent = agent = FakeAgent()
+            second = asyncio.run(main.run_batch(input_path, output_path, concurrency=2))
+        finally:
+            main.agent = original
+        assert second == {"succeeded": 1, "failed": 0, "skipped": 2}
+        assert agent.calls == ["batch:b"]
+        assert main.load_completed_ids(output_path) == {"a", "b", "c"}
+    print("✅ 批量断点续跑正常")
+
+if __name__ == "__main__":
+    test_run_workflow_reads_state_dict()
+    test_resume_skips_completed()
+    print("\n🎉 批量模式测试完成!")
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+页面池测试脚本
+用模拟的浏览器/上下文/页面测试容量上限、健康检查、导航次数回收和异常时归还
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from types import SimpleNamespace
+from clients.browser_pool import BrowserPool
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self, user_agent=None):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages = []
+
+    async def new_page(self):
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        pass
+
+class FakePage:
+    """goto 触发主框架导航事件；hang 为True时健康检查的脚本执行不返回"""
+
+    def __init__(self):
+        self.main_frame = SimpleNamespace(url="about:blank")
+        self.closed = False
+        self.hang = False
+        self._handlers = []
+
+    def on(self, event, handler):
+        if event == "framenavigated":
+            self._handlers.append(handler)
+
+    def is_closed(self):
+        return self.closed
+
+    async def evaluate(self, script):
+        if self.hang:
+            await asyncio.sleep(10)
+        return 1
+
+    async def goto(self, url, **kwargs):
+        self.main_frame.url = url
+        for handler in self._handlers:
+            handler(self.main_frame)
+
+    async def close(self):
+        self.closed = True
+
+def _make_pool(**kwargs):
+    """创建使用模拟浏览器的页面池，需在事件循环中调用"""
+    pool = BrowserPool(health_check_timeout=0.05, **kwargs)
+    pool._browser = FakeBrowser()
+    pool._capacity = asyncio.Semaphore(pool.size)
+    return pool
+
+async def _test_capacity():
+    pool = _make_pool(max_contexts=2, pages_per_context=2)
+    active = peak = 0
+
+    async def borrow():
+        nonlocal active, peak
+        async with pool.page():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*[borrow() for _ in range(12)])
+    stats = pool.stats()
+    assert peak == 4
+    assert stats["contexts"] == 2 and stats["pages"] == 4 and stats["idle_pages"] == 4
+    assert stats["checkouts"] == 12 and stats["pages_created"] == 4
+
+async def _test_health_check():
+    pool = _make_pool(max_contexts=1, pages_per_context=1)
+    async with pool.page() as page:
+        pass
+    page.hang = True
+    async with pool.page() as fresh:
+        assert fresh is not page
+    assert page.closed
+    assert pool.stats()["unhealthy_pages"] == 1 and pool.stats()["pages"] == 1
+
+async def _test_recycle():
+    pool = _make_pool(max_contexts=1, pages_per_context=1, max_navigations_per_page=3)
+    # 归还时跳转 about:blank 不计入导航次数，前两次使用后页面仍可复用
+    for _ in range(2):
+        async with pool.page() as page:
+            await page.goto("https://www.xiaohongshu.com/explore")
+        assert not page.closed
+    async with pool.page() as same:
+        assert same is page
+        await page.goto("https://www.xiaohongshu.com/explore")
+    assert page.closed
+    assert pool.stats()["pages_recycled"] == 1 and pool.stats()["pages"] == 0
+    async with pool.page() as fresh:
+        assert fresh is not page
+
+async def _test_release_on_exception():
+    pool = _make_pool(max_contexts=1, pages_per_context=1)
+    for _ in range(2):
+        try:
+            async with pool.page():
+                raise ValueError("解析失败")
+        except ValueError:
+            pass
+    assert pool.stats()["idle_pages"] == 1 and pool.stats()["pages_created"] == 1
+
+    # 页面在使用中被关闭，归还时丢弃
+    try:
+        async with pool.page() as page:
+            await page.close()
+            raise RuntimeError("页面崩溃")
+    except RuntimeError:
+        pass
+    assert pool.stats()["pages"] == 0 and pool.stats()["unhealthy_pages"] == 1
+
+    # 名额已归还，再次借出不会阻塞
+    async def borrow():
+        async with pool.page() as fresh:
+            return fresh
+
+    assert await asyncio.wait_for(borrow(), timeout=1) is not page
+
+async def _test_release_after_close():
+    pool = _make_pool(max_contexts=1, pages_per_context=2)
+    async with pool.page() as page:
+        await pool.close()
+    assert page.closed
+    assert pool.stats()["pages"] == 0
+
+async def _test_context_bound():
+    pool = _make_pool(max_contexts=1, pages_per_context=2)
+    async with pool.page():
+        # 页面计数与实际不符（如失效上下文的页面未归还）时，不能越过上下文上限新建上下文
+        pool._slots[0].page_count = 2
+        try:
+            await pool.acquire()
+            assert False, "上下文已达上限应抛出RuntimeError"
+        except RuntimeError:
+            pass
+        assert len(pool._browser.contexts) == 1
+        pool._slots[0].page_count = 1
+    # 失败的借出已归还名额
+    assert pool._capacity._value == 2
+
+def test_capacity_bounds():
+    """测试借出的页面数和上下文数不超过上限，归还后复用"""
+    print("\n🔍 测试页面池容量上限...")
+    asyncio.run(_test_capacity())
+    print("✅ 页面池容量上限正常")
+
+def test_health_check_eviction():
+    """测试健康检查超时的空闲页面被丢弃并重建"""
+    print("\n🔍 测试健康检查...")
+    asyncio.run(_test_health_check())
+    print("✅ 健康检查正常")
+
+def test_recycle_after_max_navigations():
+    """测试导航次数达到上限的页面在归还时回收"""
+    print("\n🔍 测试页面回收...")
+    asyncio.run(_test_recycle())
+    print("✅ 页面回收正常")
+
+def test_release_after_close():
+    """测试池关闭后归还的页面直接关闭，不会因名额信号量已释放而报错"""
+    asyncio.run(_test_release_after_close())
+
+def test_context_bound():
+    """测试新建页面时仍遵守上下文数上限"""
+    asyncio.run(_test_context_bound())
+
+def test_release_on_exception():
+    """测试调用方抛出异常时页面和名额仍被归还"""
+    print("\n🔍 测试异常时归还...")
+    asyncio.run(_test_release_on_exception())
+    print("✅ 异常时归还正常")
+
+if __name__ == "__main__":
+    test_capacity_bounds()
+    test_health_check_eviction()
+    test_recycle_after_max_navigations()
+    test_release_on_exception()
+    test_release_after_close()
+    test_context_bound()
+    print("\n🎉 页面池测试完成!")
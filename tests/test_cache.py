@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+缓存测试脚本
+测试内存LRU + 磁盘SQLite两级缓存
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import asyncio
+import subprocess
+import threading
+import tempfile
+from types import SimpleNamespace
+from utils.cache import LRUCache, TieredCache, make_cache_key
+from clients.llm_client import LLMClient
+from utils.parsers import has_complete_indexed_tags
+
+def test_lru_eviction():
+    """测试LRU淘汰最久未使用的条目"""
+    print("\n🔍 测试LRU淘汰...")
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    print("✅ LRU淘汰正常")
+
+def test_ttl_and_stale_entry():
+    """测试TTL过期后get返回None，但get_entry仍能读到陈旧值"""
+    print("\n🔍 测试TTL过期...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TieredCache("test", path=os.path.join(tmp, "cache.sqlite3"))
+        cache.set("k", {"v": 1}, ttl=0.05)
+        assert cache.get("k") == {"v": 1}
+        time.sleep(0.1)
+        assert cache.get("k") is None
+        value, expires_at = cache.get_entry("k")
+        assert value == {"v": 1} and expires_at < time.time()
+    print("✅ TTL过期与陈旧读取正常")
+
+def test_disk_tier_survives_restart():
+    """测试磁盘层在新实例中仍可命中，并回填内存层"""
+    print("\n🔍 测试磁盘持久化...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite3")
+        key = make_cache_key("model", 0.3, [("system", "s"), ("human", "帖子")])
+        TieredCache("llm", path=path).set(key, "<result>1</result>")
+
+        restarted = TieredCache("llm", path=path)
+        assert restarted.get(key) == "<result>1</result>"
+        assert restarted.get(key) == "<result>1</result>"
+        stats = restarted.stats()
+        assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+
+        other_namespace = TieredCache("other", path=path)
+        assert other_namespace.get(key) is None
+    print("✅ 磁盘持久化与命名空间隔离正常")
+
+def test_disk_tier_opens_lazily():
+    """测试构造缓存（包括导入时的模块级单例）不创建SQLite文件，首次读写时才创建"""
+    print("\n🔍 测试磁盘层延迟打开...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sub", "cache.sqlite3")
+        cache = TieredCache("lazy", path=path)
+        assert not os.path.exists(os.path.dirname(path))
+        assert cache.get("k") is None
+        assert os.path.exists(path)
+        cache.disk.close()
+
+        cache_dir = os.path.join(tmp, "import_cache")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        proc = subprocess.run(
+            [sys.executable, "-c", "import clients.llm_client, clients.xhs_client"],
+            cwd=root, env={**os.environ, "CACHE_DIR": cache_dir, "XHS_USE_MOCK": "true"},
+            capture_output=True, text=True,
+        )
+        assert proc.returncode == 0, proc.stderr
+        assert not os.path.exists(cache_dir)
+    print("✅ 磁盘层延迟打开正常")
+
+def test_async_disk_io_off_loop():
+    """测试协程接口在线程中读写磁盘层，内存层同步可见"""
+    print("\n🔍 测试磁盘层异步读写...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite3")
+        loop_thread = threading.get_ident()
+        disk_threads = []
+
+        async def run():
+            cache = TieredCache("async", path=path)
+            original_set = cache.disk.set
+
+            def tracked_set(*args, **kwargs):
+                disk_threads.append(threading.get_ident())
+                return original_set(*args, **kwargs)
+
+            cache.disk.set = tracked_set
+            await cache.aset("k", {"v": 1}, ttl=60)
+            assert cache.memory.get("k") == {"v": 1}
+
+            restarted = TieredCache("async", path=path)
+            assert await restarted.aget("k") == {"v": 1}
+            assert (await restarted.aget_entry("k"))[0] == {"v": 1}
+            assert await restarted.aget("missing") is None
+            stats = restarted.stats()
+            assert stats["disk_hits"] == 1 and stats["misses"] == 1
+            cache.disk.close()
+            restarted.disk.close()
+
+        asyncio.run(run())
+        assert disk_threads and loop_thread not in disk_threads
+    print("✅ 磁盘层异步读写正常")
+
+def test_invoke_cached_skips_unparseable():
+    """测试无法解析的LLM响应不写入缓存，已缓存的坏响应视为未命中"""
+    print("\n🔍 测试LLM响应校验...")
+    client = LLMClient()
+    client.cache = TieredCache("llm", persistent=False)
+    replies = ["抱歉，我无法判断", "<result>1</result>"]
+    calls = []
+
+    async def fake_invoke(model, messages):
+        calls.append(messages)
+        return SimpleNamespace(content=replies[len(calls) - 1])
+
+    client.invoke = fake_invoke
+    model = SimpleNamespace(model_name="m", temperature=0.0)
+    messages = [{"role": "human", "content": "帖子"}]
+    valid = lambda text: "<result>" in text
+
+    async def run():
+        assert await client.invoke_cached(model, messages, validate=valid) == "抱歉，我无法判断"
+        assert await client.invoke_cached(model, messages, validate=valid) == "<result>1</result>"
+        assert await client.invoke_cached(model, messages, validate=valid) == "<result>1</result>"
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+    # 没有校验器时写入的坏响应，带校验器读取时重新请求
+    client.cache.set(client._cache_key(model, [{"role": "human", "content": "另一篇"}]), "乱码")
+    replies.append("<result>0</result>")
+    other = [{"role": "human", "content": "另一篇"}]
+    assert asyncio.run(client.invoke_cached(model, other, validate=valid)) == "<result>0</result>"
+    assert len(calls) == 3
+    print("✅ LLM响应校验正常")
+
+def test_astream_cached_validates():
+    """测试流式响应不完整时不写入缓存，缓存中的坏响应视为未命中"""
+    client = LLMClient()
+    client.cache = TieredCache("llm", persistent=False)
+    streams = [["<topic1>健", "身"], ["<topic1>健身</topic1>"]]
+    calls = []
+
+    async def fake_astream(model, messages):
+        calls.append(messages)
+        for chunk in streams[len(calls) - 1]:
+            yield chunk
+
+    client.astream = fake_astream
+    model = SimpleNamespace(model_name="m", temperature=0.0)
+    messages = [{"role": "human", "content": "关键词"}]
+    valid = has_complete_indexed_tags
+
+    async def collect():
+        return "".join([chunk async for chunk in client.astream_cached(model, messages, validate=valid)])
+
+    assert asyncio.run(collect()) == "<topic1>健身"
+    assert client.cache.get(client._cache_key(model, messages)) is None
+    assert asyncio.run(collect()) == "<topic1>健身</topic1>"
+    assert asyncio.run(collect()) == "<topic1>健身</topic1>"
+    assert len(calls) == 2
+
+    client.cache.set(client._cache_key(model, messages), "<topic1>截断")
+    streams.append(["<topic1>美食</topic1>"])
+    assert asyncio.run(collect()) == "<topic1>美食</topic1>"
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_ttl_and_stale_entry()
+    test_disk_tier_survives_restart()
+    test_disk_tier_opens_lazily()
+    test_async_disk_io_off_loop()
+    test_invoke_cached_skips_unparseable()
+    test_astream_cached_validates()
+    print("\n🎉 缓存测试完成!")
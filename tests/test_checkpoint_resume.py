@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+检查点恢复测试脚本
+用三个节点的小工作流测试SQLite检查点：中途失败后以同一config_id再次运行，从失败的节点继续
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import tempfile
+from workflow import XiaohongshuAgent
+from workflow_types import WorkflowState
+from models import WorkflowStatus
+
+class ThreeStepAgent(XiaohongshuAgent):
+    """keywords -> retrieval -> generation；retrieval 第一次执行时抛出异常"""
+
+    def __init__(self, checkpoint_path):
+        super().__init__(checkpoint_path=checkpoint_path)
+        self.calls = []
+        self.fail_retrieval = True
+
+    def _build_workflow(self, include_generation=True, checkpointer=None):
+        from langgraph.graph import StateGraph, END
+
+        def keywords(state):
+            self.calls.append("keywords")
+            return {"search_keywords": ["健身"], "current_state": WorkflowStatus.KEYWORD_GENERATION.value}
+
+        def retrieval(state):
+            self.calls.append("retrieval")
+            if self.fail_retrieval:
+                self.fail_retrieval = False
+                raise RuntimeError("采集超时")
+            return {"retrieved_posts": [{"title": kw} for kw in state["search_keywords"]]}
+
+        def generation(state):
+            self.calls.append("generation")
+            return {"generated_content": {"title": state["retrieved_posts"][0]["title"]},
+                    "current_state": WorkflowStatus.COMPLETED.value}
+
+        workflow = StateGraph(WorkflowState)
+        workflow.add_node("keywords", keywords)
+        workflow.add_node("retrieval", retrieval)
+        workflow.add_node("generation", generation)
+        workflow.set_entry_point("keywords")
+        workflow.add_edge("keywords", "retrieval")
+        workflow.add_edge("retrieval", "generation")
+        workflow.add_edge("generation", END)
+        return workflow.compile(checkpointer=checkpointer)
+
+async def _run_resume(path):
+    agent = ThreeStepAgent(path)
+    failed = await agent.run_with_checkpoint("帮我做健身号", "run-1")
+    assert failed["current_state"] == WorkflowStatus.ERROR.value
+    assert agent.calls == ["keywords", "retrieval"]
+
+    # 同一config_id再次运行：已完成的keywords不再执行
+    agent.calls.clear()
+    resumed = await agent.run_with_checkpoint("帮我做健身号", "run-1")
+    assert resumed["current_state"] == WorkflowStatus.COMPLETED.value
+    assert resumed["generated_content"] == {"title": "健身"}
+    assert agent.calls == ["retrieval", "generation"]
+
+    # 已完成的运行再次调用时重新开始
+    agent.calls.clear()
+    await agent.run_with_checkpoint("帮我做健身号", "run-1")
+    assert agent.calls == ["keywords", "retrieval", "generation"]
+    await agent._checkpointer.conn.close()
+
+def test_resume_from_checkpoint():
+    """测试中途失败后从检查点恢复"""
+    print("\n🔍 测试检查点恢复...")
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_run_resume(os.path.join(tmp, "checkpoints.sqlite3")))
+    print("✅ 检查点恢复正常")
+
+if __name__ == "__main__":
+    test_resume_from_checkpoint()
+    print("\n🎉 检查点恢复测试完成!")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+帖子语料库测试脚本
+测试按ID upsert、按关键词取近期帖子和中文全文检索
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import tempfile
+import threading
+import time
+import utils.corpus_store as corpus_store
+import nodes.post_retrieval as post_retrieval
+from utils.corpus_store import CorpusStore, ngram_tokens, post_id
+
+POSTS = [
+    {"id": "n1", "title": "大龄女生脱单日记", "content": "34岁终于遇到对的人", "author": "A", "likes": "1,200", "comments": 30, "tags": ["大龄女生"]},
+    {"id": "n2", "title": "居家健身30天挑战", "content": "每天30分钟HIIT燃脂", "author": "B", "likes": 800, "comments": 12, "tags": ["健身"]},
+    {"title": "剩女择偶标准", "content": "人品好就行", "author": "C", "likes": 50},
+]
+
+def test_ngram_tokens():
+    """测试中文bigram切分"""
+    assert ngram_tokens("大龄女生") == ["大龄", "龄女", "女生"]
+    assert ngram_tokens("HIIT燃脂 30天") == ["hiit", "燃脂", "30", "天"]
+
+def test_upsert_and_recent():
+    """测试upsert更新互动数据、按关键词取近期帖子"""
+    print("\n🔍 测试语料库写入...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CorpusStore(os.path.join(tmp, "corpus.sqlite3"))
+        assert store.upsert_posts(POSTS, keyword="大龄女生") == 3
+        store.upsert_posts([{"id": "n1", "title": "", "content": "", "likes": 5000}], keyword="脱单")
+
+        recent = store.recent_posts_for_keyword("大龄女生", max_age=60)
+        assert [p["id"] for p in recent] == ["n1", "n2", post_id(POSTS[2])]
+        assert recent[0]["likes"] == 5000
+        assert recent[0]["title"] == "大龄女生脱单日记"
+        assert store.recent_posts_for_keyword("脱单", max_age=60)[0]["id"] == "n1"
+        time.sleep(0.02)
+        assert store.recent_posts_for_keyword("大龄女生", max_age=0.01) == []
+        assert store.stats()["posts"] == 3
+        store.close()
+    print("✅ 语料库写入正常")
+
+def test_search():
+    """测试中文全文检索"""
+    print("\n🔍 测试全文检索...")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CorpusStore(os.path.join(tmp, "corpus.sqlite3"))
+        store.upsert_posts(POSTS)
+        assert [p["id"] for p in store.search("脱单")] == ["n1"]
+        assert [p["id"] for p in store.search("燃脂")] == ["n2"]
+        assert store.search("女生健身") == []
+        assert len(list(store.iter_posts(batch_size=2))) == 3
+        store.close()
+    print(f"✅ 全文检索正常 (FTS5: {store.fts})")
+
+class ThreadRecordingStore(CorpusStore):
+    """记录每次读写所在的线程"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = []
+
+    def upsert_posts(self, *args, **kwargs):
+        self.threads.append(threading.get_ident())
+        return super().upsert_posts(*args, **kwargs)
+
+    def recent_posts_for_keyword(self, *args, **kwargs):
+        self.threads.append(threading.get_ident())
+        return super().recent_posts_for_keyword(*args, **kwargs)
+
+def test_retrieval_node_offloads_corpus_io():
+    """测试帖子检索节点在线程中读写语料库，不阻塞事件循环"""
+    print("\n🔍 测试检索节点的语料库读写...")
+    original = (corpus_store._corpus_store, post_retrieval.XHS_USE_MOCK)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ThreadRecordingStore(os.path.join(tmp, "corpus.sqlite3"))
+        corpus_store._corpus_store = store
+        post_retrieval.XHS_USE_MOCK = False
+        try:
+            async def run():
+                await post_retrieval._save_to_corpus("健身", [post_retrieval.PostRecord.from_dict(p) for p in POSTS])
+                return await post_retrieval._posts_from_corpus("健身")
+
+            loop_thread = threading.get_ident()
+            assert asyncio.run(run()) is None  # 少于 CORPUS_MIN_POSTS 篇，仍需采集
+            assert len(store.threads) == 2 and loop_thread not in store.threads
+            assert store.stats()["posts"] == 3
+        finally:
+            corpus_store._corpus_store, post_retrieval.XHS_USE_MOCK = original
+            store.close()
+    print("✅ 语料库读写不阻塞事件循环")
+
+if __name__ == "__main__":
+    test_ngram_tokens()
+    test_upsert_and_recent()
+    test_search()
+    test_retrieval_node_offloads_corpus_io()
+    print("\n🎉 帖子语料库测试完成!")
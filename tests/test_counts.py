@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+互动数解析测试脚本
+测试 "1.2万"、"10w+"、"3,456" 等写法统一转成整数
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+from utils.counts import parse_count, parse_counts, normalize_counts
+from utils.parsers import parse_xhs_posts
+from clients.xhs_client import XHSClient
+
+def test_parse_count():
+    """测试各种互动数写法"""
+    print("\n🔍 测试互动数解析...")
+    cases = {
+        "1.2万": 12000, "10w+": 100000, "3,456": 3456, "1.2k": 1200, "2.5K": 2500,
+        "1亿": 100000000, "999": 999, " 12 ": 12, "赞": 0, "": 0, "12.0": 12,
+        None: 0, 37: 37, 3.9: 3, True: 0,
+        "1e5": 0, "1.2.3": 0, "-3": 0, "12abc": 0, "999+": 999,
+        float("inf"): 0, float("-inf"): 0, float("nan"): 0,
+    }
+    for value, expected in cases.items():
+        assert parse_count(value) == expected, (value, parse_count(value))
+    print("✅ 互动数解析正常")
+
+def test_parse_counts():
+    """测试批量解析与逐个解析一致"""
+    values = ["1.2万", 5, "1.2万", None, "3,456", "10w+"]
+    assert parse_counts(values).tolist() == [parse_count(v) for v in values]
+    assert parse_counts([1, 2, 3]).tolist() == [1, 2, 3]
+    assert parse_counts([]).size == 0
+
+def test_ingestion_normalizes_counts():
+    """测试解析和提取阶段的互动数都是整数"""
+    print("\n🔍 测试入库前转换...")
+    payload = json.dumps({"data": {"items": [{"id": "n1", "likes": "1.2万", "comments": "3,456", "shares": "10w+"}]}})
+    post = parse_xhs_posts(payload)[0]
+    assert (post["likes"], post["comments"], post["shares"], post["views"]) == (12000, 3456, 100000, 0)
+
+    note = {"note_id": "n2", "interact_info": {"liked_count": "2.5万", "comment_count": "12", "share_count": 0}}
+    assert XHSClient._user_note_to_post(note)["likes"] == 25000
+    assert XHSClient._normalize_note({"note_card": {"interact_info": {"liked_count": "1k"}}})["likes"] == 1000
+
+    dom_post = normalize_counts({"id": "n3", "likes": "1.5万", "comments": "评论"})
+    assert dom_post == {"id": "n3", "likes": 15000, "comments": 0}
+    print("✅ 入库前转换正常")
+
+if __name__ == "__main__":
+    test_parse_count()
+    test_parse_counts()
+    test_ingestion_normalizes_counts()
+    print("\n🎉 互动数解析测试完成!")
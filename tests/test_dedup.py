@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+帖子近似去重测试脚本
+测试SimHash、分段LSH索引和保留互动量最高的副本
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+from utils.dedup import simhash, hamming, deduplicate_posts, corpus_duplicate_groups, SimHashIndex, DEFAULT_THRESHOLD
+from utils.corpus_store import CorpusStore
+
+ORIGINAL = "坐标北京，34岁了，我依旧是大龄单身剩女。我在大学期间谈恋爱很容易，谈了一段3年的恋爱，毕业之后又遇到了第二任男朋友。"
+REPOST = "坐标北京 34岁了 我依旧是大龄单身剩女！！我在大学期间谈恋爱很容易，谈了一段3年的恋爱，毕业之后又遇到了第二任男朋友～"
+EDITED = "坐标北京，34岁了，我依旧是大龄单身剩女。我在大学期间谈恋爱很容易，谈了一段3年的恋爱，毕业之后又遇到了第二任男朋友。转自@小红薯"
+OTHER = "居家健身30天挑战，每天只需要30分钟，在家也能练出好身材，HIIT燃脂效果堪比跑步一小时。"
+
+def test_simhash_distance():
+    """测试转载文本指纹接近、不同内容指纹远"""
+    print("\n🔍 测试SimHash...")
+    near = hamming(simhash(ORIGINAL), simhash(REPOST))
+    edited = hamming(simhash(ORIGINAL), simhash(EDITED))
+    far = hamming(simhash(ORIGINAL), simhash(OTHER))
+    print(f"📝 转载距离 {near}，改写距离 {edited}，不同内容距离 {far}")
+    assert near == 0
+    assert edited <= DEFAULT_THRESHOLD
+    assert far > 3 * DEFAULT_THRESHOLD
+    print("✅ SimHash正常")
+
+def test_deduplicate_keeps_most_engaged():
+    """测试每组保留互动量最高的一篇"""
+    print("\n🔍 测试帖子去重...")
+    posts = [
+        {"id": "a", "title": "", "content": ORIGINAL, "likes": "120", "comments": 3},
+        {"id": "b", "title": "", "content": OTHER, "likes": 10},
+        {"id": "c", "title": "", "content": REPOST, "likes": "1,500"},
+        {"id": "b", "title": "", "content": OTHER, "likes": 12},
+        {"id": "d", "title": "", "content": EDITED, "likes": 300},
+        {"id": "", "title": "", "content": "", "likes": 0},
+    ]
+    kept, removed = deduplicate_posts(posts)
+    assert removed == 3
+    assert [p["id"] for p in kept] == ["c", "b", ""]
+    assert kept[1]["likes"] == 12
+    print("✅ 帖子去重正常")
+
+def test_index_rejects_unsafe_threshold():
+    """测试阈值超过分段数时拒绝创建索引"""
+    try:
+        SimHashIndex(threshold=8)
+    except ValueError:
+        return
+    assert False, "应当拒绝阈值8"
+
+def test_corpus_duplicates():
+    """测试对历史语料库去重"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CorpusStore(os.path.join(tmp, "corpus.sqlite3"))
+        store.upsert_posts([
+            {"id": "a", "content": ORIGINAL, "likes": 1},
+            {"id": "c", "content": REPOST, "likes": 9},
+            {"id": "b", "content": OTHER, "likes": 5},
+        ])
+        assert corpus_duplicate_groups(store) == [["c", "a"]]
+        store.close()
+
+if __name__ == "__main__":
+    test_simhash_distance()
+    test_deduplicate_keeps_most_engaged()
+    test_index_rejects_unsafe_threshold()
+    test_corpus_duplicates()
+    print("\n🎉 帖子近似去重测试完成!")
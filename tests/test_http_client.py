@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+签名API HTTP客户端测试脚本
+测试同一个 XHSClient 在多次 asyncio.run 中重新创建HTTP客户端和域名信号量
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from clients.xhs_client import XHSClient
+
+async def _use_client(client):
+    http = client._get_http_client()
+    assert client._get_http_client() is http
+
+    async def request():
+        async with client._host_semaphore("www.xiaohongshu.com"):
+            await asyncio.sleep(0.01)
+
+    # 每个域名只允许1个并发，第二个请求需要在信号量上等待
+    await asyncio.gather(request(), request())
+    return http
+
+def test_reuse_across_event_loops():
+    """测试事件循环变化后HTTP客户端和信号量重新创建，排队等待不报错"""
+    print("\n🔍 测试跨事件循环复用...")
+    client = XHSClient(max_connections_per_host=1)
+    first = asyncio.run(_use_client(client))
+
+    async def second_run():
+        try:
+            return await _use_client(client)
+        finally:
+            await client.shutdown()
+
+    second = asyncio.run(second_run())
+    assert second is not first
+    assert client._http is None
+    print("✅ 跨事件循环复用正常")
+
+if __name__ == "__main__":
+    test_reuse_across_event_loops()
+    print("\n🎉 HTTP客户端测试完成!")
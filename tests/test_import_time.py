@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+导入耗时测试脚本
+在子进程中导入入口模块，确认重依赖被延迟加载（不在 sys.modules 中），导入耗时只记录不断言
+"""
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入入口模块时不应加载的重依赖
+LAZY_MODULES = ("playwright", "langchain_openai", "openai", "langgraph", "numpy")
+
+# 子进程中执行：导入模块后输出耗时和已加载的重依赖
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed_ms = (time.perf_counter() - start) * 1000
+lazy = {lazy!r}
+loaded = sorted({{name.split(".")[0] for name in sys.modules}} & set(lazy))
+print(json.dumps({{"elapsed_ms": elapsed_ms, "loaded": loaded}}))
+"""
+
+def _import_probe(module: str):
+    """在新的子进程中导入模块，返回 (导入耗时毫秒, 已加载的重依赖)"""
+    env = {**os.environ, "XHS_USE_MOCK": "true"}
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, lazy=LAZY_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        pytest.skip(f"无法导入 {module}（依赖未安装）: {proc.stderr.strip().splitlines()[-1]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result["elapsed_ms"], result["loaded"]
+
+@pytest.mark.parametrize("module", ["workflow", "clients", "main"])
+def test_entry_import_lazy(module):
+    """测试入口模块导入后重依赖不在 sys.modules 中"""
+    print(f"\n🔍 测试 {module} 延迟加载...")
+    elapsed_ms, loaded = _import_probe(module)
+    # 耗时受机器负载影响，只记录不断言
+    print(f"📝 {module} 导入耗时: {elapsed_ms:.0f}ms")
+    assert not loaded, f"导入 {module} 时加载了应延迟的模块: {loaded}"
+    print(f"✅ {module} 延迟加载正常")
+
+if __name__ == "__main__":
+    for name in ("workflow", "clients", "main"):
+        test_entry_import_lazy(name)
+    print("\n🎉 导入耗时测试完成!")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+页面就绪等待测试脚本
+用模拟页面测试XHR响应收集和滚动到稳定
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from clients.page_readiness import ResponseCollector, scroll_until_stable, wait_for_items
+
+class FakeRequest:
+    resource_type = "xhr"
+
+class FakeResponse:
+    ok = True
+    request = FakeRequest()
+
+    def __init__(self, url, payload):
+        self.url = url
+        self._payload = payload
+
+    async def json(self):
+        await asyncio.sleep(0.01)
+        return self._payload
+
+class FakePage:
+    """每次滚动到底部后，若还有下一页就异步发出一个笔记接口响应"""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.listeners = []
+        self.scrolls = 0
+
+    def on(self, event, handler):
+        self.listeners.append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove(handler)
+
+    def emit_next(self):
+        if self.pages:
+            response = FakeResponse("https://www.xiaohongshu.com/api/sns/web/v1/user_posted?cursor=x", self.pages.pop(0))
+            for handler in list(self.listeners):
+                handler(response)
+
+    async def evaluate(self, script, *args):
+        if script.startswith("window.scrollTo"):
+            self.scrolls += 1
+            asyncio.get_running_loop().call_later(0.01, self.emit_next)
+        return 1000
+
+class FakeCardPage:
+    """页面初始有 initial 张卡片，每次滚动后异步多加载 step 张，最多 total 张"""
+
+    def __init__(self, initial, total, step=5):
+        self.cards = initial
+        self.total = total
+        self.step = step
+        self.scrolls = 0
+
+    def _load_more(self):
+        self.cards = min(self.total, self.cards + self.step)
+
+    async def evaluate(self, script, *args):
+        if script.startswith("window.scrollTo"):
+            self.scrolls += 1
+            asyncio.get_running_loop().call_later(0.01, self._load_more)
+            return None
+        return self.cards
+
+    async def wait_for_function(self, script, arg=None, timeout=0):
+        selector, count = arg
+        deadline = asyncio.get_running_loop().time() + timeout / 1000
+        while self.cards < count:
+            if asyncio.get_running_loop().time() >= deadline:
+                raise TimeoutError("wait_for_function timeout")
+            await asyncio.sleep(0.005)
+
+def _notes(start, count):
+    return {"success": True, "data": {"notes": [{"note_id": str(i)} for i in range(start, start + count)]}}
+
+async def _test_stops_at_limit():
+    page = FakePage([_notes(0, 10), _notes(10, 10), _notes(20, 10), _notes(30, 10)])
+    collected = []
+
+    def done():
+        while collector.payloads:
+            collected.extend(collector.payloads.pop(0)["data"]["notes"])
+        return len(collected) >= 25
+
+    async with ResponseCollector(page, ["/user_posted"]) as collector:
+        page.emit_next()
+        assert await collector.wait_first(1.0)
+        await scroll_until_stable(page, done=done, collector=collector, settle_timeout=1.0)
+    assert len(collected) == 30
+    assert page.scrolls == 2
+    assert page.listeners == []
+
+async def _test_stops_when_stable():
+    page = FakePage([_notes(0, 5)])
+    async with ResponseCollector(page, ["/user_posted"]) as collector:
+        page.emit_next()
+        assert await collector.wait_first(1.0)
+        started = asyncio.get_running_loop().time()
+        rounds = await scroll_until_stable(page, done=lambda: False, collector=collector, settle_timeout=0.1)
+        elapsed = asyncio.get_running_loop().time() - started
+    assert rounds == 1
+    assert elapsed < 0.5
+    assert collector.received == 1
+
+async def _test_ignores_other_responses():
+    page = FakePage([])
+    async with ResponseCollector(page, ["/user_posted"]) as collector:
+        page.listeners[0](FakeResponse("https://www.xiaohongshu.com/api/other", {}))
+        assert not await collector.wait_first(0.05)
+
+async def _test_wait_for_items():
+    # 卡片够数时滚动加载到目标数量
+    page = FakeCardPage(initial=5, total=30)
+    assert await wait_for_items(page, ".note-item", 12, timeout=2000, settle_timeout=0.5) >= 12
+    assert page.scrolls == 2
+
+    # 卡片少于目标数量时尽快返回，而不是等满超时
+    page = FakeCardPage(initial=3, total=3)
+    started = asyncio.get_running_loop().time()
+    assert await wait_for_items(page, ".note-item", 20, timeout=5000, settle_timeout=0.1) == 3
+    assert asyncio.get_running_loop().time() - started < 0.5
+
+    # 没有卡片时在超时内返回0
+    assert await wait_for_items(FakeCardPage(initial=0, total=0), ".note-item", 20, timeout=100) == 0
+
+def test_stops_at_limit():
+    """测试凑够数量后立即停止滚动"""
+    print("\n🔍 测试凑够数量即停止...")
+    asyncio.run(_test_stops_at_limit())
+    print("✅ 凑够数量即停止正常")
+
+def test_stops_when_stable():
+    """测试滚动后没有新数据时停止"""
+    print("\n🔍 测试滚动到稳定...")
+    asyncio.run(_test_stops_when_stable())
+    print("✅ 滚动到稳定正常")
+
+def test_ignores_other_responses():
+    """测试不匹配的响应不会被收集"""
+    asyncio.run(_test_ignores_other_responses())
+
+def test_wait_for_items():
+    """测试等待卡片：凑够即停，卡片较少时不等满超时"""
+    print("\n🔍 测试等待列表元素...")
+    asyncio.run(_test_wait_for_items())
+    print("✅ 等待列表元素正常")
+
+if __name__ == "__main__":
+    test_stops_at_limit()
+    test_stops_when_stable()
+    test_ignores_other_responses()
+    test_wait_for_items()
+    print("\n🎉 页面就绪等待测试完成!")
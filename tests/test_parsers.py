@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+解析器测试脚本
+测试 utils.parsers 中的XML标签提取函数
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.parsers import extract_xml_tags, find_xml_tags, extract_numbered_results, extract_indexed_tags, StreamingTagParser, IncrementalContentParser
+
+def test_extract_xml_tags():
+    """测试单个标签提取"""
+    print("\n🔍 测试XML标签提取...")
+    text = "<topic1>大龄女生</topic1>\n<topic2> 剩女 </topic2>"
+    extracted = extract_xml_tags(text, ["topic1", "topic2", "topic3"])
+    assert extracted["topic1"] == "大龄女生"
+    assert extracted["topic2"] == "剩女"
+    assert extracted["topic3"] == "Error: Cannot find topic3 tag"
+    print("✅ XML标签提取正常")
+
+def test_find_xml_tags_tolerant():
+    """测试单次扫描对嵌套、未闭合和多余闭标签的容错"""
+    print("\n🔍 测试XML标签容错提取...")
+    text = "</stray><hitpoints><hitpoint1>甲</hitpoint1><hitpoint2>乙<b>粗</b></hitpoints><hitpoint3>丙"
+    found = find_xml_tags(text)
+    assert found["hitpoint1"] == "甲"
+    assert found["hitpoint2"] == "乙"
+    assert found["b"] == "粗"
+    assert found["hitpoint3"] == "丙"
+    assert found["hitpoints"].startswith("<hitpoint1>甲</hitpoint1>")
+    assert find_xml_tags("<a>1</a><a>2</a>", ["a"]) == {"a": "1"}
+    assert find_xml_tags("", ["a"]) == {}
+    print("✅ XML标签容错提取正常")
+
+def test_extract_numbered_results():
+    """测试批量编号结果提取"""
+    print("\n🔍 测试批量编号结果提取...")
+    text = "<result_1>1</result_1><result_3> 0 </result_3><result_9>1</result_9>"
+    results = extract_numbered_results(text, 4)
+    assert results == ["1", None, "0", None]
+    assert extract_numbered_results("", 2) == [None, None]
+    print("✅ 批量编号结果提取正常，缺失和越界编号返回None")
+
+def test_extract_indexed_tags():
+    """测试任意数量编号标签提取"""
+    print("\n🔍 测试编号标签提取...")
+    text = "<topic3>三</topic3><topic1>一</topic1><topic2> </topic2><topic10>十</topic10><topic4>一</topic4>"
+    assert extract_indexed_tags(text) == ["一", "三", "十"]
+    assert extract_indexed_tags(text, limit=2) == ["一", "三"]
+    assert extract_indexed_tags(None) == []
+    print("✅ 编号标签提取正常，按编号排序并去重")
+
+def test_streaming_tag_parser():
+    """测试流式标签解析：任意切块结果相同，标签闭合即产出"""
+    print("\n🔍 测试流式标签解析...")
+    text = "思考中 a<b <topic1>大龄女生</topic1>\n<topic2>剩女</topic2><note>x</note><topic3>脱单"
+    for chunk_size in (1, 2, 5, len(text)):
+        parser = StreamingTagParser(prefix="topic")
+        events = []
+        for i in range(0, len(text), chunk_size):
+            events += parser.feed(text[i:i + chunk_size])
+        assert events == [("topic1", "大龄女生"), ("topic2", "剩女")]
+        assert parser.close() == [("topic3", "脱单")]
+        assert parser.raw_text == text
+
+    parser = StreamingTagParser()
+    assert parser.feed("<topic1>甲</top") == []
+    assert parser.feed("ic1>") == [("topic1", "甲")]
+    print("✅ 流式标签解析正常")
+
+def test_incremental_content_parser():
+    """测试流式文案解析：任意切块都得到相同结果，分节标记可跨块"""
+    print("\n🔍 测试流式文案解析...")
+    text = "好的\n标题：那些劝我的人\n\n正文：第一段\n第二段 正文：不是标记\n\nHashtag: #大龄不将就 #单身万岁"
+    for chunk_size in (1, 2, 3, 7, len(text)):
+        parser = IncrementalContentParser()
+        deltas = []
+        for i in range(0, len(text), chunk_size):
+            deltas += parser.feed(text[i:i + chunk_size])
+        deltas += parser.close()
+        result = parser.result()
+        assert result["title"] == "那些劝我的人"
+        assert result["content"] == "第一段\n第二段 正文：不是标记"
+        assert result["tags"] == ["大龄不将就", "单身万岁"]
+        assert "".join(d for s, d in deltas if s == "title").strip() == "那些劝我的人"
+    print("✅ 流式文案解析正常")
+
+if __name__ == "__main__":
+    test_extract_xml_tags()
+    test_find_xml_tags_tolerant()
+    test_extract_numbered_results()
+    test_extract_indexed_tags()
+    test_streaming_tag_parser()
+    test_incremental_content_parser()
+    print("\n🎉 解析器测试完成!")
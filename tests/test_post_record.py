@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+帖子记录测试脚本
+测试 PostRecord 的字典式访问、解析结果类型和到 pydantic Post 的转换
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import pickle
+from models import Post, PostRecord
+from utils.parsers import parse_xhs_posts, parse_markdown_posts
+from utils.dedup import deduplicate_posts
+from utils.prefilter import default_prefilter
+
+def test_mapping_access():
+    """测试按字典方式读写字段"""
+    print("\n🔍 测试字典式访问...")
+    post = PostRecord.from_dict({"id": 7, "title": "标题", "likes": "1.2万", "images": ["x"]})
+    assert post["id"] == "7" and post["likes"] == 12000
+    assert post.get("content") == "" and post.get("images", []) == []
+    assert "title" in post and "images" not in post
+    post["quality_score"] = 9.0
+    assert post.quality_score == 9.0
+    try:
+        post["images"] = []
+        assert False, "未知字段应抛出KeyError"
+    except KeyError:
+        pass
+    assert not hasattr(post, "__dict__")
+    assert pickle.loads(pickle.dumps(post)) == post
+    print("✅ 字典式访问正常")
+
+def test_parsers_return_records():
+    """测试解析结果为PostRecord，下游按字典处理的代码不受影响"""
+    payload = json.dumps({"data": {"items": [
+        {"id": "a", "title": "居家健身", "content": "每天30分钟，在家也能练出好身材，附上计划。", "likes": "300"},
+        {"id": "a", "title": "居家健身", "content": "每天30分钟，在家也能练出好身材，附上计划。", "likes": "500"},
+    ]}})
+    posts = parse_xhs_posts(payload)
+    assert all(isinstance(post, PostRecord) for post in posts)
+    kept, removed = deduplicate_posts(posts)
+    assert removed == 1 and kept[0]["likes"] == 500
+    assert default_prefilter.check(kept[0]).decision is None
+
+    markdown = "| 标题 | 内容 | 作者 |\n| :--- | :--- | :--- |\n| 标题1 | 内容1 | 作者1 |"
+    assert parse_markdown_posts(markdown) == [PostRecord(title="标题1", content="内容1", author="作者1")]
+
+def test_parse_invalid_json():
+    """测试畸形响应返回空列表而不是抛出异常"""
+    assert parse_xhs_posts("{not json") == []
+    assert parse_xhs_posts('{"data": {"items": [1]}}') == []
+
+def test_to_post():
+    """测试API边界转换为pydantic Post"""
+    record = PostRecord(id="n1", title="t", content="c", author="a", likes=10, comments=5, shares=5, views=100, tags=["x"])
+    post = record.to_post(quality_score=9.0)
+    assert isinstance(post, Post)
+    assert post.likes == 10 and post.quality_score == 9.0 and post.tags == ["x"]
+    assert post.engagement_rate == record.engagement_rate == 0.2
+
+if __name__ == "__main__":
+    test_mapping_access()
+    test_parsers_return_records()
+    test_parse_invalid_json()
+    test_to_post()
+    print("\n🎉 帖子记录测试完成!")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+帖子规则预过滤测试脚本
+测试Aho-Corasick词表匹配、正则信号和判定阈值
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.prefilter import AhoCorasick, SpamPrefilter, _SIGNALS
+
+def test_aho_corasick():
+    """测试重叠和嵌套模式串的匹配"""
+    print("\n🔍 测试Aho-Corasick...")
+    automaton = AhoCorasick(["he", "she", "his", "hers", "加微", "微信"])
+    assert automaton.find("ushers") == {"she", "he", "hers"}
+    assert automaton.find("加微信看主页") == {"加微", "微信"}
+    assert automaton.find("HIS") == {"his"}
+    assert automaton.find("今天天气不错") == set()
+    print("✅ Aho-Corasick正常")
+
+def test_prefilter_decisions():
+    """测试明显垃圾直接拒绝、普通帖子交给LLM"""
+    print("\n🔍 测试规则预过滤...")
+    prefilter = SpamPrefilter(reject_threshold=0.8)
+    spam = {"title": "月入过万的兼职", "content": "想了解的私信我，加微 abc_12345 拉你进群", "likes": 3}
+    phone = {"title": "二手转让", "content": "有意者联系13812345678，同城自提", "likes": 0}
+    empty = {"title": "大龄女生日常", "content": ""}
+    normal = {"title": "大龄女生脱单日记", "content": "34岁终于遇到对的人，分享一下这一年相亲的心路历程和一些经验。", "likes": 120}
+    promoted = {"title": "这支口红真的绝了", "content": "不是推广！自费买的，黄皮也能驾驭，质地很润，持妆一整天都不拔干。", "likes": 50}
+
+    results = prefilter.check_all([spam, phone, empty, normal, promoted])
+    assert [r.decision for r in results] == ["0", "0", "0", None, None]
+    assert "微信号" in results[0].reasons
+    assert "手机号" in results[1].reasons
+    print(f"✅ 规则预过滤正常: {[round(r.score, 2) for r in results]}")
+
+def test_ordinary_posts_reach_llm():
+    """测试只含常见词表词、没有联系方式的正常帖子不会被直接拒绝"""
+    print("\n🔍 测试正常帖子不被误判...")
+    posts = [
+        {"title": "人均80的宝藏火锅", "content": "团购套餐很划算，下单前记得领优惠券，锅底和毛肚都很新鲜，服务也好。", "likes": 200},
+        {"title": "微信读书年度书单", "content": "整理了今年读过的十本好书，链接在评论区，欢迎大家一起交流读后感。", "likes": 80},
+        {"title": "大学生兼职经验", "content": "分享一下我在奶茶店兼职半年的经历，工资不高但学到了很多待人接物的方法。", "likes": 30},
+        {"title": "扫码点餐踩雷", "content": "这家店扫码点餐一直卡住，最后还是找服务员下单，味道倒是不错，推荐招牌菜。", "likes": 15},
+    ]
+    for post, result in zip(posts, SpamPrefilter().check_all(posts)):
+        assert result.decision is None, (post["title"], result)
+    print("✅ 正常帖子交给LLM")
+
+def test_strong_terms_without_contact():
+    """测试没有联系方式时即使引流词很多也交给LLM判断"""
+    post = {"title": "招代理 日赚500", "content": "躺赚项目，免费领资料，想做的来问问看看吧，名额有限先到先得。", "likes": 0}
+    result = SpamPrefilter().check(post)
+    assert result.decision is None and result.score >= 0.8
+
+def test_wechat_id_pattern():
+    """测试只有明确的微信号才算留联系方式，品牌名不算"""
+    post = {"title": "好用的App推荐", "content": "我一直用微信WeChat和支付宝，记账用鲨鱼记账，日程用滴答清单，分享给大家。", "likes": 20}
+    result = SpamPrefilter().check(post)
+    assert result.decision is None and "微信号" not in result.reasons, result
+
+    pattern = dict((name, regex) for name, regex, _ in _SIGNALS)["微信号"]
+    for text in ("加微 abc_12345", "微信号：xiaohong_shu", "vx: Lily_fit", "wx lily2024"):
+        assert pattern.search(text), text
+    for text in ("微信WeChat", "微信号：WeChat", "wx abcdefg", "微信读书yyds"):
+        assert not pattern.search(text), text
+
+def test_accept_threshold():
+    """测试开启accept_threshold后干净帖子直接通过"""
+    prefilter = SpamPrefilter(accept_threshold=0.0)
+    post = {"title": "居家健身30天挑战", "content": "每天只需要30分钟，在家也能练出好身材，附上我的训练计划。", "likes": 10}
+    assert prefilter.check(post).decision == "1"
+
+if __name__ == "__main__":
+    test_aho_corasick()
+    test_prefilter_decisions()
+    test_ordinary_posts_reach_llm()
+    test_strong_terms_without_contact()
+    test_wechat_id_pattern()
+    test_accept_threshold()
+    print("\n🎉 帖子规则预过滤测试完成!")
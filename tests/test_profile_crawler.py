@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+多用户主页爬取测试脚本
+用模拟的签名接口测试游标翻页、流式产出、域名限速和断点续爬
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import tempfile
+import time
+from contextlib import contextmanager
+import clients.profile_crawler as profile_crawler
+from clients.profile_crawler import DomainThrottle, ProfileCrawler
+from clients.xhs_client import XHSClient
+from config import XHS_USE_MOCK
+
+class FakePool:
+    size = 4
+
+class FakeClient:
+    """每个用户3页、每页2条笔记；fail_cursors 中的游标第一次请求失败"""
+    _pool = FakePool()
+    _user_note_to_post = staticmethod(XHSClient._user_note_to_post)
+
+    def __init__(self, fail_cursors=()):
+        self.fail_cursors = set(fail_cursors)
+        self.requests = []
+
+    async def _make_signed_request(self, api_path, params):
+        cursor = params["cursor"]
+        self.requests.append((params["user_id"], cursor))
+        if cursor in self.fail_cursors:
+            self.fail_cursors.discard(cursor)
+            return {"success": False, "error": "HTTP 461"}
+        index = int(cursor or 0)
+        notes = [{"note_id": f"{params['user_id']}-{index * 2 + i}"} for i in range(2)]
+        data = {"notes": notes, "cursor": str(index + 1), "has_more": index < 2}
+        return {"success": True, "data": {"success": True, "data": data}}
+
+async def _collect(crawler, user_ids, **kwargs):
+    return [item async for item in crawler.crawl(user_ids, **kwargs)]
+
+def _make_crawler(client, path):
+    return ProfileCrawler(client, min_interval=0, progress_path=path, use_browser_fallback=False)
+
+@contextmanager
+def _live_mode():
+    """临时关闭模拟数据模式，走签名接口翻页"""
+    original = profile_crawler.XHS_USE_MOCK
+    profile_crawler.XHS_USE_MOCK = False
+    try:
+        yield
+    finally:
+        profile_crawler.XHS_USE_MOCK = original
+
+def test_paginates_all_users():
+    """测试多个用户按游标翻页并逐页产出"""
+    print("\n🔍 测试多用户翻页...")
+    with _live_mode(), tempfile.TemporaryDirectory() as tmp:
+        client = FakeClient()
+        items = asyncio.run(_collect(_make_crawler(client, os.path.join(tmp, "p.sqlite3")), ["a", "b", "c"]))
+    by_user = {}
+    for item in items:
+        by_user.setdefault(item["user_id"], []).extend(post["id"] for post in item["posts"])
+    assert sorted(by_user) == ["a", "b", "c"]
+    assert by_user["a"] == [f"a-{i}" for i in range(6)]
+    assert len(items) == 9
+    print(f"✅ 多用户翻页正常: 共 {len(items)} 页")
+
+def test_max_posts():
+    """测试每个用户抓够max_posts即停止翻页"""
+    with _live_mode(), tempfile.TemporaryDirectory() as tmp:
+        client = FakeClient()
+        items = asyncio.run(_collect(_make_crawler(client, os.path.join(tmp, "p.sqlite3")), ["a"], max_posts=3))
+    assert sum(len(item["posts"]) for item in items) == 3
+    assert len(client.requests) == 2
+
+def test_resume_after_failure():
+    """测试中途失败后重新爬取从上次的游标继续"""
+    print("\n🔍 测试断点续爬...")
+    with _live_mode(), tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "p.sqlite3")
+        client = FakeClient(fail_cursors={"2"})
+        first = asyncio.run(_collect(_make_crawler(client, path), ["a"]))
+        assert "error" in first[-1] and first[-1]["fetched"] == 4
+
+        client.requests.clear()
+        second = asyncio.run(_collect(_make_crawler(client, path), ["a"]))
+        assert client.requests == [("a", "2")]
+        assert [post["id"] for post in second[0]["posts"]] == ["a-4", "a-5"]
+
+        # 已完成的用户不会再次请求
+        client.requests.clear()
+        assert asyncio.run(_collect(_make_crawler(client, path), ["a"])) == []
+        assert client.requests == []
+    print("✅ 断点续爬正常")
+
+def test_resume_after_cap():
+    """测试因max_posts停止的用户不算完成：同样上限下跳过，调大上限后从截断处继续"""
+    print("\n🔍 测试上限后续爬...")
+    with _live_mode(), tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "p.sqlite3")
+        client = FakeClient()
+        crawler = _make_crawler(client, path)
+        first = asyncio.run(_collect(crawler, ["a"], max_posts=3))
+        assert first[-1]["capped"] and not first[-1]["has_more"]
+        assert crawler.progress.get("a") == {"cursor": "1", "fetched": 3, "done": False, "capped": True, "offset": 1, "error": None}
+        crawler.progress.close()
+
+        client.requests.clear()
+        assert asyncio.run(_collect(_make_crawler(client, path), ["a"], max_posts=3)) == []
+        assert client.requests == []
+
+        second = asyncio.run(_collect(_make_crawler(client, path), ["a"]))
+        assert client.requests == [("a", "1"), ("a", "2")]
+        assert [post["id"] for item in second for post in item["posts"]] == ["a-3", "a-4", "a-5"]
+        assert not second[-1]["capped"]
+
+        # 主页已到末尾，不再请求
+        client.requests.clear()
+        assert asyncio.run(_collect(_make_crawler(client, path), ["a"])) == []
+        assert client.requests == []
+    print("✅ 上限后续爬正常")
+
+def test_crawl_closes_progress():
+    """测试每次crawl结束后关闭进度库连接，同一爬取器再次crawl时重新打开"""
+    with _live_mode(), tempfile.TemporaryDirectory() as tmp:
+        crawler = _make_crawler(FakeClient(), os.path.join(tmp, "p.sqlite3"))
+        asyncio.run(_collect(crawler, ["a"], max_posts=2))
+        assert crawler.progress._conn is None
+        assert len(asyncio.run(_collect(crawler, ["b"], max_posts=2))) == 1
+        assert crawler.progress._conn is None
+    assert profile_crawler.XHS_USE_MOCK is XHS_USE_MOCK
+
+def test_domain_throttle():
+    """测试同一域名的请求间隔"""
+    throttle = DomainThrottle(concurrency=4, min_interval=0.05)
+
+    async def hit():
+        async with throttle.slot("www.xiaohongshu.com"):
+            return time.monotonic()
+
+    async def run():
+        return sorted(await asyncio.gather(*[hit() for _ in range(4)]))
+
+    starts = asyncio.run(run())
+    assert starts[-1] - starts[0] >= 0.14
+
+if __name__ == "__main__":
+    test_paginates_all_users()
+    test_max_posts()
+    test_resume_after_failure()
+    test_resume_after_cap()
+    test_crawl_closes_progress()
+    test_domain_throttle()
+    print("\n🎉 多用户主页爬取测试完成!")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+LLM限流器测试脚本
+测试并发上限、AIMD退避和指标
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from types import SimpleNamespace
+from clients.rate_limiter import LLMRateLimiter, is_rate_limit_error
+from clients.llm_client import LLMClient
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+async def _test_concurrency_cap():
+    limiter = LLMRateLimiter(max_concurrency=3, tokens_per_minute=None)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.limit("model-a", 100):
+            peak = max(peak, limiter.for_model("model-a").in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*[call() for _ in range(20)])
+    metrics = limiter.metrics()["model-a"]
+    assert peak <= 3
+    assert metrics["requests"] == 20
+    assert metrics["in_flight"] == 0 and metrics["queue_depth"] == 0
+    return metrics
+
+async def _test_aimd_backoff():
+    limiter = LLMRateLimiter(max_concurrency=8, tokens_per_minute=None)
+    model_limiter = limiter.for_model("model-b")
+    model_limiter.max_backoff = 0.0
+    try:
+        async with limiter.limit("model-b", 10):
+            raise FakeRateLimitError("Too Many Requests")
+    except FakeRateLimitError:
+        pass
+    assert model_limiter.concurrency_limit == 4
+    assert limiter.metrics()["model-b"]["rate_limited"] == 1
+
+    # 成功调用逐步恢复并发上限
+    for _ in range(50):
+        async with limiter.limit("model-b", 10):
+            pass
+    assert model_limiter.concurrency_limit == 8
+
+async def _test_contended(limiter):
+    async def call():
+        async with limiter.limit("model-c", 10):
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*[call() for _ in range(3)])
+
+def test_reuse_across_event_loops():
+    """测试同一个限流器在多次 asyncio.run 中排队等待"""
+    limiter = LLMRateLimiter(max_concurrency=1, tokens_per_minute=None)
+    asyncio.run(_test_contended(limiter))
+    asyncio.run(_test_contended(limiter))
+    assert limiter.metrics()["model-c"]["requests"] == 6
+
+class FakeStreamModel:
+    """按块流式返回文本；usage 不为None时最后一块带用量元数据"""
+
+    def __init__(self, chunks, usage=None):
+        self.model_name = "stream-model"
+        self.temperature = 0.0
+        self.max_tokens = 4000
+        self.chunks = chunks
+        self.usage = usage
+
+    async def astream(self, messages):
+        for i, text in enumerate(self.chunks):
+            last = i == len(self.chunks) - 1
+            metadata = {"total_tokens": self.usage} if last and self.usage else None
+            yield SimpleNamespace(content=text, usage_metadata=metadata, response_metadata={})
+
+async def _stream_and_remaining(model):
+    client = LLMClient()
+    client.rate_limiter = LLMRateLimiter(tokens_per_minute=10_000)
+    messages = [{"role": "human", "content": "帖" * 100}]
+    text = "".join([chunk async for chunk in client.astream(model, messages)])
+    return text, client.rate_limiter.for_model(model.model_name)._tokens
+
+def test_stream_settles_permit():
+    """测试流式调用结束后按实际用量结算，退回多预占的max_tokens"""
+    text, remaining = asyncio.run(_stream_and_remaining(FakeStreamModel(["<topic1>", "健身", "</topic1>"])))
+    assert text == "<topic1>健身</topic1>"
+    # 没有用量元数据时按提示词100字 + 输出18字估算
+    assert 10_000 - 130 <= remaining < 10_000 - 110
+    _, remaining = asyncio.run(_stream_and_remaining(FakeStreamModel(["ok"], usage=500)))
+    assert 10_000 - 510 <= remaining < 10_000 - 490
+
+def test_concurrency_cap():
+    """测试并发数不超过上限"""
+    print("\n🔍 测试并发上限...")
+    metrics = asyncio.run(_test_concurrency_cap())
+    print(f"✅ 并发上限正常，平均等待 {metrics['wait_avg']:.4f}s")
+
+def test_aimd_backoff():
+    """测试429后乘性收缩、成功后加性恢复"""
+    print("\n🔍 测试AIMD退避...")
+    asyncio.run(_test_aimd_backoff())
+    print("✅ AIMD退避与恢复正常")
+
+def test_is_rate_limit_error():
+    """测试限流异常识别"""
+    assert is_rate_limit_error(FakeRateLimitError())
+    assert is_rate_limit_error(Exception("Error code: 429 - rate limit exceeded"))
+    assert not is_rate_limit_error(ValueError("bad request"))
+
+if __name__ == "__main__":
+    test_concurrency_cap()
+    test_aimd_backoff()
+    test_is_rate_limit_error()
+    test_reuse_across_event_loops()
+    test_stream_settles_permit()
+    print("\n🎉 限流器测试完成!")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+资源拦截测试脚本
+测试按类型/域名拦截和按页面放行
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from clients.resource_blocking import ResourceBlocker
+
+class FakePage:
+    pass
+
+class FakeFrame:
+    def __init__(self, page):
+        self.page = page
+
+class FakeRequest:
+    def __init__(self, resource_type, url, page):
+        self.resource_type = resource_type
+        self.url = url
+        self.frame = FakeFrame(page)
+
+class FakeRoute:
+    def __init__(self, resource_type, url, page):
+        self.request = FakeRequest(resource_type, url, page)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "abort"
+
+    async def continue_(self):
+        self.outcome = "continue"
+
+def test_should_block():
+    """测试按资源类型和域名拦截"""
+    print("\n🔍 测试资源拦截规则...")
+    blocker = ResourceBlocker(("image", "media", "font"), ("google-analytics.com",))
+    assert blocker.should_block("image", "https://sns-img.xhscdn.com/a.jpg")
+    assert blocker.should_block("font", "https://fe-static.xhscdn.com/a.woff2")
+    assert not blocker.should_block("xhr", "https://edith.xiaohongshu.com/api/sns/web/v1/search/notes")
+    assert not blocker.should_block("document", "https://www.xiaohongshu.com/explore")
+    assert blocker.should_block("script", "https://www.google-analytics.com/analytics.js")
+    assert not blocker.should_block("script", "https://notgoogle-analytics.com/a.js")
+    print("✅ 资源拦截规则正常")
+
+def test_per_page_allow():
+    """测试单个页面临时放行图片"""
+    print("\n🔍 测试按页面放行...")
+    blocker = ResourceBlocker(("image", "media"), ())
+    detail_page, other_page = FakePage(), FakePage()
+    blocker.allow(detail_page, ("image",))
+
+    async def run():
+        routes = [
+            FakeRoute("image", "https://sns-img.xhscdn.com/a.jpg", detail_page),
+            FakeRoute("media", "https://sns-video.xhscdn.com/a.mp4", detail_page),
+            FakeRoute("image", "https://sns-img.xhscdn.com/b.jpg", other_page),
+        ]
+        for route in routes:
+            await blocker.handle(route)
+        return [route.outcome for route in routes]
+
+    assert asyncio.run(run()) == ["continue", "abort", "abort"]
+    assert blocker.stats()["blocked_by_type"] == {"media": 1, "image": 1}
+
+    blocker.allow(detail_page, None)
+    assert blocker.should_block("image", "https://sns-img.xhscdn.com/a.jpg", detail_page)
+    print("✅ 按页面放行正常")
+
+def test_disabled():
+    """测试未配置拦截时不注册路由"""
+    assert not ResourceBlocker((), ()).enabled
+
+if __name__ == "__main__":
+    test_should_block()
+    test_per_page_allow()
+    test_disabled()
+    print("\n🎉 资源拦截测试完成!")
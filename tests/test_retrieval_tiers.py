@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+分层采集测试脚本
+测试逐层回退、单层超时和按成功率自适应排序
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from contextlib import asynccontextmanager
+from clients.retrieval_tiers import Tier, TieredRetriever
+from clients.xhs_client import XHSClient
+
+class FakeSearchPage:
+    """搜索结果页：已有卡片，页面中的话题标签固定"""
+
+    async def goto(self, url, wait_until=None):
+        self.url = url
+
+    async def wait_for_function(self, script, arg=None, timeout=0):
+        return True
+
+    async def evaluate(self, script, *args):
+        if "querySelectorAll(selector).length" in script:
+            return 20
+        return ["#减脂餐", "#减脂餐", "#健身打卡", "x"]
+
+class FakePagePool:
+    @asynccontextmanager
+    async def page(self, allow_resources=None):
+        yield FakeSearchPage()
+
+def _make_tier(name, result, calls, delay=0.0):
+    async def fetch():
+        calls.append(name)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return Tier(name, fetch)
+
+async def _test_fallback():
+    retriever = TieredRetriever({"api": 0.05})
+    calls = []
+    tiers = [
+        _make_tier("api", ["slow"], calls, delay=1.0),
+        _make_tier("xhr", RuntimeError("blocked"), calls),
+        _make_tier("dom", ["topic"], calls),
+    ]
+    result = await retriever.run("search_topics", tiers)
+    assert result == ["topic"]
+    assert calls == ["api", "xhr", "dom"]
+    stats = retriever.stats()["search_topics"]["tiers"]
+    assert stats["api"]["timeouts"] == 1
+    assert stats["xhr"]["failures"] == 1
+    assert stats["dom"]["successes"] == 1
+    return retriever.stats()
+
+async def _test_adaptive_order():
+    retriever = TieredRetriever()
+    calls = []
+    tiers = [
+        _make_tier("api", None, calls),
+        _make_tier("xhr", None, calls),
+        _make_tier("dom", ["post"], calls),
+    ]
+    await retriever.run("retrieve_posts", tiers)
+    assert calls == ["api", "xhr", "dom"]
+
+    # 成功过的层排到最前，后续请求只需要一次尝试
+    calls.clear()
+    assert await retriever.run("retrieve_posts", tiers) == ["post"]
+    assert calls == ["dom"]
+    assert retriever.stats()["retrieve_posts"]["order"][0] == "dom"
+
+    # 各操作的统计相互独立
+    assert [t.name for t in retriever.order("search_topics", tiers)] == ["api", "xhr", "dom"]
+
+async def _test_recovers_after_transient_failure():
+    retriever = TieredRetriever(reprobe_interval=5)
+    calls = []
+    api_results = [None]  # api 第一次失败，之后恢复
+
+    async def api():
+        calls.append("api")
+        return api_results.pop(0) if api_results else ["api"]
+
+    tiers = [Tier("api", api), _make_tier("xhr", ["xhr"], calls, delay=0.01)]
+    assert await retriever.run("search_topics", tiers) == ["xhr"]
+    assert calls == ["api", "xhr"]
+
+    # 降级期间只走xhr
+    calls.clear()
+    for _ in range(3):
+        assert await retriever.run("search_topics", tiers) == ["xhr"]
+    assert calls == ["xhr"] * 3
+
+    # 第5次按默认顺序重新探测api，成功后api（更快）回到最前
+    calls.clear()
+    assert await retriever.run("search_topics", tiers) == ["api"]
+    assert await retriever.run("search_topics", tiers) == ["api"]
+    assert calls == ["api", "api"]
+    assert retriever.stats()["search_topics"]["order"] == ["api", "xhr"]
+
+async def _test_topics_via_dom():
+    client = XHSClient()
+    client._pool = FakePagePool()
+    topics = await client._topics_via_dom("健身", 10)
+    assert [topic["name"] for topic in topics] == ["减脂餐", "健身打卡"]
+    assert all(topic["view_num"] == "0" for topic in topics)
+
+async def _test_all_fail():
+    retriever = TieredRetriever()
+    calls = []
+    tiers = [_make_tier("api", None, calls), _make_tier("dom", None, calls)]
+    assert await retriever.run("get_trending_topics", tiers) is None
+    assert calls == ["api", "dom"]
+
+def test_fallback():
+    """测试超时、异常后回退到下一层"""
+    print("\n🔍 测试分层回退...")
+    stats = asyncio.run(_test_fallback())
+    print(f"✅ 分层回退正常: {stats}")
+
+def test_adaptive_order():
+    """测试按成功率调整尝试顺序"""
+    print("\n🔍 测试自适应排序...")
+    asyncio.run(_test_adaptive_order())
+    print("✅ 自适应排序正常")
+
+def test_recovers_after_transient_failure():
+    """测试api偶发失败后被重新探测并恢复到最前"""
+    print("\n🔍 测试降级层恢复...")
+    asyncio.run(_test_recovers_after_transient_failure())
+    print("✅ 降级层恢复正常")
+
+def test_topics_via_dom():
+    """测试DOM层的话题名不带搜索关键词，字段格式与API层一致"""
+    asyncio.run(_test_topics_via_dom())
+
+def test_all_fail():
+    """测试所有层失败时返回None"""
+    asyncio.run(_test_all_fail())
+
+if __name__ == "__main__":
+    test_fallback()
+    test_adaptive_order()
+    test_recovers_after_transient_failure()
+    test_topics_via_dom()
+    test_all_fail()
+    print("\n🎉 分层采集测试完成!")
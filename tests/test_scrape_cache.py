@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+采集结果缓存测试脚本
+测试single-flight去重、TTL和stale-while-revalidate
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import tempfile
+from clients.scrape_cache import ScrapeCache
+
+async def _test_single_flight(path):
+    cache = ScrapeCache(path=path)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return '{"topics": []}'
+
+    params = {"keyword": "剩女", "limit": 10}
+    results = await asyncio.gather(*[cache.get_or_fetch("search_topics", params, fetch) for _ in range(50)])
+    assert calls == 1
+    assert all(r == '{"topics": []}' for r in results)
+
+    # 再次请求直接命中缓存
+    await cache.get_or_fetch("search_topics", params, fetch)
+    assert calls == 1
+    return cache.stats()["endpoints"]["search_topics"]
+
+async def _test_stale_while_revalidate(path):
+    cache = ScrapeCache(ttls={"get_trending_topics": 0.01}, path=path)
+    version = 0
+
+    async def fetch():
+        nonlocal version
+        version += 1
+        return {"version": version}
+
+    assert await cache.get_or_fetch("get_trending_topics", {}, fetch) == {"version": 1}
+    await asyncio.sleep(0.05)
+    # 过期后先返回旧值，后台刷新
+    assert await cache.get_or_fetch("get_trending_topics", {}, fetch) == {"version": 1}
+    await asyncio.sleep(0.01)
+    assert version == 2
+    assert cache.stats()["endpoints"]["get_trending_topics"]["refreshes"] == 1
+
+async def _test_failures_not_cached(path):
+    cache = ScrapeCache(path=path)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return None
+
+    await cache.get_or_fetch("retrieve_posts", {"keyword": "健身"}, fetch)
+    await cache.get_or_fetch("retrieve_posts", {"keyword": "健身"}, fetch)
+    assert calls == 2
+
+def test_single_flight():
+    """测试50个并发请求只触发一次采集"""
+    print("\n🔍 测试single-flight...")
+    with tempfile.TemporaryDirectory() as tmp:
+        stats = asyncio.run(_test_single_flight(os.path.join(tmp, "cache.sqlite3")))
+    print(f"✅ single-flight正常: {stats}")
+
+def test_stale_while_revalidate():
+    """测试过期数据先返回、后台刷新"""
+    print("\n🔍 测试stale-while-revalidate...")
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_test_stale_while_revalidate(os.path.join(tmp, "cache.sqlite3")))
+    print("✅ stale-while-revalidate正常")
+
+def test_failures_not_cached():
+    """测试采集失败(None)不会被缓存"""
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_test_failures_not_cached(os.path.join(tmp, "cache.sqlite3")))
+
+if __name__ == "__main__":
+    test_single_flight()
+    test_stale_while_revalidate()
+    test_failures_not_cached()
+    print("\n🎉 采集结果缓存测试完成!")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+HTTP服务测试脚本
+用模拟的工作流测试排队上限(429)、未知运行(404)和SSE按 Last-Event-ID 续传
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+from aiohttp.test_utils import TestClient, TestServer
+import server
+
+class FakeAgent:
+    """依次产出三个节点事件和结果；gate 未打开时停在第一个节点之后"""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+
+    async def stream_progress(self, user_input, config_id=None):
+        for node in ("keywords", "retrieval", "generation"):
+            yield {"type": "node", "node": node, "current_state": node, "updated_keys": []}
+            await self.gate.wait()
+        yield {"type": "result", "state": {"user_input": user_input, "error_message": ""}}
+
+    async def close(self):
+        pass
+
+async def _with_client(test, **app_options):
+    original = server.agent
+    server.agent = agent = FakeAgent()
+    client = TestClient(TestServer(server.create_app(**app_options)))
+    await client.start_server()
+    try:
+        await test(client, agent)
+    finally:
+        agent.gate.set()
+        await client.close()
+        server.agent = original
+
+def _parse_sse(text):
+    """解析SSE响应为 [(id, event, data)]，忽略心跳"""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+async def _test_pending_cap(client, agent):
+    for _ in range(2):
+        resp = await client.post("/runs", json={"input": "健身"})
+        assert resp.status == 202
+    resp = await client.post("/runs", json={"input": "健身"})
+    assert resp.status == 429 and resp.headers["Retry-After"] == "5"
+
+    # 运行结束后名额释放
+    agent.gate.set()
+    service = client.server.app[server.SERVICE_KEY]
+    await asyncio.gather(*[run.task for run in service.runs.values()])
+    resp = await client.post("/runs", json={"input": "健身"})
+    assert resp.status == 202
+
+async def _test_unknown_run(client, agent):
+    resp = await client.get("/runs/missing")
+    assert resp.status == 404
+    resp = await client.get("/runs/missing/events")
+    assert resp.status == 404
+
+async def _test_invalid_body(client, agent):
+    for body in (["健身"], "健身", 42, {"input": 42}):
+        resp = await client.post("/runs", json=body)
+        assert resp.status == 400
+    resp = await client.post("/runs", data="不是JSON")
+    assert resp.status == 400
+
+async def _test_sse_replay(client, agent):
+    agent.gate.set()
+    resp = await client.post("/runs", json={"input": "健身"})
+    run_id = (await resp.json())["run_id"]
+    await client.server.app[server.SERVICE_KEY].runs[run_id].task
+
+    full = _parse_sse(await (await client.get(f"/runs/{run_id}/events")).text())
+    assert [event for _, event, _ in full] == ["started", "node", "node", "node", "completed"]
+    assert [event_id for event_id, _, _ in full] == [1, 2, 3, 4, 5]
+
+    resumed = _parse_sse(await (await client.get(f"/runs/{run_id}/events", headers={"Last-Event-ID": "3"})).text())
+    assert [event_id for event_id, _, _ in resumed] == [4, 5]
+    assert resumed[0][2]["node"] == "generation"
+
+    resp = await client.get(f"/runs/{run_id}")
+    assert (await resp.json())["status"] == "completed"
+
+def test_pending_cap():
+    """测试排队+执行中的运行数达到上限时返回429"""
+    print("\n🔍 测试排队上限...")
+    asyncio.run(_with_client(_test_pending_cap, max_concurrent_runs=1, max_pending_runs=2))
+    print("✅ 排队上限正常")
+
+def test_unknown_run():
+    """测试查询不存在的运行返回404"""
+    asyncio.run(_with_client(_test_unknown_run))
+
+def test_invalid_body():
+    """测试请求体不是JSON对象或缺少 input 时返回400而不是500"""
+    asyncio.run(_with_client(_test_invalid_body))
+
+def test_sse_replay():
+    """测试SSE按 Last-Event-ID 只补发之后的事件"""
+    print("\n🔍 测试SSE断线续传...")
+    asyncio.run(_with_client(_test_sse_replay))
+    print("✅ SSE断线续传正常")
+
+if __name__ == "__main__":
+    test_pending_cap()
+    test_unknown_run()
+    test_invalid_body()
+    test_sse_replay()
+    print("\n🎉 HTTP服务测试完成!")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+投机预取测试脚本
+测试后台预取的并发上限，以及语料库已有近期帖子时不预取帖子
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import nodes.speculative as speculative
+
+class FakeXHSClient:
+    """记录调用和同时进行的采集数"""
+
+    def __init__(self):
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    async def _fetch(self, name, keyword):
+        self.calls.append((name, keyword))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return "{}"
+
+    async def search_topics(self, keyword, limit=10):
+        return await self._fetch("search_topics", keyword)
+
+    async def retrieve_posts(self, keyword, limit=10):
+        return await self._fetch("retrieve_posts", keyword)
+
+async def _run_prefetch(fresh_keywords):
+    async def fake_corpus(keyword):
+        return ["帖子"] * 5 if keyword in fresh_keywords else None
+
+    original = (speculative.xhs_client, speculative._posts_from_corpus)
+    speculative.xhs_client = client = FakeXHSClient()
+    speculative._posts_from_corpus = fake_corpus
+    try:
+        for i in range(8):
+            speculative.prefetch_topics(f"词{i}")
+            speculative.prefetch_posts(f"词{i}")
+        await asyncio.gather(*list(speculative._background_tasks))
+    finally:
+        speculative.xhs_client, speculative._posts_from_corpus = original
+    return client
+
+def test_prefetch_concurrency_bound():
+    """测试后台预取的并发数不超过 MAX_PARALLEL_SEARCHES"""
+    print("\n🔍 测试预取并发上限...")
+    client = asyncio.run(_run_prefetch(set()))
+    assert len(client.calls) == 16
+    assert client.peak <= speculative.MAX_PARALLEL_SEARCHES
+    # 再次运行时在新的事件循环上创建信号量
+    assert asyncio.run(_run_prefetch(set())).peak <= speculative.MAX_PARALLEL_SEARCHES
+    print(f"✅ 预取并发上限正常: 峰值 {client.peak}")
+
+def test_skip_posts_in_corpus():
+    """测试语料库有近期帖子的关键词只预取主题，不预取帖子"""
+    client = asyncio.run(_run_prefetch({"词0", "词1"}))
+    posts = sorted(keyword for name, keyword in client.calls if name == "retrieve_posts")
+    assert posts == [f"词{i}" for i in range(2, 8)]
+    assert sum(name == "search_topics" for name, _ in client.calls) == 8
+
+if __name__ == "__main__":
+    test_prefetch_concurrency_bound()
+    test_skip_posts_in_corpus()
+    print("\n🎉 投机预取测试完成!")
@@ -10,16 +10,8 @@ import asyncio
 import json
 from loguru import logger
 from workflow_types import WorkflowState
-from nodes.topic_search import (
-    topic_search_node_1, topic_search_node_2,
-    format_topics_node_1, format_topics_node_2,
-    combine_topic_results_node
-)
-from nodes.post_retrieval import (
-    post_retrieval_node_1, post_retrieval_node_2,
-    parse_posts_node_1, parse_posts_node_2,
-    combine_post_results_node
-)
+from nodes.topic_search import topic_search_node, combine_topic_results_node
+from nodes.post_retrieval import post_retrieval_node, combine_post_results_node
 from nodes.content_filter import content_filter_node
 from nodes.hitpoint_analysis import hitpoint_analysis_node
 from nodes.user_selection import user_selection_node
@@ -57,8 +49,7 @@ def test_extract_initial_keywords(state):
     result_state = extract_initial_keywords_node(state)
     
     print("✅ 关键词提取完成!")
-    print(f"📝 主要关键词: {result_state.primary_keyword}")
-    print(f"📝 次要关键词: {result_state.secondary_keyword}")
+    print(f"📝 搜索关键词: {result_state.search_keywords}")
     
     return result_state
 
@@ -67,26 +58,15 @@ async def test_topic_search_nodes(state):
     print("\n🔍 测试话题搜索节点...")
     print("-" * 50)
     
-    # 并行执行两个话题搜索
-    task1 = topic_search_node_1(state)
-    task2 = topic_search_node_2(state)
-    
-    result1, result2 = await asyncio.gather(task1, task2)
+    # 所有关键词在同一个节点内并发搜索
+    result = await topic_search_node(state)
     
     print("✅ 话题搜索完成!")
-    print(f"📝 搜索1结果: {result1.topic_search_result_1[:100] if result1.topic_search_result_1 else ''}...")
-    print(f"📝 搜索2结果: {result2.topic_search_result_2[:100] if result2.topic_search_result_2 else ''}...")
-    
-    # 格式化结果
-    formatted1 = format_topics_node_1(result1)
-    formatted2 = format_topics_node_2(result2)
+    for keyword, raw in result.topic_search_results.items():
+        print(f"📝 {keyword} 搜索结果: {raw[:100] if raw else ''}...")
     
     # 合并结果
-    combined_state = formatted1.model_copy()
-    # 手动合并状态
-    combined_state.topic_search_result_2 = formatted2.topic_search_result_2
-    combined_state.formatted_topics_2 = formatted2.formatted_topics_2
-    final_result = combine_topic_results_node(combined_state)
+    final_result = combine_topic_results_node(result)
     
     print("✅ 话题结果格式化完成!")
     print(f"📝 合并结果: {final_result.combined_topic_results[:200] if final_result.combined_topic_results else ''}...")
@@ -124,26 +104,15 @@ async def test_post_retrieval_nodes(state):
     print("\n🔍 测试帖子检索节点...")
     print("-" * 50)
     
-    # 并行执行两个帖子检索
-    task1 = post_retrieval_node_1(state)
-    task2 = post_retrieval_node_2(state)
-    
-    result1, result2 = await asyncio.gather(task1, task2)
+    # 所有关键词在同一个节点内并发检索
+    result = await post_retrieval_node(state)
     
     print("✅ 帖子检索完成!")
-    print(f"📝 检索1结果类型: {type(result1.post_retrieval_result_1)}")
-    print(f"📝 检索2结果类型: {type(result2.post_retrieval_result_2)}")
-    
-    # 解析结果
-    parsed1 = parse_posts_node_1(result1)
-    parsed2 = parse_posts_node_2(result2)
+    for keyword, posts in result.parsed_posts.items():
+        print(f"📝 {keyword} 解析帖子数量: {len(posts)}")
     
     # 合并结果
-    combined_state = parsed1.model_copy()
-    # 手动合并状态
-    combined_state.post_retrieval_result_2 = parsed2.post_retrieval_result_2
-    combined_state.parsed_posts_2 = parsed2.parsed_posts_2
-    final_result = combine_post_results_node(combined_state)
+    final_result = combine_post_results_node(result)
     
     print("✅ 帖子结果解析完成!")
     print(f"📝 合并后帖子数量: {len(final_result.retrieved_posts)}")
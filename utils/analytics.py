@@ -0,0 +1,142 @@
+"""
+帖子列式分析
+把帖子一次性转成NumPy列（点赞/评论/分享/浏览为int64数组），
+总和、均值、分位数、互动率都按列向量化计算，top-k用argpartition，
+主题识别用一个多模式匹配自动机对可配置的主题词表做单次扫描。
+适合对语料库中数万篇帖子生成周报。
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.counts import COUNT_FIELDS, parse_counts
+from utils.prefilter import AhoCorasick
+
+# 主题词表：按顺序匹配，一篇帖子命中多个主题时取排在前面的；都未命中归为 DEFAULT_THEME
+DEFAULT_THEME_LEXICON: Dict[str, Sequence[str]] = {
+    "健身运动": ("健身", "运动"),
+    "美食探店": ("美食", "探店"),
+    "护肤美妆": ("护肤", "美妆"),
+    "旅行分享": ("旅行", "旅游"),
+    "时尚穿搭": ("穿搭", "时尚"),
+}
+DEFAULT_THEME = "生活分享"
+
+
+class ThemeMatcher:
+    """按主题词表给帖子归类，每篇帖子只扫描一遍正文"""
+
+    def __init__(self, lexicon: Optional[Dict[str, Sequence[str]]] = None, default: str = DEFAULT_THEME):
+        lexicon = lexicon or DEFAULT_THEME_LEXICON
+        self.themes = list(lexicon)
+        self.default = default
+        # 关键词 -> 所属主题中优先级最高（序号最小）的主题
+        self._priority: Dict[str, int] = {}
+        for rank, theme in enumerate(self.themes):
+            for keyword in lexicon[theme]:
+                self._priority.setdefault(keyword.lower(), rank)
+        self._automaton = AhoCorasick(self._priority)
+
+    def classify(self, text: str) -> str:
+        found = self._automaton.find(text or "")
+        if not found:
+            return self.default
+        return self.themes[min(self._priority[keyword] for keyword in found)]
+
+    def count(self, texts: Iterable[str]) -> List[Tuple[str, int]]:
+        """各主题的帖子数，按数量降序"""
+        return Counter(self.classify(text) for text in texts).most_common()
+
+
+default_theme_matcher = ThemeMatcher()
+
+
+class PostFrame:
+    """帖子的列式视图：计数字段为int64数组，其余字段保留原始帖子"""
+
+    def __init__(self, posts: List[Dict[str, Any]], columns: Dict[str, np.ndarray]):
+        self.posts = posts
+        self.columns = columns
+
+    @classmethod
+    def from_posts(cls, posts: Iterable[Dict[str, Any]]) -> "PostFrame":
+        posts = list(posts)
+        columns = {
+            field: parse_counts(post.get(field, 0) for post in posts)
+            for field in COUNT_FIELDS
+        }
+        return cls(posts, columns)
+
+    @classmethod
+    def from_corpus(cls, store=None, since: Optional[float] = None) -> "PostFrame":
+        """从语料库加载，since为时间戳，只取此后出现过的帖子"""
+        if store is None:
+            from utils.corpus_store import get_corpus_store
+            store = get_corpus_store()
+        return cls.from_posts(store.iter_posts(since=since))
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    def totals(self) -> Dict[str, int]:
+        return {field: int(column.sum()) for field, column in self.columns.items()}
+
+    def means(self) -> Dict[str, float]:
+        if not len(self):
+            return {field: 0.0 for field in self.columns}
+        return {field: float(column.mean()) for field, column in self.columns.items()}
+
+    def percentiles(self, field: str = "likes", qs: Sequence[float] = (50, 90, 99)) -> Dict[str, float]:
+        if not len(self):
+            return {f"p{q:g}": 0.0 for q in qs}
+        values = np.percentile(self.columns[field], qs)
+        return {f"p{q:g}": float(v) for q, v in zip(qs, values)}
+
+    def engagement_rates(self) -> np.ndarray:
+        """(点赞+评论+分享)/浏览，浏览为0的帖子互动率记为0"""
+        interactions = self.columns["likes"] + self.columns["comments"] + self.columns["shares"]
+        views = self.columns["views"]
+        rates = np.zeros(len(self), dtype=np.float64)
+        np.divide(interactions, views, out=rates, where=views > 0)
+        return rates
+
+    def top_k_indices(self, field: str = "likes", k: int = 3) -> np.ndarray:
+        """按字段降序的前k个帖子序号；只对前k个排序，值相同时保持原顺序"""
+        values = self.columns[field]
+        k = min(k, len(values))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.argpartition(-values, k - 1)[:k] if k < len(values) else np.arange(len(values))
+        return candidates[np.lexsort((candidates, -values[candidates]))]
+
+    def top_k(self, field: str = "likes", k: int = 3) -> List[Dict[str, Any]]:
+        return [self.posts[i] for i in self.top_k_indices(field, k)]
+
+    def hot_tags(self, k: int = 10) -> List[Tuple[str, int]]:
+        counts = Counter(tag for post in self.posts for tag in (post.get("tags") or []))
+        return sorted(counts.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def themes(self, matcher: Optional[ThemeMatcher] = None) -> List[Tuple[str, int]]:
+        matcher = matcher or default_theme_matcher
+        return matcher.count((post.get("content") or "").lower() for post in self.posts)
+
+    def summary(self, top_k: int = 3, matcher: Optional[ThemeMatcher] = None) -> Dict[str, Any]:
+        """analyze_content 返回的分析结果"""
+        n = len(self)
+        totals = self.totals()
+        viewed = self.columns["views"] > 0
+        rates = self.engagement_rates()[viewed]
+        return {
+            "total_posts": n,
+            "total_likes": totals["likes"],
+            "total_comments": totals["comments"],
+            "total_shares": totals["shares"],
+            "avg_likes": totals["likes"] // n if n else 0,
+            "avg_comments": totals["comments"] // n if n else 0,
+            "avg_shares": totals["shares"] // n if n else 0,
+            "likes_percentiles": self.percentiles("likes"),
+            "avg_engagement_rate": float(rates.mean()) if rates.size else 0.0,
+            "hot_tags": self.hot_tags(),
+            "hot_posts": self.top_k("likes", top_k),
+            "content_themes": self.themes(matcher),
+        }
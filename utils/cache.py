@@ -0,0 +1,275 @@
+"""
+通用缓存 - 小红书起号助手
+内存LRU + 磁盘SQLite两级缓存，支持TTL；过期条目仍可读出，供调用方做后台刷新
+"""
+import os
+import json
+import asyncio
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# 磁盘缓存目录，可通过环境变量 CACHE_DIR 覆盖
+DEFAULT_CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+# (值, 过期时间戳)；过期时间为None表示永不过期
+CacheEntry = Tuple[Any, Optional[float]]
+
+
+def make_cache_key(*parts: Any) -> str:
+    """对任意可JSON序列化的参数计算内容哈希，作为缓存键"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _expires_at(ttl: Optional[float]) -> Optional[float]:
+    return time.time() + ttl if ttl is not None else None
+
+
+def _is_fresh(expires_at: Optional[float]) -> bool:
+    return expires_at is None or expires_at > time.time()
+
+
+class LRUCache:
+    """线程安全的内存LRU缓存"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """读取条目（含已过期的），不存在返回None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取未过期的值"""
+        entry = self.get_entry(key)
+        if entry is None or not _is_fresh(entry[1]):
+            return None
+        return entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (value, expires_at if expires_at is not None else _expires_at(ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    基于SQLite的持久化键值缓存，多个命名空间可共用同一个数据库文件。
+    数据库在首次读写时才打开，构造（包括导入时创建的模块级单例）不会创建目录和文件。
+    """
+
+    def __init__(self, path: str, namespace: str):
+        self.path = path
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """返回数据库连接，首次调用时建库建表；调用方需持有 self._lock"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """读取条目（含已过期的），不存在返回None"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取未过期的值"""
+        entry = self.get_entry(key)
+        if entry is None or not _is_fresh(entry[1]):
+            return None
+        return entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    self.namespace,
+                    key,
+                    json.dumps(value, ensure_ascii=False),
+                    expires_at if expires_at is not None else _expires_at(ttl),
+                    time.time(),
+                ),
+            )
+            conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+            conn.commit()
+
+    def purge_expired(self, grace: float = 0.0) -> int:
+        """删除过期超过grace秒的条目，返回删除数量"""
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at < ?",
+                (self.namespace, time.time() - grace),
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class TieredCache:
+    """
+    内存LRU + 磁盘SQLite两级缓存。
+    读时先查内存，未命中再查磁盘并回填内存；写时两级同时写入。
+    协程中使用 aget / aget_entry / aset：内存层同步读写，磁盘层的读写放到线程中执行，不阻塞事件循环。
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 1024,
+        path: Optional[str] = None,
+        default_ttl: Optional[float] = None,
+        persistent: bool = True,
+    ):
+        """
+        :param namespace: 命名空间，区分不同用途的缓存
+        :param max_entries: 内存层最大条目数
+        :param path: SQLite文件路径，默认 CACHE_DIR/cache.sqlite3
+        :param default_ttl: 默认过期时间（秒），None表示不过期
+        :param persistent: 是否启用磁盘层
+        """
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.memory = LRUCache(max_entries)
+        self.disk: Optional[SQLiteCache] = None
+        if persistent:
+            self.disk = SQLiteCache(path or os.path.join(DEFAULT_CACHE_DIR, "cache.sqlite3"), namespace)
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """读取条目（含已过期的），供需要陈旧数据的调用方使用；不计入命中统计"""
+        entry = self.memory.get_entry(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                self.memory.set(key, entry[0], expires_at=entry[1])
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取未过期的值，未命中返回None"""
+        entry = self.memory.get_entry(key)
+        if entry is not None and _is_fresh(entry[1]):
+            self._stats["memory_hits"] += 1
+            return entry[0]
+        if self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None and _is_fresh(entry[1]):
+                self.memory.set(key, entry[0], expires_at=entry[1])
+                self._stats["disk_hits"] += 1
+                return entry[0]
+        self._stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = _expires_at(ttl if ttl is not None else self.default_ttl)
+        self.memory.set(key, value, expires_at=expires_at)
+        if self.disk is not None:
+            self.disk.set(key, value, expires_at=expires_at)
+        self._stats["writes"] += 1
+
+    async def aget_entry(self, key: str) -> Optional[CacheEntry]:
+        """get_entry 的协程版本，磁盘层在线程中读取"""
+        entry = self.memory.get_entry(key)
+        if entry is None and self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get_entry, key)
+            if entry is not None:
+                self.memory.set(key, entry[0], expires_at=entry[1])
+        return entry
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get 的协程版本，内存未命中时在线程中读磁盘层"""
+        entry = self.memory.get_entry(key)
+        if entry is not None and _is_fresh(entry[1]):
+            self._stats["memory_hits"] += 1
+            return entry[0]
+        if self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get_entry, key)
+            if entry is not None and _is_fresh(entry[1]):
+                self.memory.set(key, entry[0], expires_at=entry[1])
+                self._stats["disk_hits"] += 1
+                return entry[0]
+        self._stats["misses"] += 1
+        return None
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """set 的协程版本；先写内存层，并发读取立即可见，再在线程中写磁盘层"""
+        expires_at = _expires_at(ttl if ttl is not None else self.default_ttl)
+        self.memory.set(key, value, expires_at=expires_at)
+        self._stats["writes"] += 1
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value, expires_at=expires_at)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """命中/未命中统计"""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        total = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_rate": hits / total if total else 0.0,
+            "memory_entries": len(self.memory),
+        }
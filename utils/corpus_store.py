@@ -0,0 +1,230 @@
+"""
+本地帖子语料库
+把每次检索解析出的帖子按ID写入SQLite（重复出现时更新互动数据和时间戳），
+用FTS5做中文全文检索。中文不依赖分词库，按相邻两字切成bigram后交给FTS5的unicode61分词器。
+帖子检索节点可以直接用近期入库的数据回答，不必每次都重新采集。
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from loguru import logger
+from utils.cache import DEFAULT_CACHE_DIR
+from utils.counts import COUNT_FIELDS, parse_count
+
+# 语料库路径，可通过环境变量 CORPUS_DB 覆盖
+CORPUS_DB = os.getenv("CORPUS_DB", os.path.join(DEFAULT_CACHE_DIR, "corpus.sqlite3"))
+
+# 中文按字切bigram，字母数字按整词
+_TOKEN_RE = re.compile(r"[\u4e00-\u9fff\u3400-\u4dbf]+|[a-z0-9]+")
+
+
+def ngram_tokens(text: str) -> List[str]:
+    """把文本切成检索用的词元：连续汉字切成重叠的两字词，单个汉字保留原样"""
+    tokens = []
+    for run in _TOKEN_RE.findall((text or "").lower()):
+        if run[0].isascii() or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _fts_query(query: str) -> Optional[str]:
+    """把查询词转成FTS5短语查询，词元须连续出现"""
+    tokens = ngram_tokens(query)
+    if not tokens:
+        return None
+    return '"' + " ".join(tokens) + '"'
+
+
+def post_id(post: Dict[str, Any]) -> str:
+    """帖子ID；LLM兜底或DOM提取的帖子没有ID时，用标题、作者和正文开头的哈希"""
+    if post.get("id"):
+        return str(post["id"])
+    basis = "|".join([post.get("title", ""), post.get("author", ""), post.get("content", "")[:64]])
+    return "h:" + hashlib.sha1(basis.encode("utf-8")).hexdigest()[:16]
+
+
+class CorpusStore:
+    """帖子语料库：按ID upsert，支持按关键词取近期帖子和全文检索"""
+
+    def __init__(self, path: str = CORPUS_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS posts ("
+            " id TEXT PRIMARY KEY,"
+            " title TEXT NOT NULL DEFAULT '',"
+            " content TEXT NOT NULL DEFAULT '',"
+            " author TEXT NOT NULL DEFAULT '',"
+            " likes INTEGER NOT NULL DEFAULT 0,"
+            " comments INTEGER NOT NULL DEFAULT 0,"
+            " shares INTEGER NOT NULL DEFAULT 0,"
+            " views INTEGER NOT NULL DEFAULT 0,"
+            " tags TEXT NOT NULL DEFAULT '[]',"
+            " source TEXT,"
+            " first_seen REAL NOT NULL,"
+            " last_seen REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS post_keywords ("
+            " keyword TEXT NOT NULL,"
+            " post_id TEXT NOT NULL,"
+            " seen_at REAL NOT NULL,"
+            " PRIMARY KEY (keyword, post_id))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_post_keywords_seen ON post_keywords (keyword, seen_at)")
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+                " post_id UNINDEXED, title, content, tags, tokenize = 'unicode61')"
+            )
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            # 部分Python发行版的SQLite未编译FTS5，退回LIKE检索
+            logger.warning(f"SQLite不支持FTS5，全文检索退回LIKE: {e}")
+            self.fts = False
+        self._conn.commit()
+
+    def upsert_posts(self, posts: Iterable[Dict[str, Any]], keyword: Optional[str] = None, source: str = "xhs") -> int:
+        """
+        写入或更新帖子，返回写入条数。
+        已存在的帖子更新互动数据和 last_seen，正文只在新值非空时覆盖。
+        """
+        now = time.time()
+        count = 0
+        with self._lock:
+            for post in posts:
+                pid = post_id(post)
+                tags = post.get("tags") or []
+                counts = [parse_count(post.get(field, 0)) for field in COUNT_FIELDS]
+                self._conn.execute(
+                    "INSERT INTO posts (id, title, content, author, likes, comments, shares, views, tags, source, first_seen, last_seen)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(id) DO UPDATE SET"
+                    "  title = CASE WHEN excluded.title != '' THEN excluded.title ELSE title END,"
+                    "  content = CASE WHEN excluded.content != '' THEN excluded.content ELSE content END,"
+                    "  author = CASE WHEN excluded.author != '' THEN excluded.author ELSE author END,"
+                    "  likes = excluded.likes, comments = excluded.comments,"
+                    "  shares = excluded.shares, views = excluded.views,"
+                    "  tags = CASE WHEN excluded.tags != '[]' THEN excluded.tags ELSE tags END,"
+                    "  last_seen = excluded.last_seen",
+                    (pid, post.get("title", ""), post.get("content", ""), post.get("author", ""), *counts,
+                     json.dumps(tags, ensure_ascii=False), source, now, now),
+                )
+                if keyword:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO post_keywords (keyword, post_id, seen_at) VALUES (?, ?, ?)",
+                        (keyword, pid, now),
+                    )
+                if self.fts:
+                    row = self._conn.execute("SELECT title, content, tags FROM posts WHERE id = ?", (pid,)).fetchone()
+                    self._conn.execute("DELETE FROM posts_fts WHERE post_id = ?", (pid,))
+                    self._conn.execute(
+                        "INSERT INTO posts_fts (post_id, title, content, tags) VALUES (?, ?, ?, ?)",
+                        (pid, " ".join(ngram_tokens(row["title"])), " ".join(ngram_tokens(row["content"])),
+                         " ".join(ngram_tokens(" ".join(json.loads(row["tags"]))))),
+                    )
+                count += 1
+            self._conn.commit()
+        return count
+
+    @staticmethod
+    def _row_to_post(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "title": row["title"],
+            "content": row["content"],
+            "author": row["author"],
+            "likes": row["likes"],
+            "comments": row["comments"],
+            "shares": row["shares"],
+            "views": row["views"],
+            "quality_score": 0.0,
+            "tags": json.loads(row["tags"]),
+        }
+
+    def recent_posts_for_keyword(self, keyword: str, max_age: float, limit: int = 10) -> List[Dict[str, Any]]:
+        """max_age秒内以该关键词检索到的帖子，按点赞数降序"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.* FROM post_keywords k JOIN posts p ON p.id = k.post_id"
+                " WHERE k.keyword = ? AND k.seen_at >= ?"
+                " ORDER BY p.likes DESC LIMIT ?",
+                (keyword, time.time() - max_age, limit),
+            ).fetchall()
+        return [self._row_to_post(row) for row in rows]
+
+    def search(self, query: str, limit: int = 20, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """全文检索标题/正文/标签，max_age限定最近出现过的帖子"""
+        since = time.time() - max_age if max_age is not None else 0.0
+        with self._lock:
+            if self.fts:
+                match = _fts_query(query)
+                if match is None:
+                    return []
+                rows = self._conn.execute(
+                    "SELECT p.* FROM posts_fts f JOIN posts p ON p.id = f.post_id"
+                    " WHERE posts_fts MATCH ? AND p.last_seen >= ?"
+                    " ORDER BY bm25(posts_fts) LIMIT ?",
+                    (match, since, limit),
+                ).fetchall()
+            else:
+                pattern = f"%{query}%"
+                rows = self._conn.execute(
+                    "SELECT * FROM posts WHERE (title LIKE ? OR content LIKE ? OR tags LIKE ?) AND last_seen >= ?"
+                    " ORDER BY likes DESC LIMIT ?",
+                    (pattern, pattern, pattern, since, limit),
+                ).fetchall()
+        return [self._row_to_post(row) for row in rows]
+
+    def iter_posts(self, since: Optional[float] = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """按批遍历语料库中的帖子，供离线分析使用"""
+        last_id = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT * FROM posts WHERE id > ? AND last_seen >= ? ORDER BY id LIMIT ?",
+                    (last_id, since or 0.0, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_post(row)
+            last_id = rows[-1]["id"]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            posts = self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+            keywords = self._conn.execute("SELECT COUNT(DISTINCT keyword) FROM post_keywords").fetchone()[0]
+        return {"posts": posts, "keywords": keywords, "fts": self.fts, "path": self.path}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_corpus_store: Optional[CorpusStore] = None
+_corpus_store_lock = threading.Lock()
+
+
+def get_corpus_store() -> CorpusStore:
+    """进程内共享的语料库，首次使用时打开；可能在多个工作线程中同时首次调用"""
+    global _corpus_store
+    if _corpus_store is None:
+        with _corpus_store_lock:
+            if _corpus_store is None:
+                _corpus_store = CorpusStore()
+    return _corpus_store
@@ -0,0 +1,68 @@
+"""
+互动数解析
+小红书页面和接口里的点赞/评论/分享数可能是整数，也可能是 "1.2万"、"10w+"、"3,456"、"1.2k"、"赞" 这样的文本。
+入库前统一转成整数，排序、列式统计和去重才能直接按数值比较。
+常见写法有限，文本解析结果按原文缓存；批量解析时先对去重后的原文解析再映射回去。
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Tuple
+
+COUNT_FIELDS: Tuple[str, ...] = ("likes", "comments", "shares", "views")
+
+# 数量单位
+_UNITS = {"": 1, "k": 1_000, "千": 1_000, "w": 10_000, "万": 10_000, "亿": 100_000_000}
+
+# 整个文本须是 数字[单位][+]，"1e5"、"1.2.3"、"-3" 这类畸形文本按无法识别处理
+_COUNT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(k|千|w|万|亿)?\+?", re.IGNORECASE)
+
+# 解析结果缓存的文本条数
+TOKEN_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _parse_token(text: str) -> int:
+    match = _COUNT_RE.fullmatch(text.replace(",", "").replace("，", ""))
+    if not match:
+        # "赞"、"评论" 等占位文本和畸形文本表示0
+        return 0
+    number, unit = match.groups()
+    return int(round(float(number) * _UNITS[(unit or "").lower()]))
+
+
+def parse_count(value: Any) -> int:
+    """把互动数转成整数，无法识别的值返回0"""
+    if isinstance(value, bool) or value is None:
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if math.isfinite(value) else 0
+    return _parse_token(str(value).strip())
+
+
+def parse_counts(values: Iterable[Any]):
+    """批量解析，返回int64数组；相同的原文只解析一次"""
+    import numpy as np
+
+    values = list(values)
+    if not values:
+        return np.zeros(0, dtype=np.int64)
+    if all(type(v) is int for v in values):
+        return np.array(values, dtype=np.int64)
+    keys = [v if type(v) is int else str(v).strip() if v is not None else "" for v in values]
+    table: Dict[Any, int] = {}
+    for key in keys:
+        if key not in table:
+            table[key] = parse_count(key)
+    return np.fromiter((table[key] for key in keys), dtype=np.int64, count=len(keys))
+
+
+def normalize_counts(post: Dict[str, Any], fields: Iterable[str] = COUNT_FIELDS) -> Dict[str, Any]:
+    """把帖子中已有的互动数字段原地转成整数，返回该帖子"""
+    for field in fields:
+        if field in post:
+            post[field] = parse_count(post[field])
+    return post
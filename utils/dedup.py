@@ -0,0 +1,168 @@
+"""
+帖子近似去重
+对标题+正文的字符shingle计算64位SimHash，用分段LSH索引找候选对，
+汉明距离在阈值内的视为同一帖子（转载、搬运、多个关键词检索到的同一篇），每组只保留互动量最高的一篇。
+"""
+
+import hashlib
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from utils.counts import parse_count
+
+# SimHash位数与LSH分段数：汉明距离 <= BANDS-1 的两个指纹至少有一段完全相同
+SIMHASH_BITS = 64
+LSH_BANDS = 8
+
+# 判定为重复的最大汉明距离。小红书帖子较短，改几个字或加一句"转自"距离约5~7，不相关的帖子通常在25以上
+DEFAULT_THRESHOLD = 7
+
+# 字符shingle长度
+SHINGLE_SIZE = 3
+
+# 计算指纹前去掉空白、标点和话题标签符号
+_NOISE_RE = re.compile(r"[\s\W_]+", re.UNICODE)
+
+_BAND_BITS = SIMHASH_BITS // LSH_BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    """文本的64位SimHash指纹，按shingle出现次数加权"""
+    normalized = _NOISE_RE.sub("", (text or "").lower())
+    if not normalized:
+        return 0
+    if len(normalized) <= shingle_size:
+        shingles = Counter([normalized])
+    else:
+        shingles = Counter(normalized[i:i + shingle_size] for i in range(len(normalized) - shingle_size + 1))
+    weights = [0] * SIMHASH_BITS
+    for shingle, count in shingles.items():
+        h = _shingle_hash(shingle)
+        for bit in range(SIMHASH_BITS):
+            if h >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def post_fingerprint(post: Dict[str, Any]) -> int:
+    return simhash(f"{post.get('title', '')}{post.get('content', '')}")
+
+
+def engagement(post: Dict[str, Any]) -> int:
+    """点赞+评论+分享，用于在重复的帖子中挑选保留的一篇"""
+    return sum(parse_count(post.get(field, 0)) for field in ("likes", "comments", "shares"))
+
+
+class SimHashIndex:
+    """分段LSH索引：把指纹切成 LSH_BANDS 段，任一段相同即为候选，再按汉明距离确认"""
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD):
+        if threshold >= LSH_BANDS:
+            raise ValueError(f"阈值须小于分段数 {LSH_BANDS}，否则分段索引会漏掉重复项")
+        self.threshold = threshold
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(LSH_BANDS)]
+        self._fingerprints: List[int] = []
+
+    @staticmethod
+    def _bands(fingerprint: int) -> List[int]:
+        return [(fingerprint >> (band * _BAND_BITS)) & _BAND_MASK for band in range(LSH_BANDS)]
+
+    def query(self, fingerprint: int) -> List[int]:
+        """返回与指纹距离在阈值内的已索引条目序号"""
+        candidates = set()
+        for band, key in enumerate(self._bands(fingerprint)):
+            candidates.update(self._buckets[band].get(key, ()))
+        return sorted(i for i in candidates if hamming(self._fingerprints[i], fingerprint) <= self.threshold)
+
+    def add(self, fingerprint: int) -> int:
+        """加入索引，返回条目序号"""
+        index = len(self._fingerprints)
+        self._fingerprints.append(fingerprint)
+        for band, key in enumerate(self._bands(fingerprint)):
+            self._buckets[band].setdefault(key, []).append(index)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+
+def find_duplicate_groups(posts: Iterable[Dict[str, Any]], threshold: int = DEFAULT_THRESHOLD) -> Tuple[List[Dict[str, Any]], List[List[int]]]:
+    """
+    把帖子分成重复组，返回 (帖子列表, 组列表)，组内是帖子在列表中的序号，按首次出现排序。
+    ID相同的帖子直接归为一组；空文本的帖子不参与近似比较。
+    """
+    posts = list(posts)
+    parent = list(range(len(posts)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    index = SimHashIndex(threshold)
+    positions: List[int] = []  # 索引条目序号 -> 帖子序号
+    by_id: Dict[str, int] = {}
+    for i, post in enumerate(posts):
+        pid = post.get("id")
+        if pid:
+            if pid in by_id:
+                union(by_id[pid], i)
+                continue
+            by_id[pid] = i
+        fingerprint = post_fingerprint(post)
+        if fingerprint == 0:
+            continue
+        for match in index.query(fingerprint):
+            union(positions[match], i)
+        index.add(fingerprint)
+        positions.append(i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(posts)):
+        groups.setdefault(find(i), []).append(i)
+    return posts, list(groups.values())
+
+
+def deduplicate_posts(posts: Iterable[Dict[str, Any]], threshold: int = DEFAULT_THRESHOLD) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    去除近似重复的帖子，每组保留互动量最高的一篇，放在该组首次出现的位置。
+    返回 (去重后的帖子, 去掉的数量)。
+    """
+    posts, groups = find_duplicate_groups(posts, threshold)
+    kept = [posts[max(group, key=lambda i: engagement(posts[i]))] for group in groups]
+    return kept, len(posts) - len(kept)
+
+
+def corpus_duplicate_groups(store=None, threshold: int = DEFAULT_THRESHOLD, since: Optional[float] = None) -> List[List[str]]:
+    """对历史语料库做近似去重，返回包含多篇帖子的重复组（帖子ID列表，互动量最高的在前）"""
+    if store is None:
+        from utils.corpus_store import get_corpus_store
+        store = get_corpus_store()
+    posts, groups = find_duplicate_groups(store.iter_posts(since=since), threshold)
+    result = []
+    for group in groups:
+        if len(group) > 1:
+            ordered = sorted(group, key=lambda i: engagement(posts[i]), reverse=True)
+            result.append([posts[i]["id"] for i in ordered])
+    return result
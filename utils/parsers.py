@@ -1,7 +1,79 @@
 import re
 import json
 import random
-from typing import List, Dict, Any, Tuple
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Optional, Iterable
+from loguru import logger
+from models import PostRecord
+from utils.counts import parse_count
+
+# 匹配开/闭标签，如 <topic1>、</result_3>；全模块共用一个预编译模式
+_XML_TAG_TOKEN_RE = re.compile(r"<(/?)([A-Za-z_][\w\-]*)\s*>")
+
+def _scan_xml_tags(text: str, wanted: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """
+    单次线性扫描，提取标签内容。
+
+    每个标签只取开标签位置最靠前的一次出现；嵌套标签各自提取（外层内容包含内层原文）。
+    闭标签找不到对应开标签时忽略；开标签没有闭合时，内容截止到下一个标签或文本末尾。
+
+    Args:
+        text: 原始字符串。
+        wanted: 需要的标签名，None表示全部。
+
+    Returns:
+        {标签名: 去除首尾空白后的内容}，只包含找到的标签。
+    """
+    wanted_set = frozenset(wanted) if wanted is not None else None
+    tokens = list(_XML_TAG_TOKEN_RE.finditer(text))
+    found: Dict[str, Tuple[int, str]] = {}
+    # 栈元素: (标签名, 开标签在tokens中的下标)
+    stack: List[Tuple[str, int]] = []
+
+    def record(name: str, open_index: int, content_end: int) -> None:
+        if wanted_set is not None and name not in wanted_set:
+            return
+        open_pos = tokens[open_index].start()
+        if name not in found or open_pos < found[name][0]:
+            found[name] = (open_pos, text[tokens[open_index].end():content_end])
+
+    def record_unclosed(name: str, open_index: int) -> None:
+        next_index = open_index + 1
+        record(name, open_index, tokens[next_index].start() if next_index < len(tokens) else len(text))
+
+    for index, token in enumerate(tokens):
+        is_close, name = token.group(1), token.group(2)
+        if not is_close:
+            stack.append((name, index))
+            continue
+        for depth in range(len(stack) - 1, -1, -1):
+            if stack[depth][0] == name:
+                # 弹出中间未闭合的标签
+                for inner_name, inner_index in stack[depth + 1:]:
+                    record_unclosed(inner_name, inner_index)
+                record(name, stack[depth][1], token.start())
+                del stack[depth:]
+                break
+
+    for name, open_index in stack:
+        record_unclosed(name, open_index)
+
+    return {name: content.strip() for name, (_, content) in found.items()}
+
+def find_xml_tags(text: str, tags: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """
+    一次扫描提取多个XML标签的内容，只返回找到的标签。
+
+    Args:
+        text: 包含XML标签的原始字符串。
+        tags: 需要提取的标签名，None表示提取全部标签。
+
+    Returns:
+        {标签名: 内容}。
+    """
+    if not isinstance(text, str):
+        text = str(text) if text is not None else ""
+    return _scan_xml_tags(text, tags)
 
 def extract_xml_tags(text: str, tags: List[str]) -> Dict[str, str]:
     """
@@ -15,22 +87,240 @@ def extract_xml_tags(text: str, tags: List[str]) -> Dict[str, str]:
     Returns:
         一个字典，键是标签名，值是标签内容。
     """
-    # 确保text是字符串类型
-    if not isinstance(text, str):
-        text = str(text) if text is not None else ""
-    
+    found = find_xml_tags(text, tags)
     extractions = {}
     for tag in tags:
-        # 使用非贪婪模式匹配来找到标签内容
-        pattern = f"<{tag}>(.*?)</{tag}>"
-        match = re.search(pattern, text, re.DOTALL)
-        if match:
-            extractions[tag] = match.group(1).strip()
-        else:
-            # 如果找不到，返回一个错误或默认值，以增加健壮性
-            extractions[tag] = f"Error: Cannot find {tag} tag"
+        # 如果找不到，返回一个错误或默认值，以增加健壮性
+        extractions[tag] = found.get(tag, f"Error: Cannot find {tag} tag")
     return extractions
 
+@lru_cache(maxsize=32)
+def _numbered_tag_re(prefix: str, separator: str) -> "re.Pattern[str]":
+    return re.compile(rf"{re.escape(prefix)}{re.escape(separator)}(\d+)")
+
+def _numbered_tags(text: str, prefix: str, separator: str) -> Dict[int, str]:
+    """一次扫描提取 <prefix{sep}N> 形式的编号标签，返回 {N: 内容}"""
+    if not isinstance(text, str):
+        text = str(text) if text is not None else ""
+    pattern = _numbered_tag_re(prefix, separator)
+    numbered: Dict[int, str] = {}
+    for name, content in _scan_xml_tags(text).items():
+        match = pattern.fullmatch(name)
+        if match:
+            numbered[int(match.group(1))] = content
+    return numbered
+
+def extract_numbered_results(text: str, count: int, prefix: str = "result") -> List[Optional[str]]:
+    """
+    从批量LLM响应中提取 <result_1>..<result_N> 的内容，整段响应只扫描一次。
+
+    Args:
+        text: 包含编号标签的原始字符串。
+        count: 期望的结果数量N。
+        prefix: 标签前缀，默认为 'result'。
+
+    Returns:
+        长度为N的列表，第i-1项是 <result_i> 的内容；缺失或编号越界的项为None。
+    """
+    results: List[Optional[str]] = [None] * count
+    for number, content in _numbered_tags(text, prefix, "_").items():
+        if 1 <= number <= count:
+            results[number - 1] = content
+    return results
+
+def extract_indexed_tags(text: str, prefix: str = "topic", limit: Optional[int] = None) -> List[str]:
+    """
+    按编号顺序提取 <topic1>..<topicN> 等任意数量的编号标签内容。
+
+    Args:
+        text: 包含编号标签的原始字符串。
+        prefix: 标签前缀，默认为 'topic'。
+        limit: 最多返回的数量，None表示不限。
+
+    Returns:
+        按编号升序排列的非空内容列表，重复内容只保留第一次出现。
+    """
+    found = _numbered_tags(text, prefix, "")
+    values: List[str] = []
+    for index in sorted(found):
+        if found[index] and found[index] not in values:
+            values.append(found[index])
+    return values[:limit] if limit is not None else values
+
+def has_complete_indexed_tags(text: str, prefix: str = "topic") -> bool:
+    """
+    判断文本中至少有一个编号标签，且所有编号标签都已闭合。
+    extract_indexed_tags 会容忍未闭合的标签，缓存前用它排除被截断的响应。
+    """
+    if not isinstance(text, str):
+        return False
+    opened = re.findall(rf"<{re.escape(prefix)}(\d+)>", text)
+    closed = re.findall(rf"</{re.escape(prefix)}(\d+)>", text)
+    return bool(opened) and sorted(opened) == sorted(closed)
+
+class StreamingTagParser:
+    """
+    推送式XML标签解析器，用于流式LLM输出。
+    每次 feed 一个文本块，返回在本块中闭合的 (标签名, 内容) 列表，每个标签只产出第一次出现；
+    被切断的标签（如末尾的 '<topi'）留到下一块再判断。close 时未闭合的标签按
+    find_xml_tags 的规则产出（内容截止到下一个标签或文本末尾）。
+    """
+
+    def __init__(self, tags: Optional[Iterable[str]] = None, prefix: Optional[str] = None):
+        """
+        :param tags: 需要产出的标签名
+        :param prefix: 需要产出的编号标签前缀，如 'topic' 匹配 topic1..topicN
+        tags 和 prefix 都为None时产出全部标签
+        """
+        self._tags = frozenset(tags) if tags is not None else None
+        self._prefix_re = _numbered_tag_re(prefix, "") if prefix else None
+        self._text = ""
+        self._pos = 0
+        # 栈元素: [标签名, 内容起点, 开标签后第一个标签的起点]
+        self._stack: List[List[Any]] = []
+        self.found: Dict[str, str] = {}
+
+    @property
+    def raw_text(self) -> str:
+        """目前收到的完整原始文本"""
+        return self._text
+
+    def _wanted(self, name: str) -> bool:
+        if self._tags is None and self._prefix_re is None:
+            return True
+        return (self._tags is not None and name in self._tags) or bool(
+            self._prefix_re is not None and self._prefix_re.fullmatch(name)
+        )
+
+    def _emit(self, name: str, start: int, end: int, events: List[Tuple[str, str]]) -> None:
+        if name in self.found or not self._wanted(name):
+            return
+        content = self._text[start:end].strip()
+        self.found[name] = content
+        events.append((name, content))
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """输入一个文本块，返回新闭合的标签"""
+        events: List[Tuple[str, str]] = []
+        if not chunk:
+            return events
+        self._text += chunk
+        last_end = self._pos
+        for token in _XML_TAG_TOKEN_RE.finditer(self._text, self._pos):
+            if self._stack and self._stack[-1][2] is None:
+                self._stack[-1][2] = token.start()
+            is_close, name = token.group(1), token.group(2)
+            if not is_close:
+                self._stack.append([name, token.end(), None])
+            else:
+                for depth in range(len(self._stack) - 1, -1, -1):
+                    if self._stack[depth][0] == name:
+                        for inner_name, inner_start, inner_next in self._stack[depth + 1:]:
+                            self._emit(inner_name, inner_start, inner_next, events)
+                        self._emit(name, self._stack[depth][1], token.start(), events)
+                        del self._stack[depth:]
+                        break
+            last_end = token.end()
+        # 下次只需从最后一个可能未写完的 '<' 开始扫描
+        partial = self._text.rfind("<", last_end)
+        self._pos = partial if partial != -1 else len(self._text)
+        return events
+
+    def close(self) -> List[Tuple[str, str]]:
+        """流结束，产出未闭合的标签"""
+        events: List[Tuple[str, str]] = []
+        for name, start, next_start in self._stack:
+            self._emit(name, start, next_start if next_start is not None else len(self._text), events)
+        self._stack = []
+        return events
+
+_CONTENT_MARKER_RE = re.compile(r"(?m)^(标题[：:]|正文[：:]|Hashtag[：:])")
+_CONTENT_MARKER_SECTIONS = {"标题": "title", "正文": "content", "Hashtag": "tags"}
+_CONTENT_MARKERS = ("标题：", "标题:", "正文：", "正文:", "Hashtag:", "Hashtag：")
+
+class IncrementalContentParser:
+    """
+    增量解析流式生成的文案，识别行首的 '标题：'、'正文：'、'Hashtag:' 分节。
+    每次 feed 一个文本块，返回本块新增的 (section, delta) 列表，section 为
+    'title' / 'content' / 'tags'；跨块被截断的分节标记会暂存到下一块再判断。
+    第一个分节标记之前的文本不计入任何分节。
+    """
+
+    def __init__(self):
+        self.section: Optional[str] = None
+        self.sections: Dict[str, str] = {"title": "", "content": "", "tags": ""}
+        self._buffer = ""
+        self._at_line_start = True
+        self._raw: List[str] = []
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """输入一个文本块，返回新增的分节增量"""
+        if not chunk:
+            return []
+        self._raw.append(chunk)
+        self._buffer += chunk
+        return self._drain(final=False)
+
+    def close(self) -> List[Tuple[str, str]]:
+        """流结束，输出暂存的剩余文本"""
+        return self._drain(final=True)
+
+    @property
+    def raw_text(self) -> str:
+        """目前收到的完整原始文本"""
+        return "".join(self._raw)
+
+    def result(self) -> Dict[str, Any]:
+        """当前已解析出的标题、正文和标签"""
+        tags_text = self.sections["tags"]
+        return {
+            "title": self.sections["title"].strip(),
+            "content": self.sections["content"].strip(),
+            "tags": [tag.strip() for tag in tags_text.split("#") if tag.strip()],
+        }
+
+    def _emit(self, text: str, events: List[Tuple[str, str]]) -> None:
+        if text and self.section is not None:
+            self.sections[self.section] += text
+            events.append((self.section, text))
+
+    def _drain(self, final: bool) -> List[Tuple[str, str]]:
+        events: List[Tuple[str, str]] = []
+        pos = 0
+        for match in _CONTENT_MARKER_RE.finditer(self._buffer):
+            # 缓冲区开头只有在确实处于行首时才算分节标记
+            if match.start() == 0 and not self._at_line_start:
+                continue
+            self._emit(self._buffer[pos:match.start()], events)
+            self.section = _CONTENT_MARKER_SECTIONS[match.group(1)[:-1]]
+            pos = match.end()
+
+        rest = self._buffer[pos:]
+        hold = 0
+        if not final:
+            tail_start = rest.rfind("\n") + 1
+            if tail_start > 0 or (pos == 0 and self._at_line_start):
+                tail = rest[tail_start:]
+                if tail and any(marker.startswith(tail) for marker in _CONTENT_MARKERS):
+                    hold = len(tail)
+
+        self._emit(rest[:len(rest) - hold], events)
+        self._buffer = rest[len(rest) - hold:]
+        if hold:
+            self._at_line_start = True
+        elif rest:
+            self._at_line_start = rest.endswith("\n")
+        elif pos > 0:
+            self._at_line_start = False
+        return events
+
+def parse_generated_content(text: str) -> Dict[str, Any]:
+    """一次性解析完整的 '标题：/正文：/Hashtag:' 格式文案"""
+    parser = IncrementalContentParser()
+    parser.feed(text or "")
+    parser.close()
+    return parser.result()
+
 def parse_and_format_hot_topics(response_body: str) -> str:
     """
     解析来自 'fisherman' (Coze API) 的响应，并将其格式化为Markdown表格。
@@ -179,7 +469,7 @@ def filter_and_select_articles(articles: List[Dict[str, str]], results: List[str
     # 3. 选择前5篇
     return shuffled[:5]
 
-def parse_markdown_posts(markdown_content: str) -> List[Dict[str, Any]]:
+def parse_markdown_posts(markdown_content: str) -> List[PostRecord]:
     """解析markdown格式的帖子内容"""
     posts = []
     lines = markdown_content.strip().split('\n')
@@ -196,22 +486,16 @@ def parse_markdown_posts(markdown_content: str) -> List[Dict[str, Any]]:
         if '|' in line and line.strip():
             parts = [part.strip() for part in line.split('|')]
             if len(parts) >= 4:
-                post = {
-                    "title": parts[1] if len(parts) > 1 else "",
-                    "content": parts[2] if len(parts) > 2 else "",
-                    "author": parts[3] if len(parts) > 3 else "",
-                    "likes": 0,
-                    "comments": 0,
-                    "shares": 0,
-                    "views": 0,
-                    "quality_score": 0.0,
-                    "tags": []
-                }
+                post = PostRecord(
+                    title=parts[1] if len(parts) > 1 else "",
+                    content=parts[2] if len(parts) > 2 else "",
+                    author=parts[3] if len(parts) > 3 else "",
+                )
                 posts.append(post)
     
     return posts
 
-def parse_xhs_posts(json_content: str) -> List[Dict[str, Any]]:
+def parse_xhs_posts(json_content: str) -> List[PostRecord]:
     """解析XHS API返回的JSON格式帖子"""
     try:
         data = json.loads(json_content)
@@ -226,17 +510,17 @@ def parse_xhs_posts(json_content: str) -> List[Dict[str, Any]]:
             items = []
         
         for item in items:
-            post = {
-                "title": item.get('title', ''),
-                "content": item.get('content', ''),
-                "author": item.get('author', ''),
-                "likes": item.get('likes', 0),
-                "comments": item.get('comments', 0),
-                "shares": item.get('shares', 0),
-                "views": item.get('views', 0),
-                "quality_score": 0.0,
-                "tags": item.get('tags', [])
-            }
+            post = PostRecord(
+                id=item.get('id', item.get('note_id', '')),
+                title=item.get('title', ''),
+                content=item.get('content', ''),
+                author=item.get('author', ''),
+                likes=parse_count(item.get('likes', 0)),
+                comments=parse_count(item.get('comments', 0)),
+                shares=parse_count(item.get('shares', 0)),
+                views=parse_count(item.get('views', 0)),
+                tags=item.get('tags', []),
+            )
             posts.append(post)
         
         return posts
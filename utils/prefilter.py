@@ -0,0 +1,196 @@
+"""
+帖子规则预过滤
+在调用LLM过滤之前，用确定性的规则给每篇帖子打垃圾分：
+- Aho-Corasick 自动机一次扫描匹配整个引流/推广词表
+- 链接、微信号、手机号等正则信号
+- 正文长度和互动量启发式
+分数超过阈值且留有明确联系方式（微信号、手机号）的直接判为低质量，
+空标题/空正文的帖子本来就不会被选中也直接排除，其余帖子都交给LLM判断。
+词表词（包括"团购""下单""链接在评论区"等普通帖子里常见的词）只加分，不会单独导致拒绝。
+"""
+
+import os
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from utils.counts import parse_count
+
+# 引流/推广词表及其权重，匹配到的不同词权重相加
+DEFAULT_SPAM_LEXICON: Dict[str, float] = {
+    "推广": 0.3,
+    "广告": 0.3,
+    "私信": 0.4,
+    "私我": 0.4,
+    "滴滴我": 0.5,
+    "dd我": 0.5,
+    "引流": 0.6,
+    "加微": 0.8,
+    "加v": 0.8,
+    "v信": 0.7,
+    "vx": 0.5,
+    "wx": 0.4,
+    "微信": 0.4,
+    "扫码": 0.6,
+    "二维码": 0.4,
+    "点击链接": 0.6,
+    "链接在": 0.5,
+    "免费领": 0.6,
+    "领取福利": 0.6,
+    "优惠券": 0.4,
+    "代购": 0.5,
+    "招代理": 0.8,
+    "招募代理": 0.8,
+    "兼职": 0.4,
+    "日赚": 0.8,
+    "月入过万": 0.7,
+    "躺赚": 0.7,
+    "下单": 0.3,
+    "团购": 0.3,
+}
+
+# 正则信号及其权重
+_SIGNALS: List[Tuple[str, "re.Pattern[str]", float]] = [
+    ("链接", re.compile(r"https?://|www\.|\.com\b|\.cn\b", re.IGNORECASE), 0.5),
+    # 微信号需带"号"或冒号分隔，或号码中含数字，避免把"微信WeChat"这类品牌名当成微信号
+    ("微信号", re.compile(
+        r"(?:微信|加微|vx|wx|v信|薇信|威信)"
+        r"(?:\s*(?:号\s*[:：]?|[:：])\s*(?!wechat|weixin)[a-zA-Z][-_a-zA-Z0-9]{5,19}"
+        r"|\s*(?!wechat|weixin)[a-zA-Z](?=[-_a-zA-Z0-9]*\d)[-_a-zA-Z0-9]{5,19})"
+        r"(?![-_a-zA-Z0-9])",
+        re.IGNORECASE,
+    ), 0.9),
+    ("手机号", re.compile(r"(?<!\d)1[3-9]\d{9}(?!\d)"), 0.9),
+]
+
+# 出现即可直接拒绝的正则信号（留联系方式）
+HARD_SIGNALS = frozenset({"微信号", "手机号"})
+
+# 正文过短的惩罚
+MIN_CONTENT_LENGTH = 15
+SHORT_CONTENT_PENALTY = 0.3
+
+# 互动量高的帖子降低垃圾分
+HIGH_ENGAGEMENT = 1000
+HIGH_ENGAGEMENT_BONUS = 0.3
+
+# 垃圾分达到该值直接判为低质量，可通过环境变量 PREFILTER_REJECT_THRESHOLD 调整
+DEFAULT_REJECT_THRESHOLD = float(os.getenv("PREFILTER_REJECT_THRESHOLD", "0.8"))
+
+
+class AhoCorasick:
+    """多模式串匹配自动机，一次扫描找出文本中出现的所有模式串（不区分大小写）"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[str]] = [set()]
+        for pattern in patterns:
+            self._add(pattern.lower())
+        self._build()
+
+    def _add(self, pattern: str) -> None:
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = nxt
+        self._output[state].add(pattern)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._output[nxt] |= self._output[self._fail[nxt]]
+
+    def find(self, text: str) -> Set[str]:
+        """返回文本中出现过的模式串集合"""
+        found: Set[str] = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._output[state]:
+                found |= self._output[state]
+        return found
+
+
+@dataclass
+class PrefilterResult:
+    """decision 为 "0"/"1" 表示已有确定结论，None 表示需要LLM判断"""
+    decision: Optional[str]
+    score: float
+    reasons: List[str] = field(default_factory=list)
+
+
+class SpamPrefilter:
+    """规则+打分的帖子预过滤器"""
+
+    def __init__(
+        self,
+        lexicon: Optional[Dict[str, float]] = None,
+        reject_threshold: float = DEFAULT_REJECT_THRESHOLD,
+        accept_threshold: Optional[float] = None,
+    ):
+        """
+        :param lexicon: 词表及权重，默认 DEFAULT_SPAM_LEXICON
+        :param reject_threshold: 垃圾分达到该值且带有硬信号时直接判为低质量
+        :param accept_threshold: 垃圾分不超过该值直接判为通过；默认None，即所有非垃圾帖子仍交给LLM，保证选中结果不变
+        """
+        self.lexicon = {term.lower(): weight for term, weight in (lexicon or DEFAULT_SPAM_LEXICON).items()}
+        self.reject_threshold = reject_threshold
+        self.accept_threshold = accept_threshold
+        self._automaton = AhoCorasick(self.lexicon)
+
+    def check(self, post: Dict[str, Any]) -> PrefilterResult:
+        title = (post.get("title") or "").strip()
+        content = (post.get("content") or "").strip()
+        # filter_and_select_articles 不会选中缺标题或正文的帖子，无需询问LLM
+        if not title or not content:
+            return PrefilterResult("0", 1.0, ["空标题或空正文"])
+
+        text = f"{title}\n{content}"
+        reasons = []
+        score = 0.0
+        hard_signal = False
+        for term in sorted(self._automaton.find(text)):
+            score += self.lexicon[term]
+            reasons.append(term)
+        for name, pattern, weight in _SIGNALS:
+            if pattern.search(text):
+                score += weight
+                hard_signal = hard_signal or name in HARD_SIGNALS
+                reasons.append(name)
+        if len(content) < MIN_CONTENT_LENGTH:
+            score += SHORT_CONTENT_PENALTY
+            reasons.append("正文过短")
+        if parse_count(post.get("likes")) + parse_count(post.get("comments")) >= HIGH_ENGAGEMENT:
+            score -= HIGH_ENGAGEMENT_BONUS
+            reasons.append("高互动")
+
+        # 只靠词表加分不足以拒绝，避免误伤团购测评、书单、App推荐等正常帖子
+        if score >= self.reject_threshold and hard_signal:
+            return PrefilterResult("0", score, reasons)
+        if self.accept_threshold is not None and score <= self.accept_threshold:
+            return PrefilterResult("1", score, reasons)
+        return PrefilterResult(None, score, reasons)
+
+    def check_all(self, posts: Iterable[Dict[str, Any]]) -> List[PrefilterResult]:
+        return [self.check(post) for post in posts]
+
+
+default_prefilter = SpamPrefilter()
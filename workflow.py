@@ -3,15 +3,19 @@
 整合所有节点，构建完整的工作流程
 """
 
+import os
+import uuid
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, TYPE_CHECKING
 from loguru import logger
-from langgraph.graph import StateGraph, END
-# from langgraph.checkpoint.memory import MemorySaver
+
+# langgraph 在首次构建工作流图时导入
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
 
 from models import WorkflowStatus
 from workflow_types import WorkflowState
-from utils.parsers import extract_xml_tags, parse_and_format_hot_topics, parse_articles_from_response, filter_and_select_articles
+from utils.parsers import extract_xml_tags, find_xml_tags, extract_indexed_tags, parse_and_format_hot_topics, parse_articles_from_response, filter_and_select_articles
 from nodes import (
     keyword_generation_node,
     topic_refinement_node,
@@ -20,47 +24,43 @@ from nodes import (
     content_generation_node,
     content_filtering_and_selection_node
 )
-# Import the new topic search nodes
-from nodes.topic_search import (
-    topic_search_node_1,
-    topic_search_node_2,
-    format_topics_node_1,
-    format_topics_node_2,
-    combine_topic_results_node
-)
-# Import the new post retrieval nodes
-from nodes.post_retrieval import (
-    post_retrieval_node_1,
-    post_retrieval_node_2,
-    parse_posts_node_1,
-    parse_posts_node_2,
-    combine_post_results_node
-)
+from nodes.topic_search import topic_search_node, combine_topic_results_node
+from nodes.post_retrieval import post_retrieval_node, combine_post_results_node
+from nodes.speculative import speculative_keyword_generation_node, speculative_topic_refinement_node
 from config import config
+from clients.llm_client import llm_client
+from utils.cache import DEFAULT_CACHE_DIR
+
+# 检查点数据库路径，可通过环境变量 CHECKPOINT_DB 覆盖
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", os.path.join(DEFAULT_CACHE_DIR, "checkpoints.sqlite3"))
+
+# 每次运行最多使用的搜索/检索关键词数
+MAX_KEYWORDS = 8
+
+# 是否默认启用投机预取，可通过环境变量 XHS_SPECULATIVE 开启
+XHS_SPECULATIVE = os.getenv("XHS_SPECULATIVE", "false").lower() == "true"
 
 # --- The new, more granular nodes from before ---
 def extract_initial_keywords_node(state: WorkflowState) -> WorkflowState:
     """节点：从LLM响应中提取初始关键词"""
     logger.info("节点：提取初始关键词")
     llm_output = state.llm_output if hasattr(state, 'llm_output') else ""
-    extracted = extract_xml_tags(llm_output, ["topic1", "topic2"])
+    keywords = extract_indexed_tags(llm_output, "topic", limit=MAX_KEYWORDS)
     new_state = state.model_copy()
-    new_state.primary_keyword = extracted.get("topic1")
-    new_state.secondary_keyword = extracted.get("topic2")
-    if not new_state.primary_keyword or not new_state.secondary_keyword:
-        logger.warning("未能提取到全部初始关键词，流程可能出错")
-    logger.info(f"提取到关键词: {new_state.primary_keyword}, {new_state.secondary_keyword}")
+    new_state.search_keywords = keywords
+    new_state.primary_keyword = keywords[0] if keywords else None
+    new_state.secondary_keyword = keywords[1] if len(keywords) > 1 else None
+    if not keywords:
+        logger.warning("未能提取到初始关键词，流程可能出错")
+    logger.info(f"提取到关键词: {keywords}")
     return new_state
 
 def extract_refined_keywords_node(state: WorkflowState) -> WorkflowState:
     """节点：从LLM响应中提取精炼后的关键词"""
     logger.info("节点：提取精炼关键词")
     llm_output = state.refinement_llm_output if hasattr(state, 'refinement_llm_output') else ""
-    # The JSON workflow implies we get two new keywords for post retrieval
-    extracted = extract_xml_tags(llm_output, ["topic1", "topic2"])
-    # We will store these in a new state field
     new_state = state.model_copy()
-    new_state.refined_keywords = [kw for kw in extracted.values() if kw]
+    new_state.refined_keywords = extract_indexed_tags(llm_output, "topic", limit=MAX_KEYWORDS)
     logger.info(f"提取到精炼关键词: {new_state.refined_keywords}")
     return new_state
 
@@ -75,13 +75,13 @@ def extract_hitpoints_node(state: WorkflowState) -> WorkflowState:
         new_state.hitpoints = []
         return new_state
     
-    # 使用 extract_xml_tags 解析打点
-    parsed_hitpoints = extract_xml_tags(llm_output, ["hitpoint1", "hitpoint2", "hitpoint3", "hitpoint4", "hitpoint5"])
+    # 一次扫描解析全部打点
+    parsed_hitpoints = find_xml_tags(llm_output, ["hitpoint1", "hitpoint2", "hitpoint3", "hitpoint4", "hitpoint5"])
     # 转换为列表格式
     hitpoints_list = []
     for i in range(1, 6):
         key = f"hitpoint{i}"
-        if key in parsed_hitpoints and parsed_hitpoints[key]:
+        if parsed_hitpoints.get(key):
             hitpoints_list.append({"id": f"hitpoint_{i}", "description": parsed_hitpoints[key]})
     
     new_state.hitpoints = hitpoints_list
@@ -101,37 +101,56 @@ def should_filter_posts(state: WorkflowState) -> str:
 class XiaohongshuAgent:
     """小红书起号智能助手"""
     
-    def __init__(self):
-        # self.memory = MemorySaver()
-        self.graph = self._build_workflow()
+    def __init__(self, checkpoint_path: str = CHECKPOINT_DB, speculative: bool = XHS_SPECULATIVE):
+        """
+        :param checkpoint_path: 检查点SQLite文件路径
+        :param speculative: 投机模式，流式解析关键词的同时在后台预取主题和帖子
+        """
+        self.speculative = speculative
+        # 工作流图在首次运行时构建
+        self._graph = None
+        # 不含内容生成的工作流，供流式生成使用，首次需要时构建
+        self._selection_graph = None
+        # 带SQLite检查点的工作流，每个节点完成后持久化状态；首次需要时在事件循环内构建
+        self.checkpoint_path = checkpoint_path
+        self._checkpoint_graph = None
+        self._checkpointer = None
+        self._checkpoint_lock = asyncio.Lock()
     
-    def _build_workflow(self) -> StateGraph:
-        """构建工作流图"""
+    @property
+    def graph(self):
+        """完整工作流图，首次访问时构建"""
+        if self._graph is None:
+            self._graph = self._build_workflow()
+        return self._graph
+
+    def _build_workflow(self, include_generation: bool = True, checkpointer: Any = None) -> "StateGraph":
+        """
+        构建工作流图
+        :param include_generation: 为False时在用户选择后结束，由调用方自行（流式）生成内容
+        :param checkpointer: LangGraph检查点存储，每个节点完成后保存状态
+        """
+        from langgraph.graph import StateGraph, END
+        
         logger.info("构建工作流图")
         
         workflow = StateGraph(WorkflowState)
         
         # --- Add all nodes to the workflow ---
         # Step 1: Keyword Generation
-        workflow.add_node("keyword_generation", keyword_generation_node)
+        workflow.add_node("keyword_generation", speculative_keyword_generation_node if self.speculative else keyword_generation_node)
         workflow.add_node("extract_initial_keywords", extract_initial_keywords_node)
 
-        # Step 2: Parallel Topic Search
-        workflow.add_node("topic_search_1", topic_search_node_1)
-        workflow.add_node("topic_search_2", topic_search_node_2)
-        workflow.add_node("format_topics_1", format_topics_node_1)
-        workflow.add_node("format_topics_2", format_topics_node_2)
+        # Step 2: Topic Search (N keywords, gathered inside the node)
+        workflow.add_node("topic_search", topic_search_node)
         workflow.add_node("combine_topic_results", combine_topic_results_node)
 
         # Step 3: Topic Refinement
-        workflow.add_node("topic_refinement", topic_refinement_node)
+        workflow.add_node("topic_refinement", speculative_topic_refinement_node if self.speculative else topic_refinement_node)
         workflow.add_node("extract_refined_keywords", extract_refined_keywords_node)
 
-        # Step 4: Parallel Post Retrieval
-        workflow.add_node("post_retrieval_1", post_retrieval_node_1)
-        workflow.add_node("post_retrieval_2", post_retrieval_node_2)
-        workflow.add_node("parse_posts_1", parse_posts_node_1)
-        workflow.add_node("parse_posts_2", parse_posts_node_2)
+        # Step 4: Post Retrieval (N keywords, gathered inside the node)
+        workflow.add_node("post_retrieval", post_retrieval_node)
         workflow.add_node("combine_post_results", combine_post_results_node)
 
         # Step 5: Content Filtering and Selection
@@ -143,7 +162,8 @@ class XiaohongshuAgent:
         
         # Step 7: User Selection and Content Generation
         workflow.add_node("user_selection", user_selection_node)
-        workflow.add_node("content_generation", content_generation_node)
+        if include_generation:
+            workflow.add_node("content_generation", content_generation_node)
         
         # End node
         def end_node_no_posts(state: WorkflowState) -> WorkflowState:
@@ -157,49 +177,12 @@ class XiaohongshuAgent:
         workflow.set_entry_point("keyword_generation")
         workflow.add_edge("keyword_generation", "extract_initial_keywords")
         
-        # After extracting keywords, start both topic searches in parallel
-        workflow.add_edge("extract_initial_keywords", "topic_search_1")
-        workflow.add_edge("extract_initial_keywords", "topic_search_2")
-
-        # Each search is followed by its own formatting node
-        workflow.add_edge("topic_search_1", "format_topics_1")
-        workflow.add_edge("topic_search_2", "format_topics_2")
-
-        # After both formatting nodes are done, join the results
-        workflow.add_conditional_edges(
-            "format_topics_1",
-            lambda state: "combine_topic_results" if state.get("formatted_topics_2") else None,
-            {"combine_topic_results": "combine_topic_results"}
-        )
-        workflow.add_conditional_edges(
-            "format_topics_2",
-            lambda state: "combine_topic_results" if state.get("formatted_topics_1") else None,
-            {"combine_topic_results": "combine_topic_results"}
-        )
-
-        # Continue the linear flow
+        workflow.add_edge("extract_initial_keywords", "topic_search")
+        workflow.add_edge("topic_search", "combine_topic_results")
         workflow.add_edge("combine_topic_results", "topic_refinement")
         workflow.add_edge("topic_refinement", "extract_refined_keywords")
-
-        # After refining keywords, start both post retrievals in parallel
-        workflow.add_edge("extract_refined_keywords", "post_retrieval_1")
-        workflow.add_edge("extract_refined_keywords", "post_retrieval_2")
-
-        # Each retrieval is followed by its own parsing node
-        workflow.add_edge("post_retrieval_1", "parse_posts_1")
-        workflow.add_edge("post_retrieval_2", "parse_posts_2")
-        
-        # Join the branches after parsing
-        workflow.add_conditional_edges(
-            "parse_posts_1",
-            lambda state: "combine_post_results" if state.get("parsed_posts_2") is not None else None,
-            {"combine_post_results": "combine_post_results"}
-        )
-        workflow.add_conditional_edges(
-            "parse_posts_2",
-            lambda state: "combine_post_results" if state.get("parsed_posts_1") is not None else None,
-            {"combine_post_results": "combine_post_results"}
-        )
+        workflow.add_edge("extract_refined_keywords", "post_retrieval")
+        workflow.add_edge("post_retrieval", "combine_post_results")
 
         # After combining posts, decide whether to filter or end
         workflow.add_conditional_edges(
@@ -215,12 +198,36 @@ class XiaohongshuAgent:
         workflow.add_edge("content_filtering_and_selection", "hitpoint_analysis")
         workflow.add_edge("hitpoint_analysis", "extract_hitpoints")
         workflow.add_edge("extract_hitpoints", "user_selection")
-        workflow.add_edge("user_selection", "content_generation")
-        workflow.add_edge("content_generation", END)
+        if include_generation:
+            workflow.add_edge("user_selection", "content_generation")
+            workflow.add_edge("content_generation", END)
+        else:
+            workflow.add_edge("user_selection", END)
         workflow.add_edge("end_node_no_posts", END)
         
         logger.info("工作流图构建完成")
-        return workflow.compile()
+        return workflow.compile(checkpointer=checkpointer)
+    
+    def _initial_state(self, user_input: str) -> WorkflowState:
+        """创建初始状态（字典格式）"""
+        return {
+            "user_input": user_input,
+            "current_state": WorkflowStatus.INITIALIZED.value,
+            "keywords": [],
+            "primary_keyword": "",
+            "secondary_keyword": "",
+            "search_keywords": [],
+            "topics": [],
+            "search_results": {},
+            "retrieved_posts": [],
+            "filtered_posts": [],
+            "hitpoints": [],
+            "generated_content": {},
+            "error_message": "",
+            "total_posts_processed": 0,
+            "total_hitpoints_generated": 0,
+            "selected_hitpoint": {}
+        }
     
     async def run(self, user_input: str, config_id: Optional[str] = None) -> Dict[str, Any]:
         """运行工作流"""
@@ -232,23 +239,7 @@ class XiaohongshuAgent:
                 raise ValueError("配置验证失败，请检查环境变量")
             
             # 创建初始状态（字典格式）
-            initial_state: WorkflowState = {
-                "user_input": user_input,
-                "current_state": WorkflowStatus.INITIALIZED.value,
-                "keywords": [],
-                "primary_keyword": "",
-                "secondary_keyword": "",
-                "topics": [],
-                "search_results": {},
-                "retrieved_posts": [],
-                "filtered_posts": [],
-                "hitpoints": [],
-                "generated_content": {},
-                "error_message": "",
-                "total_posts_processed": 0,
-                "total_hitpoints_generated": 0,
-                "selected_hitpoint": {}
-            }
+            initial_state = self._initial_state(user_input)
             logger.info(f"创建初始状态: {initial_state}")
             
             # 运行工作流
@@ -283,47 +274,73 @@ class XiaohongshuAgent:
             }
             return error_state
     
+    async def _get_checkpoint_graph(self):
+        """构建带SQLite检查点的工作流；缺少依赖时返回None"""
+        if self._checkpoint_graph is not None:
+            return self._checkpoint_graph
+        try:
+            import aiosqlite
+            try:
+                from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+            except ImportError:
+                from langgraph.checkpoint.aiosqlite import AsyncSqliteSaver
+        except ImportError:
+            logger.warning("未安装 langgraph-checkpoint-sqlite/aiosqlite，检查点不可用")
+            return None
+        async with self._checkpoint_lock:
+            if self._checkpoint_graph is None:
+                directory = os.path.dirname(self.checkpoint_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                conn = await aiosqlite.connect(self.checkpoint_path)
+                self._checkpointer = AsyncSqliteSaver(conn)
+                self._checkpoint_graph = self._build_workflow(checkpointer=self._checkpointer)
+                logger.info(f"检查点已启用: {self.checkpoint_path}")
+        return self._checkpoint_graph
+
+    @staticmethod
+    def _thread_config(config_id: str) -> Dict[str, Any]:
+        return {"configurable": {"thread_id": config_id}}
+
+    async def _checkpoint_input(self, graph, user_input: str, config_id: str) -> Optional[WorkflowState]:
+        """
+        根据已有检查点决定本次运行的输入：
+        有未完成的节点时返回None，从最后完成的节点继续；否则返回新的初始状态
+        """
+        snapshot = await graph.aget_state(self._thread_config(config_id))
+        if snapshot is not None and snapshot.values and snapshot.next:
+            logger.info(f"从检查点恢复运行 {config_id}，待执行节点: {list(snapshot.next)}")
+            return None
+        return self._initial_state(user_input)
+
     async def run_with_checkpoint(self, user_input: str, config_id: Optional[str] = None) -> Dict[str, Any]:
-        """运行工作流（带检查点）"""
-        logger.info(f"开始运行工作流（带检查点），用户输入: {user_input}")
+        """
+        运行工作流（带检查点）
+        每个节点完成后状态写入SQLite；同一config_id再次调用时从最后完成的节点继续，
+        已完成的采集和LLM调用不会重复执行。
+        """
+        config_id = config_id or uuid.uuid4().hex
+        logger.info(f"开始运行工作流（带检查点 {config_id}），用户输入: {user_input}")
         
         try:
             # 验证配置
             if not config.validate_config():
                 raise ValueError("配置验证失败，请检查环境变量")
             
-            # 创建初始状态
-            initial_state: WorkflowState = {
-                "user_input": user_input,
-                "current_state": WorkflowStatus.INITIALIZED.value,
-                "keywords": [],
-                "primary_keyword": "",
-                "secondary_keyword": "",
-                "topics": [],
-                "search_results": {},
-                "retrieved_posts": [],
-                "filtered_posts": [],
-                "hitpoints": [],
-                "generated_content": {},
-                "error_message": "",
-                "total_posts_processed": 0,
-                "total_hitpoints_generated": 0,
-                "selected_hitpoint": {}
-            }
-            
-            # 运行工作流
-            config_dict = {"config_id": config_id} if config_id else {}
+            graph = await self._get_checkpoint_graph()
+            if graph is None:
+                return await self.run(user_input, config_id)
             
-            result = await self.graph.ainvoke(
-                initial_state,
-                config=config_dict
+            result = await graph.ainvoke(
+                await self._checkpoint_input(graph, user_input, config_id),
+                config=self._thread_config(config_id)
             )
             
             logger.info("工作流执行完成（带检查点）")
             return result
             
         except Exception as e:
-            logger.error(f"工作流执行失败: {e}")
+            logger.error(f"工作流执行失败，可使用 config_id={config_id} 从检查点恢复: {e}")
             # 创建错误状态
             error_state: WorkflowState = {
                 "user_input": user_input,
@@ -332,16 +349,92 @@ class XiaohongshuAgent:
             }
             return error_state
     
-    def get_workflow_status(self, config_id: str) -> Dict[str, Any]:
-        """获取工作流状态"""
+    async def stream_progress(self, user_input: str, config_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式运行工作流，每个节点完成时产出 {"type": "node", "node", "current_state", "updated_keys"}，
+        结束时产出 {"type": "result", "state"}；出错时产出 {"type": "error", "error_message"}。
+        """
+        logger.info(f"开始流式运行工作流（节点进度），用户输入: {user_input}")
+
         try:
-            # 从内存中获取检查点状态
-            # checkpoint = self.memory.get(config_id)
-            if checkpoint:
+            if not config.validate_config():
+                raise ValueError("配置验证失败，请检查环境变量")
+
+            # 指定config_id时使用检查点，中断后以同一config_id再次运行即可继续
+            graph = await self._get_checkpoint_graph() if config_id else None
+            if graph is not None:
+                thread_config = self._thread_config(config_id)
+                graph_input = await self._checkpoint_input(graph, user_input, config_id)
+                state = dict(graph_input) if graph_input is not None else dict((await graph.aget_state(thread_config)).values)
+            else:
+                graph, thread_config = self.graph, {}
+                graph_input = state = self._initial_state(user_input)
+
+            async for chunk in graph.astream(graph_input, config=thread_config):
+                for node, update in chunk.items():
+                    updated_keys = []
+                    if isinstance(update, dict):
+                        state.update(update)
+                        updated_keys = sorted(update.keys())
+                    yield {
+                        "type": "node",
+                        "node": node,
+                        "current_state": state.get("current_state"),
+                        "updated_keys": updated_keys,
+                    }
+
+            logger.info("工作流执行完成（节点进度）")
+            yield {"type": "result", "state": state}
+
+        except Exception as e:
+            logger.error(f"工作流执行失败: {e}")
+            yield {"type": "error", "error_message": f"工作流执行失败: {str(e)}"}
+
+    async def stream_content(self, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式运行工作流：先执行到用户选择，再流式生成文案。
+        产出 {"type": "selection", "selected_hitpoint", "hitpoints"} 后，
+        逐块产出 {"type": "delta", "section", "text"}，最后产出 {"type": "done", ...}；
+        出错时产出 {"type": "error", "error_message"}。
+        """
+        logger.info(f"开始流式运行工作流，用户输入: {user_input}")
+        
+        try:
+            if not config.validate_config():
+                raise ValueError("配置验证失败，请检查环境变量")
+            
+            if self._selection_graph is None:
+                self._selection_graph = self._build_workflow(include_generation=False)
+            
+            state = await self._selection_graph.ainvoke(self._initial_state(user_input))
+            selected_hitpoint = state.get("selected_hitpoint") if state else None
+            if not selected_hitpoint:
+                yield {"type": "error", "error_message": (state or {}).get("error_message") or "没有可用于生成内容的打点"}
+                return
+            
+            yield {
+                "type": "selection",
+                "selected_hitpoint": selected_hitpoint,
+                "hitpoints": state.get("hitpoints", []),
+            }
+            async for event in llm_client.stream_content(user_input, selected_hitpoint):
+                yield event
+            
+        except Exception as e:
+            logger.error(f"流式工作流执行失败: {e}")
+            yield {"type": "error", "error_message": f"工作流执行失败: {str(e)}"}
+    
+    async def get_workflow_status(self, config_id: str) -> Dict[str, Any]:
+        """获取工作流状态（来自检查点）"""
+        try:
+            graph = await self._get_checkpoint_graph()
+            snapshot = await graph.aget_state(self._thread_config(config_id)) if graph is not None else None
+            if snapshot is not None and snapshot.values:
                 return {
                     "config_id": config_id,
-                    "status": "running",
-                    "data": checkpoint
+                    "status": "interrupted" if snapshot.next else "completed",
+                    "next_nodes": list(snapshot.next),
+                    "data": snapshot.values
                 }
             else:
                 return {
@@ -357,5 +450,12 @@ class XiaohongshuAgent:
                 "error": str(e)
             }
 
+    async def close(self) -> None:
+        """关闭检查点数据库连接"""
+        if self._checkpointer is not None:
+            await self._checkpointer.conn.close()
+            self._checkpointer = None
+            self._checkpoint_graph = None
+
 # 全局工作流实例
 agent = XiaohongshuAgent() 
\ No newline at end of file
@@ -3,7 +3,12 @@
 定义工作流中使用的所有类型
 """
 
-from typing import TypedDict, List, Any
+from typing import TypedDict, List, Dict, Any, Optional
+from typing_extensions import Annotated
+
+def merge_keyed_results(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """按关键词合并各分支结果的reducer；同一关键词以后写入的为准，重复合并结果不变"""
+    return {**(left or {}), **(right or {})}
 
 class WorkflowState(TypedDict, total=False):
     """工作流状态类型定义"""
@@ -14,20 +19,18 @@ class WorkflowState(TypedDict, total=False):
     llm_output: str
     primary_keyword: str
     secondary_keyword: str
+    search_keywords: List[str]
 
-    topic_search_result_1: dict
-    topic_search_result_2: dict
-    formatted_topics_1: str
-    formatted_topics_2: str
+    # 以关键词为键的各分支结果
+    topic_search_results: Annotated[Dict[str, str], merge_keyed_results]
+    formatted_topics: Annotated[Dict[str, str], merge_keyed_results]
     combined_topic_results: str
 
     refinement_llm_output: str
     refined_keywords: List[str]
 
-    post_retrieval_result_1: str
-    post_retrieval_result_2: str
-    parsed_posts_1: List[Any]
-    parsed_posts_2: List[Any]
+    post_retrieval_results: Annotated[Dict[str, str], merge_keyed_results]
+    parsed_posts: Annotated[Dict[str, List[Any]], merge_keyed_results]
     retrieved_posts: List[Any]
 
     final_selected_posts: List[Any]